@@ -0,0 +1,59 @@
+"""
+Per-frame cost of EmpathEye.analyze_frame at full versus downscaled analysis resolution.
+
+    python -m benchmarks.bench_analyze_frame [--width 640] [--frames 90]
+
+Runs the whole vision step (detect/track, apparel, annotation) over a
+synthetic 1280x720 clip and reports ms/frame, bytes newly allocated per
+frame (tracemalloc; numpy and OpenCV outputs are counted) and recall
+(IoU >= 0.4) of the full-resolution boxes it returns.
+"""
+import argparse
+import time
+import tracemalloc
+
+from empath.detector import EmpathEye
+from benchmarks.fixtures import synthetic_face_video, iou
+
+
+def run(eye, clip, annotate):
+    elapsed = 0.0
+    allocated = found = labeled = 0
+    tracemalloc.start()
+    for frame, labels in clip:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        eye.analyze_frame(frame, annotate=annotate)
+        elapsed += time.perf_counter() - start
+        allocated += tracemalloc.get_traced_memory()[1] - before
+        boxes = [t.box for t in eye.tracker.tracks if t.misses == 0]
+        scale = eye._small.shape[1] / frame.shape[1] if eye._small is not None else 1.0
+        for label in labels:
+            labeled += 1
+            full = [tuple(v / scale for v in box) for box in boxes]
+            found += any(iou(label["box"], box) >= 0.4 for box in full)
+    tracemalloc.stop()
+    return elapsed / len(clip) * 1000, allocated / len(clip), found / labeled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--width", type=int, default=640, help="Downscaled analysis width")
+    parser.add_argument("--frames", type=int, default=90)
+    parser.add_argument("--faces", type=int, default=2)
+    parser.add_argument("--tracking", default="flow")
+    args = parser.parse_args()
+
+    clip = list(synthetic_face_video(args.frames, faces=args.faces))
+    print(f"{args.frames} frames 1280x720, {args.faces} faces, tracking={args.tracking}\n")
+    print(f"{'analysis':<12}{'annotate':<10}{'ms/frame':>10}{'KiB/frame':>11}{'recall':>8}")
+    for width, annotate in ((0, True), (args.width, True), (args.width, False)):
+        eye = EmpathEye(tracking=args.tracking, analysis_width=width)
+        ms, allocated, recall = run(eye, clip, annotate)
+        label = f"{width}px" if width else "full"
+        print(f"{label:<12}{str(annotate):<10}{ms:>10.1f}{allocated / 1024:>11.0f}{recall:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
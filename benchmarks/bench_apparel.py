@@ -0,0 +1,94 @@
+"""
+Per-frame cost and accuracy of shirt/hair colour analysis at 1, 3 and 5 faces.
+
+    python -m benchmarks.bench_apparel [--fixtures DIR] [--refresh 15]
+
+Compares the old per-ROI mean-BGR if-chain with ApparelAnalyzer, both
+uncached (every face every frame) and cached per track. Boxes come from the
+labels, so only the colour stage is measured. DIR holds images plus
+labels.json entries with "box", "shirt" and "hair"; by default labeled
+synthetic scenes are generated (half of the shirts striped).
+"""
+import argparse
+import time
+import numpy as np
+
+from empath.apparel import ApparelAnalyzer, apparel_regions
+from benchmarks.fixtures import load_face_fixtures
+
+
+def legacy_color_name(roi):
+    """The original EmpathEye._get_dominant_color_name."""
+    if roi is None or roi.size == 0: return "unknown"
+    b, g, r = np.average(np.average(roi, axis=0), axis=0)
+    if r > 200 and g > 200 and b > 200: return "white"
+    if r < 50 and g < 50 and b < 50: return "black"
+    if r > 150 and g < 100 and b < 100: return "red"
+    if b > 150 and g < 100 and r < 100: return "blue"
+    if g > 150 and r < 100 and b < 100: return "green"
+    if r > 200 and g > 200 and b < 100: return "yellow"
+    if r > 100 and g > 100 and b > 100: return "gray"
+    return "neutral"
+
+
+def legacy_analyze(frame, labels):
+    results = []
+    for label in labels:
+        x, y, w, h = label["box"]
+        hair = frame[max(0, y - int(h * 0.3)):y, x:x + w]
+        shirt_y = min(frame.shape[0], y + h + int(h * 0.2))
+        shirt = frame[shirt_y:min(frame.shape[0], shirt_y + int(h * 0.6)), x:x + w]
+        results.append({"shirt_color": legacy_color_name(shirt), "hair_color": legacy_color_name(hair)})
+    return results
+
+
+class _Box:
+    __slots__ = ("id", "box")
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = tuple(box)
+
+
+def measure(analyze, fixtures, frames_per_fixture):
+    correct = total = 0
+    elapsed = 0.0
+    for _, frame, labels in fixtures:
+        for _ in range(frames_per_fixture):
+            start = time.perf_counter()
+            results = analyze(frame, labels)
+            elapsed += time.perf_counter() - start
+        for label, result in zip(labels, results):
+            correct += (result["shirt_color"] == label["shirt"]) + (result["hair_color"] == label["hair"])
+            total += 2
+    return elapsed / (len(fixtures) * frames_per_fixture) * 1000, correct / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", help="Directory of labeled images (default: synthetic)")
+    parser.add_argument("--refresh", type=int, default=15, help="Cached mode: recompute every K frames")
+    parser.add_argument("--frames", type=int, default=30, help="Frames timed per fixture")
+    args = parser.parse_args()
+
+    print(f"{'faces':<7}{'method':<22}{'ms/frame':>10}{'accuracy':>10}")
+    for faces in (1, 3, 5):
+        fixtures = load_face_fixtures(args.fixtures, count=12, faces=faces)
+        uncached = ApparelAnalyzer(refresh_every=1)
+        cached = ApparelAnalyzer(refresh_every=args.refresh)
+
+        def batched(analyzer):
+            def run(frame, labels):
+                tracks = [_Box((id(frame), i), label["box"]) for i, label in enumerate(labels)]
+                results = analyzer.analyze(frame, tracks)
+                return [results[t.id] for t in tracks]
+            return run
+
+        for name, analyze in (("mean BGR (old)", legacy_analyze), ("HSV batch", batched(uncached)), (f"HSV batch, K={args.refresh}", batched(cached))):
+            ms, accuracy = measure(analyze, fixtures, args.frames)
+            print(f"{faces:<7}{name:<22}{ms:>10.3f}{accuracy:>10.0%}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
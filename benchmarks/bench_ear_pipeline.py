@@ -0,0 +1,100 @@
+"""
+Utterance loss and latency of EmpathEar's capture/recognition pipeline.
+
+    python -m benchmarks.bench_ear_pipeline [--wavs DIR] [--stt-latency 1.5] [--workers 1]
+
+A conversation is assembled from WAV fixtures and played in real time through
+FileAudioSource (which loses audio nobody reads, like a live microphone). The
+recognizer is FakeSTTBackend with a fixed latency, so no network is needed.
+The legacy serial loop (listen, then recognize in the same thread) is run
+first for comparison.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import speech_recognition as sr
+
+from empath.fakes import FakeSTTBackend
+from empath.hearing import EmpathEar, FileAudioSource
+from benchmarks.fixtures import load_wavs, write_wav
+
+SAMPLE_RATE = 16000
+GAP_SECONDS = 1.6 # Longer than SpeechRecognition's pause threshold so phrases split
+
+
+def build_conversation(wavs, repeat):
+    gap = b"\x00\x00" * int(GAP_SECONDS * SAMPLE_RATE)
+    utterances = [pcm for _ in range(repeat) for _, pcm in wavs]
+    return gap.join(utterances) + gap, len(utterances)
+
+
+def run_serial(path, stt_latency, threshold):
+    recognizer = sr.Recognizer()
+    recognizer.energy_threshold = threshold
+    recognizer.dynamic_energy_threshold = False
+    backend = FakeSTTBackend(latency=stt_latency)
+    heard, latencies = 0, []
+    microphone = FileAudioSource(path)
+    with microphone as source:
+        while not source.stream.eof:
+            try:
+                audio = recognizer.listen(source, timeout=2, phrase_time_limit=10)
+            except sr.WaitTimeoutError:
+                continue
+            speech_end = time.time()
+            if backend.transcribe(audio):
+                heard += 1
+                latencies.append(time.time() - speech_end)
+    return heard, latencies, microphone.dropped_seconds
+
+
+def run_pipeline(path, stt_latency, threshold, workers, queue_size):
+    heard = []
+    ear = EmpathEar(callback=heard.append, backend=FakeSTTBackend(latency=stt_latency), source=path, workers=workers, queue_size=queue_size)
+    ear.recognizer.energy_threshold = threshold
+    ear.start_listening()
+    ear.capture_done.wait()
+    while len(ear.segments):
+        time.sleep(0.1)
+    time.sleep(stt_latency * 1.2) # Let in-flight recognitions finish
+    ear.stop_listening()
+    latencies = [s.latencies()["total"] for s in ear.recent if s.delivered_at]
+    return len(heard), latencies, ear.microphone.dropped_seconds, ear.segments.dropped
+
+
+def describe(latencies):
+    if not latencies:
+        return "-"
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return f"p50={statistics.median(ordered):.2f}s p95={p95:.2f}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--wavs", help="Directory of 16-bit WAV utterances (default: synthetic)")
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--stt-latency", type=float, default=1.5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--threshold", type=float, default=300)
+    args = parser.parse_args()
+
+    pcm, total = build_conversation(load_wavs(args.wavs), args.repeat)
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    write_wav(path, pcm)
+    try:
+        print(f"Conversation: {total} utterances, {len(pcm) / (SAMPLE_RATE * 2):.1f}s, STT latency {args.stt_latency}s\n")
+        heard, latencies, dropped = run_serial(path, args.stt_latency, args.threshold)
+        print(f"serial   segments {heard:>3} (expected {total})  speech-end->transcript {describe(latencies)}  audio lost {dropped:.1f}s")
+        heard, latencies, dropped, queue_drops = run_pipeline(path, args.stt_latency, args.threshold, args.workers, args.queue_size)
+        print(f"pipeline segments {heard:>3} (expected {total})  speech-end->callback   {describe(latencies)}  audio lost {dropped:.1f}s  queue drops {queue_drops}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+How often the robot hears, and answers, its own voice.
+
+    python -m benchmarks.bench_echo [--wavs DIR] [--lines 6] [--coupling 0.4]
+
+The robot speaks a series of lines through EmpathVoice (silent output, so
+only the PlaybackActivity sees them) while EmpathEar listens to a mixed WAV
+fixture, played in real time: the robot's lines as the microphone would pick
+them up (scaled by --coupling, delayed, with a little reverb) plus the user's
+utterances, some in the pauses and some talking over the robot. Run without
+and with echo suppression; recognition is FakeSTTBackend, so every delivered
+transcript would have been an LLM call.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+
+from empath.fakes import FakeSTTBackend
+from empath.hearing import EmpathEar
+from empath.playback import NullOutput
+from empath.tts import Speech, TTSBackend
+from empath.voice import EmpathVoice
+from benchmarks.fixtures import load_wavs, synthetic_utterance, write_wav
+
+SAMPLE_RATE = 16000
+ECHO_DELAY = 0.03 # Speaker to microphone, including output latency
+PAUSE = 2.0 # Between turns; longer than SpeechRecognition's pause threshold
+
+
+class FixtureTTS(TTSBackend):
+    """Speaks prepared PCM instantly, so playback lines up with the echo in the fixture."""
+
+    name = "fixture"
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def synthesize(self, text):
+        return Speech(np.frombuffer(self.lines[text], dtype="<i2"), SAMPLE_RATE, text)
+
+
+def build_fixture(robot_lines, user_lines, coupling, seed=0):
+    """
+    Lays out the conversation; returns (mic pcm, robot schedule, user intervals).
+    Every other robot line is answered in the pause after it, every third one
+    is talked over (barge-in) 0.6 s after it starts.
+    """
+    rng = np.random.default_rng(seed)
+    robot, users, t = [], [], 0.5
+    for i, (text, pcm) in enumerate(robot_lines.items()):
+        duration = len(pcm) / (2.0 * SAMPLE_RATE)
+        robot.append((t, text))
+        if i % 3 == 2:
+            users.append((t + 0.6, user_lines[i % len(user_lines)], True))
+        t += duration + PAUSE
+        if i % 2 == 0:
+            users.append((t, user_lines[i % len(user_lines)], False))
+            t += len(user_lines[i % len(user_lines)]) / (2.0 * SAMPLE_RATE) + PAUSE
+
+    mic = rng.normal(0, 60, int((t + 1.0) * SAMPLE_RATE))
+    for start, text in robot:
+        pcm = np.frombuffer(robot_lines[text], dtype="<i2").astype(np.float64)
+        for delay, gain in ((ECHO_DELAY, coupling), (ECHO_DELAY + 0.05, coupling * 0.3)): # Direct path, then reverb
+            at = int((start + delay) * SAMPLE_RATE)
+            mic[at:at + len(pcm)] += gain * pcm[:len(mic) - at]
+    intervals = []
+    for start, pcm, over_robot in users:
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float64)
+        at = int(start * SAMPLE_RATE)
+        mic[at:at + len(samples)] += samples[:len(mic) - at]
+        intervals.append((start, start + len(samples) / float(SAMPLE_RATE), over_robot))
+    return np.clip(mic, -32768, 32767).astype("<i2").tobytes(), robot, intervals
+
+
+def run(path, robot_lines, robot, users, suppress, threshold):
+    voice = EmpathVoice(backends=[FixtureTTS(robot_lines)], output=NullOutput())
+    onsets = []
+    ear = EmpathEar(callback=lambda text: None, backend=FakeSTTBackend(latency=0.2), source=path,
+                    on_speech_start=lambda: onsets.append(time.time()),
+                    playback=voice.activity if suppress else None)
+    ear.recognizer.energy_threshold = threshold
+    ear.start_listening()
+
+    # The file plays against the wall clock from its first read: speak the robot's lines on the same clock
+    while getattr(getattr(ear.microphone, "stream", None), "started", None) is None:
+        time.sleep(0.001)
+    started = ear.microphone.stream.started
+
+    def speak():
+        for at, text in robot:
+            time.sleep(max(0.0, started + at - time.time()))
+            voice.speak(text)
+    threading.Thread(target=speak, daemon=True).start()
+
+    ear.capture_done.wait()
+    while len(ear.segments):
+        time.sleep(0.05)
+    time.sleep(0.5)
+    ear.stop_listening()
+    voice.shutdown()
+
+    def user_during(start, end):
+        return any(s < end and start < e for s, e, _ in users)
+
+    delivered = [s for s in ear.recent if s.text and not s.echo]
+    spans = []
+    for segment in delivered:
+        end = segment.speech_end - started
+        spans.append((end - len(segment.audio.frame_data) / (2.0 * SAMPLE_RATE), end))
+    self_triggers = sum(1 for start, end in spans if not user_during(start, end))
+    heard = sum(1 for s, e, _ in users if any(start < e and s < end for start, end in spans))
+    onset_times = [at - started for at in onsets]
+    false_barge_ins = sum(1 for at in onset_times if not user_during(at - 0.5, at))
+    over = [(s, e) for s, e, over_robot in users if over_robot]
+    caught = sum(1 for s, e in over if any(s <= at <= e for at in onset_times))
+    return self_triggers, heard, false_barge_ins, caught, len(over), ear.backend.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--wavs", help="Directory of 16-bit WAV user utterances (default: synthetic)")
+    parser.add_argument("--lines", type=int, default=6, help="Robot lines")
+    parser.add_argument("--coupling", type=float, default=0.4, help="Speaker-to-mic gain of the echo")
+    parser.add_argument("--threshold", type=float, default=300)
+    args = parser.parse_args()
+
+    robot_lines = {
+        f"Robot line {i}.": synthetic_utterance(1.5 + 0.4 * (i % 3), SAMPLE_RATE, seed=100 + i, lead_silence=0.0, tail_silence=0.0)
+        for i in range(args.lines)
+    }
+    user_lines = [pcm for _, pcm in load_wavs(args.wavs, sample_rate=SAMPLE_RATE)]
+    pcm, robot, users = build_fixture(robot_lines, user_lines, args.coupling)
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    write_wav(path, pcm)
+    try:
+        print(f"{len(robot)} robot lines, {len(users)} user utterances ({sum(1 for u in users if u[2])} over the robot), "
+              f"{len(pcm) / (2.0 * SAMPLE_RATE):.1f}s, echo coupling {args.coupling}\n")
+        print(f"{'':<18}{'self-triggers':>15}{'user heard':>12}{'false barge-ins':>17}{'barge-ins caught':>18}{'STT calls':>11}")
+        for name, suppress in (("no suppression", False), ("echo suppression", True)):
+            self_triggers, heard, false_barge_ins, caught, over, calls = run(path, robot_lines, robot, users, suppress, args.threshold)
+            print(f"{name:<18}{self_triggers:>15}{f'{heard}/{len(users)}':>12}{false_barge_ins:>17}{f'{caught}/{over}':>18}{calls:>11}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
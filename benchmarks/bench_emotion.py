@@ -0,0 +1,117 @@
+"""
+Throughput of the facial-expression classifier, batched versus one call per face.
+
+    python -m benchmarks.bench_emotion [--model emotion-ferplus-8.onnx] [--backends onnxruntime,opencv]
+    python -m benchmarks.bench_emotion --labeled DIR   # also fit the calibration temperature
+
+Reports faces/s for groups of 1, 3 and 6 faces on each backend, and the
+cost of AsyncEmotionClassifier.submit (the only part that runs on the
+vision loop). With --labeled DIR (one sub-directory of face crops per
+label, e.g. DIR/happy/*.png) it fits EMPATH_FER_TEMPERATURE and reports
+the expected calibration error before and after.
+"""
+import argparse
+import glob
+import os
+import time
+import cv2
+import numpy as np
+
+from empath.emotion_classifier import EmotionClassifier, AsyncEmotionClassifier, softmax, fit_temperature
+from benchmarks.fixtures import synthetic_face_scene
+
+
+class _Box:
+    __slots__ = ("id", "box")
+
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = tuple(box)
+
+
+def faces_per_second(classifier, batch, batched, seconds=1.0):
+    classifier.batched = batched
+    classifier.classify(batch) # Warm-up
+    runs, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        classifier.classify(batch)
+        runs += 1
+    return runs * len(batch) / (time.perf_counter() - start)
+
+
+def expected_calibration_error(probs, labels, bins=10):
+    confidence, predicted = probs.max(axis=1), probs.argmax(axis=1)
+    correct = predicted == labels
+    edges = np.linspace(0, 1, bins + 1)
+    error = 0.0
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        inside = (confidence > lo) & (confidence <= hi)
+        if inside.any():
+            error += inside.mean() * abs(correct[inside].mean() - confidence[inside].mean())
+    return error
+
+
+def calibrate(classifier, directory):
+    crops, labels = [], []
+    for index, label in enumerate(classifier.labels):
+        for path in sorted(glob.glob(os.path.join(directory, label, "*"))):
+            image = cv2.imread(path)
+            if image is not None:
+                crops.append(classifier.preprocess(image, [(0, 0, image.shape[1], image.shape[0])])[0])
+                labels.append(index)
+    if not crops:
+        print(f"No labeled crops under {directory}")
+        return
+    logits = np.concatenate([classifier._forward(np.stack(crops[i:i + 32])) for i in range(0, len(crops), 32)])
+    labels = np.array(labels)
+    temperature = fit_temperature(logits, labels)
+    accuracy = (logits.argmax(axis=1) == labels).mean()
+    print(f"\n{len(labels)} labeled crops, accuracy {accuracy:.0%}")
+    print(f"ECE at T=1.0: {expected_calibration_error(softmax(logits), labels):.3f}")
+    print(f"ECE at T={temperature:.1f}: {expected_calibration_error(softmax(logits, temperature), labels):.3f}  -> EMPATH_FER_TEMPERATURE={temperature:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=os.getenv("EMPATH_FER_MODEL", "emotion-ferplus-8.onnx"))
+    parser.add_argument("--backends", default="onnxruntime,opencv")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time per measurement")
+    parser.add_argument("--labeled", help="Directory of labeled face crops for calibration")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model):
+        print(f"Emotion model not found at '{args.model}'. Download emotion-ferplus-8.onnx from the ONNX model zoo and pass --model.")
+        return
+
+    print(f"{'backend':<13}{'faces':>6}{'one by one':>12}{'batched':>10}{'submit ms':>11}   (faces/s)")
+    classifier = None
+    for backend in args.backends.split(","):
+        try:
+            classifier = EmotionClassifier(model=args.model, backend=backend)
+        except Exception as e:
+            print(f"{backend:<13}  skipped: {e}")
+            continue
+        supports_batch = classifier.batched
+        for faces in (1, 3, 6):
+            frame, labels = synthetic_face_scene(640, 360, faces=faces, seed=faces)
+            boxes = [label["box"] for label in labels]
+            batch = classifier.preprocess(frame, boxes)
+            single = faces_per_second(classifier, batch, False, args.seconds)
+            batched = f"{faces_per_second(classifier, batch, True, args.seconds):.0f}" if supports_batch else "n/a"
+
+            worker = AsyncEmotionClassifier(classifier, interval=0)
+            tracks = [_Box(i, box) for i, box in enumerate(boxes)]
+            start = time.perf_counter()
+            for _ in range(100):
+                worker.submit(frame, tracks)
+            submit_ms = (time.perf_counter() - start) * 10
+            worker.close()
+            print(f"{backend:<13}{faces:>6}{single:>12.0f}{batched:>10}{submit_ms:>11.3f}")
+        classifier.batched = supports_batch
+
+    if args.labeled and classifier is not None:
+        calibrate(classifier, args.labeled)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Per-frame latency and recall of the face detector backends.
+
+    python -m benchmarks.bench_face_detectors [--fixtures DIR] [--detectors haar,yunet] [--iou 0.4]
+
+DIR holds images plus a labels.json ({"img.jpg": [{"box": [x, y, w, h]}, ...]});
+without it, synthetic scenes with 1-3 cartoon faces are generated. A labeled
+face counts as found when a detection overlaps it with IoU >= --iou.
+Backends whose dependencies or model files are missing are skipped.
+"""
+import argparse
+import statistics
+import time
+
+from empath.face_detectors import DETECTORS, create_detector
+from benchmarks.fixtures import load_face_fixtures, iou
+
+
+def evaluate(detector, fixtures, iou_threshold, repeats):
+    latencies = []
+    found = labeled = false_positives = 0
+    for _, frame, labels in fixtures:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            detections = detector.detect(frame)
+            latencies.append((time.perf_counter() - start) * 1000)
+        matched = set()
+        for label in labels:
+            scores = [(iou(label["box"], d.box), i) for i, d in enumerate(detections) if i not in matched]
+            best = max(scores, default=(0.0, None))
+            if best[0] >= iou_threshold:
+                matched.add(best[1])
+                found += 1
+        labeled += len(labels)
+        false_positives += len(detections) - len(matched)
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "recall": found / labeled if labeled else 0.0,
+        "false_positives": false_positives,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", help="Directory of labeled images (default: synthetic)")
+    parser.add_argument("--detectors", default=",".join(DETECTORS))
+    parser.add_argument("--iou", type=float, default=0.4)
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per image")
+    args = parser.parse_args()
+
+    fixtures = load_face_fixtures(args.fixtures)
+    height, width = fixtures[0][1].shape[:2]
+    print(f"{len(fixtures)} images ({width}x{height}), {sum(len(f[2]) for f in fixtures)} labeled faces\n")
+    print(f"{'detector':<12}{'p50 ms':>9}{'p95 ms':>9}{'FPS':>8}{'recall':>9}{'FP':>6}")
+    for name in args.detectors.split(","):
+        try:
+            detector = create_detector(name)
+        except Exception as e:
+            print(f"{name:<12}  skipped: {e}")
+            continue
+        result = evaluate(detector, fixtures, args.iou, args.repeats)
+        print(f"{name:<12}{result['p50']:>9.2f}{result['p95']:>9.2f}{1000 / result['p50']:>8.1f}"
+              f"{result['recall']:>9.0%}{result['false_positives']:>6}")
+
+
+if __name__ == "__main__":
+    main()
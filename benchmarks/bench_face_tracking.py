@@ -0,0 +1,65 @@
+"""
+Vision cost of detect-every-frame versus detect-then-track.
+
+    python -m benchmarks.bench_face_tracking [--detector haar] [--modes off,roi,flow] [--every 10]
+
+Runs FaceTracker over a synthetic clip of people swaying in front of the
+camera and reports mean per-frame cost, how often the full detector ran,
+recall (IoU >= 0.4) and ID switches (a person picking up a new track ID).
+"""
+import argparse
+import time
+
+from empath.face_detectors import create_detector
+from empath.face_tracker import FaceTracker
+from benchmarks.fixtures import synthetic_face_video, iou
+
+
+def run(tracker, clip):
+    elapsed = 0.0
+    found = labeled = switches = 0
+    identity = {} # labeled person -> track id last seen on them
+    for frame, labels in clip:
+        start = time.perf_counter()
+        tracks = tracker.update(frame)
+        elapsed += time.perf_counter() - start
+        for person, label in enumerate(labels):
+            best = max(tracks, key=lambda t: iou(label["box"], t.box), default=None)
+            labeled += 1
+            if best is None or iou(label["box"], best.box) < 0.4:
+                continue
+            found += 1
+            if person in identity and identity[person] != best.id:
+                switches += 1
+            identity[person] = best.id
+    return elapsed / len(clip) * 1000, found / labeled, switches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--detector", default="haar")
+    parser.add_argument("--modes", default="off,roi,flow,mil,kcf,csrt")
+    parser.add_argument("--every", type=int, default=10, help="Full detection every N frames")
+    parser.add_argument("--frames", type=int, default=90)
+    parser.add_argument("--faces", type=int, default=2)
+    args = parser.parse_args()
+
+    clip = list(synthetic_face_video(args.frames, faces=args.faces))
+    detector = create_detector(args.detector)
+    print(f"{args.frames} frames, {args.faces} faces, detector={detector.name}\n")
+    print(f"{'mode':<8}{'ms/frame':>10}{'speedup':>9}{'detect %':>10}{'recall':>8}{'ID switches':>13}")
+    baseline = None
+    for mode in args.modes.split(","):
+        try:
+            tracker = FaceTracker(detector, mode=mode, detect_every=args.every)
+        except Exception as e:
+            print(f"{mode:<8}  skipped: {e}")
+            continue
+        ms, recall, switches = run(tracker, clip)
+        baseline = baseline or ms
+        stats = tracker.stats()
+        print(f"{mode:<8}{ms:>10.1f}{baseline / ms:>8.1f}x{stats['detect_ratio']:>10.0%}{recall:>8.0%}{switches:>13}")
+
+
+if __name__ == "__main__":
+    main()
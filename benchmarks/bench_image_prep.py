@@ -0,0 +1,74 @@
+"""
+Encode time and payload size of the Gemini VLA image-prep stage.
+
+    python -m benchmarks.bench_image_prep [--frames DIR] [--repeat N]
+
+The first row reproduces the legacy path (BGR->RGB, PIL, full-resolution PNG).
+"""
+import argparse
+import io
+import statistics
+import time
+import cv2
+import PIL.Image
+
+from empath.image_prep import FramePreprocessor, frame_hash
+from benchmarks.fixtures import load_frames
+
+SETTINGS = [
+    ("png", None, None),
+    ("jpeg", 1280, 85),
+    ("jpeg", 640, 80),
+    ("jpeg", 512, 70),
+    ("webp", 640, 80),
+    ("webp", 512, 70),
+]
+
+
+def legacy_png(frame):
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    pil_img = PIL.Image.fromarray(rgb_frame)
+    img_byte_arr = io.BytesIO()
+    pil_img.save(img_byte_arr, format='PNG')
+    return img_byte_arr.getvalue()
+
+
+def time_call(fn, frames, repeat):
+    times, sizes = [], []
+    for _ in range(repeat):
+        for frame in frames:
+            start = time.perf_counter()
+            data = fn(frame)
+            times.append((time.perf_counter() - start) * 1000)
+            sizes.append(len(data))
+    return statistics.median(times), statistics.mean(sizes) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", help="Directory of captured frames (default: synthetic 1280x720)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames)
+    print(f"{'setting':<22}{'encode ms (p50)':>18}{'payload KiB':>14}")
+
+    ms, kib = time_call(legacy_png, frames, args.repeat)
+    print(f"{'legacy PIL png':<22}{ms:>18.2f}{kib:>14.1f}")
+
+    for codec, max_side, quality in SETTINGS:
+        prep = FramePreprocessor(max_side=max_side or 100000, codec=codec, quality=quality or 80)
+        ms, kib = time_call(lambda f: prep.encode(f)[0], frames, args.repeat)
+        label = f"{codec} {max_side or 'full'}" + (f" q{quality}" if quality else "")
+        print(f"{label:<22}{ms:>18.2f}{kib:>14.1f}")
+
+    # Static scene: hash + cache lookup is all a repeated question pays
+    prep = FramePreprocessor()
+    prep.prepare(frames[0])
+    ms, _ = time_call(lambda f: prep.prepare(f)[0], frames[:1], args.repeat * 10)
+    hash_ms, _ = time_call(lambda f: frame_hash(f).to_bytes(8, "big"), frames, args.repeat)
+    print(f"\ncache hit (static scene): {ms:.3f} ms   dHash: {hash_ms:.3f} ms   {prep.stats()}")
+
+
+if __name__ == "__main__":
+    main()
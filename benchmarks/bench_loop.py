@@ -0,0 +1,349 @@
+"""
+Replay benchmark for the whole interaction loop, compared against a saved baseline.
+
+    python -m benchmarks.bench_loop --baseline FILE [--save] [--package both] [--frames DIR] [--wavs DIR]
+                                    [--session FILE] [--llm-latency 0.4] [--tts-latency 0.3]
+
+Every stage replays fixtures (recorded ones when given, synthetic otherwise),
+with the LLM, STT and TTS replaced by the deterministic fakes from fakes.py:
+
+  vision  EmpathEye.analyze_frame over a clip: FPS and ms/frame
+  wake    EngagementGate (the activation rule of on_hear_text) over the session
+          transcripts, on the session's own clock: decisions/s and mismatches
+  brain   EmpathBrain.process_query for every turn that activates the robot
+          (FakeGenAIClient, --llm-latency), then again from the response cache
+  loop    the session's first --turns turns as one live WAV through EmpathEar
+          -> gate -> brain.stream_query -> EmpathVoice (silent output) ->
+          gestures; per-stage latencies come from the tracer, as on /metrics.
+          Without SpeechRecognition the transcripts are fed to the gate directly.
+
+Memory is the tracemalloc peak of each stage plus the process max RSS.
+Both the `empath` package and the `reachy_mini_empath` app are covered. With
+--save the results become the baseline; otherwise they are compared with it
+and any metric worse by more than --tolerance is a regression (exit code 1).
+Timings depend on the machine, so no baseline ships with the repo: record
+one with --save on the machine (and with the same stages and fixtures) the
+comparisons will run on. The baseline notes the machine it was recorded on,
+and a comparison on a different one is flagged.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from benchmarks.fixtures import load_frames, load_wavs, synthetic_face_video, write_wav
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "reachy_mini_empath")
+DEFAULT_SESSION = os.path.join(os.path.dirname(__file__), "data", "session.json")
+PACKAGES = ("empath", "reachy_mini_empath")
+MODULES = ("detector", "brain", "voice", "hearing", "wake_words", "fakes", "playback", "motion", "tracing")
+
+SAMPLE_RATE = 16000
+PAUSE = 2.0 # Between turns in the replayed audio; longer than SpeechRecognition's pause threshold
+GESTURE_SECONDS = 0.8
+HIGHER_IS_BETTER = ("fps", "per_s")
+
+
+def load_package(name):
+    """The package's modules as one namespace, so the same stages drive either entry point."""
+    if name == "reachy_mini_empath" and APP_DIR not in sys.path:
+        sys.path.insert(0, APP_DIR) # The app is a package inside its own project directory
+    return SimpleNamespace(**{module: importlib.import_module(f"{name}.{module}") for module in MODULES})
+
+
+def distribution(seconds, percentile):
+    values = sorted(seconds)
+    return {"p50_ms": percentile(values, 50), "p95_ms": percentile(values, 95), "p99_ms": percentile(values, 99)}
+
+
+@contextmanager
+def measured(result):
+    """Times a stage and records its tracemalloc peak (MiB) into `result`."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["wall_s"] = round(time.perf_counter() - start, 3)
+        result["peak_mib"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+
+
+# --- Stages ---
+
+def bench_vision(pkg, frames):
+    eye = pkg.detector.EmpathEye()
+    eye.analyze_frame(frames[0]) # Warm-up: detector and classifier initialisation
+    result, times = {}, []
+    with measured(result):
+        for frame in frames:
+            start = time.perf_counter()
+            eye.analyze_frame(frame, annotate=False)
+            times.append(time.perf_counter() - start)
+    if eye.emotions:
+        eye.emotions.close()
+    result["fps"] = round(len(times) / sum(times), 1)
+    result.update(distribution(times, pkg.tracing.percentile))
+    return result
+
+
+def bench_wake(pkg, turns, rounds=200):
+    gate = pkg.wake_words.EngagementGate()
+    result, times = {}, []
+    with measured(result):
+        for _ in range(rounds):
+            gate.last_engagement = -gate.window # Every replay starts disengaged
+            decisions = []
+            for turn in turns:
+                start = time.perf_counter()
+                active, reason, _ = gate.decide(turn["text"], turn.get("emotion", "neutral"), at=turn["at"])
+                times.append(time.perf_counter() - start)
+                if active:
+                    gate.engage(at=turn["at"])
+                decisions.append((active, reason))
+    mismatches = [t["text"] for t, (active, _) in zip(turns, decisions) if "expect" in t and active != t["expect"]]
+    for text in mismatches:
+        print(f"    ⚠️ gate disagrees with the fixture on {text!r}")
+    result["per_s"] = round(len(times) / sum(times))
+    result["activated"] = sum(1 for active, _ in decisions if active)
+    result["mismatches"] = len(mismatches)
+    result.update(distribution(times, pkg.tracing.percentile))
+    return result, [t for t, (active, _) in zip(turns, decisions) if active]
+
+
+def make_brain(pkg, llm_latency):
+    # Only the fakes answer: no Gemini key, no HF login
+    for key in ("GEMINI_API_KEY", "HF_TOKEN"):
+        os.environ.pop(key, None)
+    client = pkg.fakes.FakeGenAIClient(first_token_delay=llm_latency, chunk_delay=llm_latency / 8)
+    return pkg.brain.EmpathBrain(genai_client=client)
+
+
+def bench_brain(pkg, turns, frames, llm_latency):
+    brain = make_brain(pkg, llm_latency)
+    result = {}
+    cold, cached = [], []
+    with measured(result):
+        for times in (cold, cached): # The second pass is answered from the response cache
+            for i, turn in enumerate(turns):
+                start = time.perf_counter()
+                brain.process_query(turn["text"], turn.get("emotion", "neutral"), frame=frames[i % len(frames)])
+                times.append(time.perf_counter() - start)
+    brain.shutdown()
+    result.update(distribution(cold, pkg.tracing.percentile))
+    result["cached_p50_ms"] = pkg.tracing.percentile(sorted(cached), 50)
+    result["cache_hit_rate"] = brain.cache.stats().get("hit_rate")
+    return result
+
+
+def bench_loop(pkg, turns, user_audio, frames, args):
+    """The app's reply path end to end; returns the tracer's per-stage latencies."""
+    tracer = pkg.tracing.tracer
+    tracer.enabled = True # Even if EMPATH_TRACE=0: the tracer is the measurement here
+    brain = make_brain(pkg, args.llm_latency)
+    voice = pkg.voice.EmpathVoice(backends=[pkg.fakes.FakeTTSBackend(latency=args.tts_latency)], output=pkg.playback.NullOutput())
+    motion = pkg.motion.MotionScheduler()
+    gate = pkg.wake_words.EngagementGate()
+    gate.last_engagement = -gate.window
+    emotions = {turn["text"]: turn.get("emotion", "neutral") for turn in turns}
+
+    def on_hear_text(text):
+        # Same flow as on_hear_text in both apps, on a robot without motors or a camera feed
+        raw_text = text.lower().strip()
+        with tracer.span("wake_word") as span:
+            is_active, reason, _ = gate.decide(raw_text, emotions.get(raw_text, "neutral"))
+            span.set(active=is_active, reason=reason)
+        if not is_active:
+            return
+        gate.engage()
+        motion.submit("agree", lambda cancel: cancel.wait(GESTURE_SECONDS))
+
+        def reply():
+            try:
+                voice.speak_stream(brain.stream_query(raw_text, emotions.get(raw_text, "neutral"), frame=frames[0]))
+            except pkg.brain.BrainBusyError:
+                pass
+        threading.Thread(target=tracer.wrap(reply), daemon=True).start()
+
+    result = {}
+    with measured(result):
+        if pkg.hearing.AUDIO_AVAILABLE:
+            replay_audio(pkg, turns, user_audio, on_hear_text, args.stt_latency, voice)
+        else:
+            replay_text(tracer, turns, on_hear_text, args.stt_latency)
+        deadline = time.time() + 30
+        while (voice.speaking or voice.pending or brain.pending or motion.busy or motion.pending) and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.2) # Let the last trace be released
+    voice.shutdown()
+    motion.shutdown()
+    brain.shutdown()
+
+    metrics = tracer.metrics()
+    result["interactions"] = metrics["interactions"]
+    for stage, stats in metrics["stages"].items():
+        result[stage] = {key: stats[key] for key in ("count", "p50_ms", "p95_ms", "p99_ms")}
+    return result
+
+
+def replay_audio(pkg, turns, user_audio, callback, stt_latency, voice):
+    """
+    The turns as one WAV played in real time into EmpathEar; the fake STT
+    returns their transcripts in order. Wired like the apps: barge-in stops
+    the reply still playing when the next turn starts.
+    """
+    pcm = b"".join(user_audio[i % len(user_audio)] + bytes(int(PAUSE * SAMPLE_RATE) * 2) for i in range(len(turns)))
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    write_wav(path, pcm)
+    try:
+        stt = pkg.fakes.FakeSTTBackend(transcripts=[t["text"] for t in turns], latency=stt_latency)
+        ear = pkg.hearing.EmpathEar(callback=callback, backend=stt, source=path, on_speech_start=voice.barge_in, playback=voice.activity)
+        ear.recognizer.energy_threshold = 300
+        ear.start_listening()
+        ear.capture_done.wait()
+        while len(ear.segments):
+            time.sleep(0.05)
+        time.sleep(stt_latency + 0.1) # The last utterance is still being recognized
+        ear.stop_listening()
+    finally:
+        os.remove(path)
+
+
+def replay_text(tracer, turns, callback, stt_latency):
+    for turn in turns:
+        trace = tracer.begin(stt="replay")
+        time.sleep(stt_latency)
+        trace.add_span("stt", trace.start, time.time())
+        try:
+            with tracer.activate(trace):
+                callback(turn["text"])
+        finally:
+            trace.release()
+        time.sleep(PAUSE)
+
+
+# --- Baseline ---
+
+def machine():
+    """Where the numbers were taken; a baseline is only meaningful on the same machine."""
+    return {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def compare(results, baseline, tolerance, floor_ms):
+    """Prints every metric next to its baseline; returns the regressions (ms changes under `floor_ms` are noise)."""
+    regressions = []
+
+    def walk(current, saved, path):
+        for key, value in current.items():
+            old = saved.get(key) if isinstance(saved, dict) else None
+            if isinstance(value, dict):
+                walk(value, old or {}, path + [key])
+                continue
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / abs(old)
+            worse = -change if key in HIGHER_IS_BETTER else change
+            if key.endswith("_ms") or key.endswith("_mib") or key in HIGHER_IS_BETTER:
+                noise = key.endswith("_ms") and abs(value - old) < floor_ms
+                flag = "  REGRESSION" if worse > tolerance and not noise else ""
+                if flag:
+                    regressions.append(".".join(path + [key]))
+                print(f"  {'.'.join(path + [key]):<48}{old:>12}{value:>12}{change:>+9.0%}{flag}")
+
+    print(f"\n{'vs baseline':<50}{'baseline':>12}{'now':>12}{'change':>9}")
+    walk(results, baseline, [])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--package", default="both", choices=PACKAGES + ("both",))
+    parser.add_argument("--frames", help="Directory of recorded frames (default: synthetic clip)")
+    parser.add_argument("--wavs", help="Directory of 16-bit WAV user utterances (default: synthetic)")
+    parser.add_argument("--session", default=DEFAULT_SESSION, help="JSON transcript fixture")
+    parser.add_argument("--clip", type=int, default=60, help="Synthetic frames for the vision stage")
+    parser.add_argument("--turns", type=int, default=8, help="Session turns replayed through the live loop")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="Fake LLM time to first token (s)")
+    parser.add_argument("--stt-latency", type=float, default=0.3, help="Fake STT time per utterance (s)")
+    parser.add_argument("--tts-latency", type=float, default=0.3, help="Fake TTS time per sentence (s)")
+    parser.add_argument("--stages", default="vision,wake,brain,loop")
+    parser.add_argument("--baseline", required=True, help="Baseline JSON recorded with --save on this machine")
+    parser.add_argument("--save", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before a regression")
+    parser.add_argument("--floor-ms", type=float, default=2.0, help="Latency changes smaller than this are never regressions")
+    args = parser.parse_args()
+    if not args.save and not os.path.exists(args.baseline):
+        parser.error(f"no baseline at {args.baseline}; record one on this machine with --save --baseline {args.baseline}")
+
+    with open(args.session) as f:
+        turns = json.load(f)["turns"]
+    if args.frames:
+        frames = load_frames(args.frames)
+    else:
+        frames = [frame for frame, _ in synthetic_face_video(args.clip, faces=2)]
+    user_audio = [pcm for _, pcm in load_wavs(args.wavs, sample_rate=SAMPLE_RATE)]
+    stages = set(args.stages.split(","))
+    packages = PACKAGES if args.package == "both" else (args.package,)
+
+    results = {}
+    for name in packages:
+        print(f"\n=== {name} ===")
+        pkg = load_package(name)
+        results[name] = report = {}
+        active = [t for t in turns if t.get("expect", True)]
+        if "vision" in stages:
+            report["vision"] = bench_vision(pkg, frames)
+            print(f"vision  {report['vision']['fps']:>8} fps   p50 {report['vision']['p50_ms']} ms   p95 {report['vision']['p95_ms']} ms   peak {report['vision']['peak_mib']} MiB")
+        if "wake" in stages:
+            report["wake"], active = bench_wake(pkg, turns)
+            print(f"wake    {report['wake']['per_s']:>8,} decisions/s   {report['wake']['activated']}/{len(turns)} activated   {report['wake']['mismatches']} mismatches")
+        if "brain" in stages:
+            report["brain"] = bench_brain(pkg, active, frames, args.llm_latency)
+            print(f"brain   p50 {report['brain']['p50_ms']} ms   p95 {report['brain']['p95_ms']} ms   cached p50 {report['brain']['cached_p50_ms']} ms")
+        if "loop" in stages:
+            report["loop"] = bench_loop(pkg, turns[:args.turns], user_audio, frames, args)
+            print(f"loop    {report['loop']['interactions']} interactions")
+            for stage, stats in report["loop"].items():
+                if isinstance(stats, dict) and "count" in stats:
+                    print(f"  {stage:<26}{stats['count']:>5}  p50 {stats['p50_ms']:>8} ms  p95 {stats['p95_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms")
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results["max_rss_mib"] = round(rss / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+    print(f"\nmax RSS {results['max_rss_mib']} MiB")
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(dict(results, machine=machine()), f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    recorded_on = baseline.get("machine")
+    if recorded_on != machine():
+        print(f"\n⚠️ Baseline was recorded on another machine ({recorded_on or 'unknown'}); expect differences that are not regressions.")
+    regressions = compare(results, baseline, args.tolerance, args.floor_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Real-time factor of the offline speech engines on recorded WAV fixtures.
+
+    python -m benchmarks.bench_stt --backend vosk [--wavs DIR] [--chunk-ms 100]
+
+Audio is fed in capture-sized chunks exactly as EmpathEar's stream loop does.
+RTF = processing time / audio duration (below 1.0 keeps up with the mic).
+Also reports the delay until the first partial transcript, which bounds how
+early a wake word can fire.
+"""
+import argparse
+import statistics
+import time
+
+from empath.stt import create_backend
+from benchmarks.fixtures import load_wavs
+
+SAMPLE_RATE = 16000
+
+
+def run_stream(backend, pcm, chunk_bytes):
+    stream = backend.create_stream()
+    first_partial = None
+    finals = []
+    start = time.perf_counter()
+    for offset in range(0, len(pcm), chunk_bytes):
+        partial, final = stream.accept(pcm[offset:offset + chunk_bytes])
+        if partial and first_partial is None:
+            # Audio position (not wall time) at which the partial became available
+            first_partial = (offset + chunk_bytes) / (SAMPLE_RATE * 2)
+        if final:
+            finals.append(final)
+    tail = stream.finish()
+    if tail:
+        finals.append(tail)
+    return time.perf_counter() - start, first_partial, " ".join(finals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", default="vosk", help="vosk | whisper_cpp")
+    parser.add_argument("--wavs", help="Directory of 16-bit WAV recordings (default: synthetic)")
+    parser.add_argument("--chunk-ms", type=int, default=100)
+    args = parser.parse_args()
+
+    backend = create_backend(args.backend)
+    if not backend.streaming:
+        raise SystemExit(f"{args.backend} is not a local streaming backend")
+    chunk_bytes = int(SAMPLE_RATE * args.chunk_ms / 1000) * 2
+
+    rtfs = []
+    print(f"{'fixture':<28}{'audio s':>9}{'proc s':>9}{'RTF':>7}{'1st partial s':>15}  transcript")
+    for name, pcm in load_wavs(args.wavs):
+        duration = len(pcm) / (SAMPLE_RATE * 2)
+        elapsed, first_partial, text = run_stream(backend, pcm, chunk_bytes)
+        rtfs.append(elapsed / duration)
+        partial = f"{first_partial:.2f}" if first_partial is not None else "-"
+        print(f"{name:<28}{duration:>9.2f}{elapsed:>9.2f}{elapsed / duration:>7.2f}{partial:>15}  {text!r}")
+
+    print(f"\n{backend.name}: RTF p50={statistics.median(rtfs):.3f} max={max(rtfs):.3f} over {len(rtfs)} fixtures")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Time from "say this" to audio ready, cold versus from the speech cache.
+
+    python -m benchmarks.bench_tts [--backends espeak,piper,gtts] [--fake]
+
+For each TTS backend, every fixed phrase is synthesized cold, then asked
+for again (memory cache), then loaded by a fresh voice from the on-disk
+cache, as after a restart. --fake uses FakeTTSBackend (0.3 s latency,
+like a network engine) when no real engine is installed.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+from empath.tts import create_tts, SpeechCache
+from empath.voice import EmpathVoice, FIXED_PHRASES
+from empath.playback import NullOutput
+from empath.fakes import FakeTTSBackend
+
+
+def time_phrases(voice, phrases):
+    times, audio = [], 0.0
+    for phrase in phrases:
+        start = time.perf_counter()
+        speech = voice.synthesize(phrase)
+        times.append((time.perf_counter() - start) * 1000)
+        audio += speech.duration if speech is not None else 0.0
+    return statistics.median(times), max(times), audio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", default="espeak,piper,gtts")
+    parser.add_argument("--fake", action="store_true", help="Also time FakeTTSBackend")
+    args = parser.parse_args()
+
+    backends = create_tts(args.backends)
+    if args.fake or not backends:
+        backends.append(FakeTTSBackend())
+
+    print(f"{len(FIXED_PHRASES)} fixed phrases, median / max ms to audio\n")
+    print(f"{'backend':<10}{'cold':>16}{'memory cache':>16}{'disk cache':>16}{'audio s':>9}")
+    for backend in backends:
+        directory = tempfile.mkdtemp(prefix="empath_tts_")
+        voice = EmpathVoice(backends=[backend], output=NullOutput(), cache=SpeechCache(directory=directory))
+        cold_median, cold_max, audio = time_phrases(voice, FIXED_PHRASES)
+        warm_median, warm_max, _ = time_phrases(voice, FIXED_PHRASES)
+        restarted = EmpathVoice(backends=[backend], output=NullOutput(), cache=SpeechCache(directory=directory))
+        disk_median, disk_max, _ = time_phrases(restarted, FIXED_PHRASES)
+        cells = [f"{m:.1f} / {x:.1f}" for m, x in ((cold_median, cold_max), (warm_median, warm_max), (disk_median, disk_max))]
+        print(f"{backend.name:<10}{cells[0]:>16}{cells[1]:>16}{cells[2]:>16}{audio:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
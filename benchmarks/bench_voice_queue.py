@@ -0,0 +1,90 @@
+"""
+Turn-taking under a burst of replies: thread-per-utterance versus the speech queue.
+
+    python -m benchmarks.bench_voice_queue [--replies 8] [--barge-in 3.0]
+
+A burst of replies (about 1.5 s of speech each) arrives 0.1 s apart, then
+the user starts talking at --barge-in seconds. Reports lines played out of
+order, lines played in total and after the barge-in, and how long the
+robot kept talking after it. Uses FakeTTSBackend and a silent output, so
+it runs anywhere.
+"""
+import argparse
+import threading
+import time
+
+from empath.voice import EmpathVoice
+from empath.fakes import FakeTTSBackend
+from empath.playback import NullOutput
+
+
+class RecordingOutput(NullOutput):
+    """NullOutput that logs when each line started and stopped."""
+
+    def __init__(self):
+        self.log = [] # (text, start, end)
+
+    def play(self, speech, cancel=None):
+        start = time.perf_counter()
+        done = super().play(speech, cancel)
+        self.log.append((speech.text, start, time.perf_counter()))
+        return done
+
+
+def legacy_voice(voice, threads):
+    """The old EmpathVoice.speak: one thread per line, all contending on one lock."""
+    lock = threading.Lock()
+
+    def speak(text, **_):
+        def run():
+            with lock:
+                speech = voice.synthesize(text)
+                if speech is not None:
+                    voice.output.play(speech)
+        threads.append(threading.Thread(target=run, daemon=True))
+        threads[-1].start()
+    return speak
+
+
+def run(name, replies, barge_in_at):
+    output = RecordingOutput()
+    voice = EmpathVoice(backends=[FakeTTSBackend(latency=0.2, seconds_per_char=0.06)], output=output)
+    threads = []
+    speak = legacy_voice(voice, threads) if name == "thread per line" else voice.speak
+    lines = [f"Reply {i}, with a few words." for i in range(replies)]
+
+    start = time.perf_counter()
+    for line in lines:
+        speak(line)
+        time.sleep(0.1)
+    time.sleep(max(0.0, barge_in_at - (time.perf_counter() - start)))
+    barge_in = time.perf_counter()
+    if name != "thread per line":
+        voice.barge_in()
+
+    time.sleep(0.2)
+    while voice.speaking or voice.pending or any(t.is_alive() for t in threads):
+        time.sleep(0.05)
+    voice.shutdown()
+
+    order = [lines.index(text) for text, _, _ in sorted(output.log, key=lambda entry: entry[1])]
+    inversions = sum(1 for a, b in zip(order, order[1:]) if b < a)
+    started_after = sum(1 for _, s, _ in output.log if s >= barge_in)
+    talked_after = max((end for _, _, end in output.log), default=barge_in) - barge_in
+    return inversions, len(output.log), started_after, max(0.0, talked_after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--replies", type=int, default=8)
+    parser.add_argument("--barge-in", type=float, default=3.0, help="Seconds until the user talks")
+    args = parser.parse_args()
+
+    print(f"{'':<18}{'out of order':>14}{'lines played':>14}{'started after barge-in':>24}{'talked after s':>16}")
+    for name in ("thread per line", "speech queue"):
+        inversions, played, started_after, talked_after = run(name, args.replies, args.barge_in)
+        print(f"{name:<18}{inversions:>14}{played:>14}{started_after:>24}{talked_after:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
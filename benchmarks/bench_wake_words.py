@@ -0,0 +1,75 @@
+"""
+Wake-word accuracy and throughput on a labeled transcript corpus.
+
+    python -m benchmarks.bench_wake_words [--corpus FILE] [--phonetic soundex]
+
+The corpus is a JSON object with "wake" (transcripts that must activate the
+robot) and "ignore" (transcripts that must not). Reports false-accept and
+false-reject rates for the compiled WakeWordEngine next to the old
+substring scan, plus matches per second for each.
+"""
+import argparse
+import json
+import os
+import time
+
+from empath.wake_words import WakeWordEngine
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "wake_corpus.json")
+
+# The substring list empath/main.py used before the engine existed
+LEGACY_WAKE_WORDS = [
+    "hello reachy", "hey reachy", "hi reachy", "reachy",
+    "jarvis", "tadashi", "hey richie", "hello ritchie",
+    "hey ricky", "hey rici", "hey reach", "hey bridgey",
+    "hello", "hi", "hey", "talk back", "can you hear", "can you talk"
+]
+
+
+def legacy_match(text):
+    text = text.lower()
+    return any(w in text for w in LEGACY_WAKE_WORDS)
+
+
+def evaluate(name, is_wake, wake, ignore, verbose):
+    rejected = [t for t in wake if not is_wake(t)]
+    accepted = [t for t in ignore if is_wake(t)]
+
+    corpus = wake + ignore
+    rounds = max(1, 20000 // len(corpus))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in corpus:
+            is_wake(text)
+    per_second = rounds * len(corpus) / (time.perf_counter() - start)
+
+    far = 100.0 * len(accepted) / len(ignore)
+    frr = 100.0 * len(rejected) / len(wake)
+    print(f"{name:<20}{far:>9.1f}%{frr:>9.1f}%{per_second:>14,.0f}")
+    if verbose:
+        for text in accepted:
+            print(f"    false accept: {text!r}")
+        for text in rejected:
+            print(f"    false reject: {text!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--phonetic", default="metaphone", help="metaphone | soundex")
+    parser.add_argument("-v", "--verbose", action="store_true", help="List every misclassified transcript")
+    args = parser.parse_args()
+
+    with open(args.corpus) as f:
+        corpus = json.load(f)
+    wake, ignore = corpus["wake"], corpus["ignore"]
+    engine = WakeWordEngine(phonetic=args.phonetic)
+
+    print(f"{len(wake)} wake / {len(ignore)} ignore transcripts\n")
+    print(f"{'matcher':<20}{'FAR':>10}{'FRR':>10}{'matches/s':>14}")
+    evaluate("substring", legacy_match, wake, ignore, args.verbose)
+    evaluate(f"engine/{args.phonetic}", engine.is_wake, wake, ignore, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Fixture loading for the benchmark scripts.
+Real captures (frames, WAV recordings) can be dropped into a directory and
+passed with --frames / --wavs; otherwise deterministic synthetic fixtures are
+generated so every benchmark runs on a fresh checkout.
+"""
+import glob
+import json
+import os
+import wave
+import cv2
+import numpy as np
+
+
+def synthetic_frame(width=1280, height=720, seed=0):
+    """A camera-like BGR scene: lit gradient background, a few objects, sensor noise."""
+    rng = np.random.default_rng(seed)
+    ys = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    xs = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    base = np.empty((height, width, 3), dtype=np.float32)
+    base[..., 0] = 90 + 60 * ys
+    base[..., 1] = 110 + 40 * xs
+    base[..., 2] = 140 + 50 * (1 - ys) * xs
+    frame = base.astype(np.uint8)
+
+    for _ in range(6):
+        color = tuple(int(c) for c in rng.integers(0, 255, 3))
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        axes = (int(rng.integers(30, width // 6)), int(rng.integers(30, height // 6)))
+        cv2.ellipse(frame, center, axes, float(rng.integers(0, 180)), 0, 360, color, -1)
+
+    noise = rng.normal(0, 4, frame.shape).astype(np.int16)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def load_frames(directory=None, count=8, width=1280, height=720):
+    """Loads *.jpg/*.png from `directory`, or returns `count` synthetic frames."""
+    if directory:
+        paths = sorted(glob.glob(os.path.join(directory, "*.jpg")) + glob.glob(os.path.join(directory, "*.png")))
+        frames = [f for f in (cv2.imread(p) for p in paths) if f is not None]
+        if frames:
+            return frames
+        print(f"⚠️ [Bench] No images found in {directory}, using synthetic frames.")
+    return [synthetic_frame(width, height, seed=i) for i in range(count)]
+
+
+# BGR colours whose names EmpathEye._get_dominant_color_name should return
+CLOTHING_COLORS = {
+    "red": (40, 40, 200),
+    "blue": (200, 60, 40),
+    "green": (50, 190, 50),
+    "white": (235, 235, 235),
+    "black": (25, 25, 25),
+    "yellow": (40, 225, 230),
+    "gray": (140, 140, 140),
+}
+SKIN_TONES = [(140, 170, 220), (110, 140, 190), (80, 105, 150), (60, 80, 120)]
+
+
+def _draw_face(img, x, y, w, skin, mouth_open=0.0):
+    """A frontal cartoon face (eyes, brows, nose, mouth) that Haar-style detectors fire on."""
+    h = int(w * 1.25)
+    cx = x + w // 2
+    cv2.ellipse(img, (cx, y + h // 2), (w // 2, h // 2), 0, 0, 360, skin, -1)
+    dark = tuple(int(c * 0.35) for c in skin)
+    eye_y, eye_dx = y + int(h * 0.40), int(w * 0.2)
+    shadow = tuple(int(c * 0.6) for c in skin)
+    for side in (-1, 1):
+        # Shaded sockets: the dark eye band is what face detectors key on
+        cv2.ellipse(img, (cx + side * eye_dx, eye_y), (int(w * 0.15), int(h * 0.08)), 0, 0, 360, shadow, -1)
+        cv2.ellipse(img, (cx + side * eye_dx, eye_y), (int(w * 0.08), int(h * 0.035)), 0, 0, 360, (200, 200, 200), -1)
+        cv2.circle(img, (cx + side * eye_dx, eye_y), int(w * 0.045), (40, 30, 20), -1)
+        cv2.line(img, (cx + side * int(w * 0.1), eye_y - int(h * 0.09)), (cx + side * int(w * 0.3), eye_y - int(h * 0.1)), dark, max(2, w // 30))
+    cv2.line(img, (cx, eye_y + int(h * 0.05)), (cx - int(w * 0.05), y + int(h * 0.62)), dark, max(2, w // 40))
+    cv2.ellipse(img, (cx, y + int(h * 0.75)), (int(w * 0.18), int(h * 0.05)), 0, 0, 180, (60, 60, 150), max(2, w // 25))
+    if mouth_open > 0:
+        cv2.ellipse(img, (cx, y + int(h * 0.78)), (int(w * 0.14), max(1, int(h * 0.08 * mouth_open))), 0, 0, 360, (30, 20, 60), -1)
+    return h
+
+
+def _place_people(rng, width, height, faces):
+    names = list(CLOTHING_COLORS)
+    slot = width // max(1, faces)
+    people = []
+    for i in range(faces):
+        w = int(min(slot * 0.55, height * 0.28) * rng.uniform(0.8, 1.0))
+        x = int(i * slot + (slot - w) * rng.uniform(0.3, 0.7))
+        y = int(height * rng.uniform(0.12, 0.2))
+        shirt, hair = rng.choice(names), rng.choice(["black", "yellow", "red", "gray", "white"])
+        skin = SKIN_TONES[int(rng.integers(len(SKIN_TONES)))]
+        # Half the shirts are striped in a second colour; the label stays the main colour
+        stripe = str(rng.choice([n for n in names if n != shirt])) if rng.random() < 0.5 else None
+        people.append({"box": [x, y, w, int(w * 1.25)], "shirt": str(shirt), "hair": str(hair), "skin": skin, "stripe": stripe})
+    return people
+
+
+def _draw_people(frame, people):
+    height = frame.shape[0]
+    labels = []
+    for person in people:
+        x, y, w, h = person["box"]
+        # Shirt from below the chin to the bottom of the frame, hair as a cap above the forehead
+        cv2.rectangle(frame, (x - w // 4, y + h + h // 10), (x + w + w // 4, height), CLOTHING_COLORS[person["shirt"]], -1)
+        if person.get("stripe"):
+            for top in range(y + h + h // 10 + h // 8, height, max(4, h // 4)):
+                cv2.rectangle(frame, (x - w // 4, top), (x + w + w // 4, top + max(2, h // 12)), CLOTHING_COLORS[person["stripe"]], -1)
+        cv2.ellipse(frame, (x + w // 2, y + h // 5), (int(w * 0.58), int(h * 0.45)), 0, 180, 360, CLOTHING_COLORS[person["hair"]], -1)
+        _draw_face(frame, x, y, w, person["skin"], person.get("mouth_open", 0.0))
+        labels.append({"box": [x, y, w, h], "shirt": person["shirt"], "hair": person["hair"]})
+    return cv2.GaussianBlur(frame, (5, 5), 0), labels
+
+
+def _background(width, height, seed):
+    # Busy background, but no face-like clutter
+    return cv2.GaussianBlur(synthetic_frame(width, height, seed=seed), (9, 9), 0)
+
+
+def synthetic_face_scene(width=1280, height=720, faces=1, seed=0):
+    """
+    A synthetic_frame with `faces` people in it: cartoon face, hair cap and
+    shirt in known colours. Returns (frame, labels), one label per person:
+    {"box": [x, y, w, h], "shirt": name, "hair": name}.
+    """
+    rng = np.random.default_rng(seed)
+    frame = _background(width, height, seed)
+    return _draw_people(frame, _place_people(rng, width, height, faces))
+
+
+def synthetic_face_video(count=90, width=1280, height=720, faces=2, seed=0, speed=3.0, talker=None):
+    """
+    `count` consecutive frames of people swaying side to side by up to `speed`
+    px per frame, like visitors in front of the robot. Yields (frame, labels);
+    labels keep the same order in every frame, so list index = identity.
+    The person at index `talker` moves their mouth as if speaking.
+    """
+    rng = np.random.default_rng(seed)
+    background = _background(width, height, seed)
+    people = _place_people(rng, width, height, faces)
+    origins = [list(p["box"]) for p in people]
+    phases = rng.uniform(0, 2 * np.pi, faces)
+    amplitude = speed * 12
+    for t in range(count):
+        for person, origin, phase in zip(people, origins, phases):
+            person["box"][0] = int(origin[0] + amplitude * np.sin(t * speed / amplitude + phase))
+            person["box"][1] = int(origin[1] + amplitude * 0.3 * np.sin(t * speed / amplitude * 0.7 + phase))
+        if talker is not None:
+            people[talker]["mouth_open"] = abs(np.sin(t * 0.9)) # A syllable every few frames
+        yield _draw_people(background.copy(), people)
+
+
+def load_face_fixtures(directory=None, count=12, width=1280, height=720, faces=None):
+    """
+    Labeled face fixtures as [(name, frame, labels)].
+    `directory` holds images plus labels.json ({"img.jpg": [{"box": [x, y, w, h], ...}]});
+    otherwise synthetic scenes with 1-3 people (or exactly `faces`) are generated.
+    """
+    if directory:
+        with open(os.path.join(directory, "labels.json")) as f:
+            labels = json.load(f)
+        fixtures = []
+        for name in sorted(labels):
+            frame = cv2.imread(os.path.join(directory, name))
+            if frame is not None:
+                fixtures.append((name, frame, labels[name]))
+        if fixtures:
+            return fixtures
+        print(f"⚠️ [Bench] No labeled images found in {directory}, using synthetic scenes.")
+    fixtures = []
+    for i in range(count):
+        n = faces or 1 + i % 3
+        frame, labels = synthetic_face_scene(width, height, faces=n, seed=i)
+        fixtures.append((f"synthetic_{n}faces_{i}.png", frame, labels))
+    return fixtures
+
+
+def iou(a, b):
+    """Intersection over union of two [x, y, w, h] boxes."""
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def synthetic_utterance(seconds=2.0, sample_rate=16000, seed=0, lead_silence=0.3, tail_silence=0.6):
+    """
+    Speech-like 16-bit mono PCM: voiced harmonics with a wandering pitch and a
+    syllable-rate envelope, padded with low-level room noise. Recognizers will
+    not find words in it, but it exercises VAD and timing paths realistically.
+    """
+    rng = np.random.default_rng(seed)
+    n_voice = int(seconds * sample_rate)
+    t = np.arange(n_voice) / sample_rate
+    pitch = 120 + 30 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, 6))
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * 4.0 * t + rng.uniform(0, 6)), 0, 1) ** 0.5
+    voice = voice * envelope * 6000
+
+    def room(n):
+        return rng.normal(0, 60, n)
+
+    signal = np.concatenate([room(int(lead_silence * sample_rate)), voice + room(n_voice), room(int(tail_silence * sample_rate))])
+    return np.clip(signal, -32768, 32767).astype("<i2").tobytes()
+
+
+def read_wav(path, sample_rate=16000):
+    """Reads a WAV file as 16-bit mono PCM at `sample_rate` (naive resample if needed)."""
+    with wave.open(path, "rb") as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+    samples = np.frombuffer(raw, dtype="<i2").reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate:
+        positions = np.linspace(0, len(samples) - 1, int(len(samples) * sample_rate / rate))
+        samples = np.interp(positions, np.arange(len(samples)), samples)
+    return samples.astype("<i2").tobytes()
+
+
+def write_wav(path, pcm, sample_rate=16000):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+
+
+def load_wavs(directory=None, count=4, sample_rate=16000):
+    """Returns [(name, pcm)] from *.wav in `directory`, or synthetic utterances."""
+    if directory:
+        paths = sorted(glob.glob(os.path.join(directory, "*.wav")))
+        if paths:
+            return [(os.path.basename(p), read_wav(p, sample_rate)) for p in paths]
+        print(f"⚠️ [Bench] No WAV files found in {directory}, using synthetic audio.")
+    return [(f"synthetic_{i}.wav", synthetic_utterance(1.5 + 0.5 * i, sample_rate, seed=i)) for i in range(count)]
@@ -1,21 +1,59 @@
+import os
 import cv2
 import numpy as np
 
+from .face_detectors import create_detector
+from .face_tracker import FaceTracker
+from .apparel import ApparelAnalyzer, apparel_regions
+from .scene import SceneModel
+from .emotion_classifier import EmotionClassifier, AsyncEmotionClassifier
+
 class EmpathEye:
     """
     Sub-system for visual awareness. 
     Handles face detection and high-level behavioral analysis for context.
     """
     
-    def __init__(self):
-        # We use a standard pre-trained Haar Cascade for zero-dependency speed.
-        # Could be upgraded to MediaPipe or DeepFace for production.
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    def __init__(self, detector=None, tracking=None, analysis_width=None, emotions=None):
+        # Face detector backend: haar (default, zero-dependency), mediapipe, yunet or ssd.
+        # Pick one with EMPATH_FACE_DETECTOR; benchmarks/bench_face_detectors.py compares them.
+        self.detector = self._load_detector(detector)
+        # Full detection only every few frames, cheap tracking in between (EMPATH_FACE_TRACKING)
+        self.tracker = FaceTracker(self.detector, mode=tracking)
+        self.apparel = ApparelAnalyzer()
+        # Everyone in view, one record per face ID (GET /scene)
+        self.scene = SceneModel()
+        # Facial-expression CNN on its own thread (EMPATH_FER_MODEL); None = proximity heuristic only
+        self.emotions = self._load_emotions(emotions)
+        # Analysis runs on a copy no wider than this; boxes are mapped back (EMPATH_ANALYSIS_WIDTH, 0 = full size)
+        self.analysis_width = int(analysis_width if analysis_width is not None else os.getenv("EMPATH_ANALYSIS_WIDTH", 640))
+        self._small = None # Reused downscale buffer
+        self._canvas = None # Reused annotation buffer
+
+    def _load_detector(self, detector):
+        if detector is not None and not isinstance(detector, str):
+            return detector # Backend instance injected
+        try:
+            return create_detector(detector)
+        except Exception as e:
+            print(f"⚠️ [Eye] Face detector '{detector or 'default'}' unavailable ({e}). Falling back to Haar.")
+            return create_detector("haar")
 
-    def analyze_frame(self, frame):
+    def _load_emotions(self, emotions):
+        if emotions is not None and not isinstance(emotions, str):
+            return emotions # AsyncEmotionClassifier injected
+        try:
+            return AsyncEmotionClassifier(EmotionClassifier(model=emotions))
+        except Exception as e:
+            print(f"⚠️ [Eye] Emotion classifier unavailable ({e}). Using the proximity heuristic only.")
+            return None
+
+    def analyze_frame(self, frame, annotate=True):
         """
         Processes a single BGR frame for interactive markers.
         Returns analysis dict and annotated display frame.
+        With `annotate=False` (nobody watching the stream) nothing is drawn
+        and the annotated frame is None.
         """
         if frame is None:
             return {
@@ -24,67 +62,66 @@ class EmpathEye:
                 "features": {"shirt_color": "unknown", "hair_color": "unknown"}
             }, None
             
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
+        # Detection, tracking and colour analysis all run on the downscaled copy
+        small, scale = self._downscale(frame)
+        tracks = self.tracker.update(small)
+        faces = [tuple(int(round(v / scale)) for v in t.box) for t in tracks] # Back to full resolution
+        
+        # --- Apparel Analysis: one batched HSV pass, cached per tracked face ---
+        apparel = self.apparel.analyze(small, tracks)
+        
+        # --- Emotion: crops are queued for the classifier thread; we use its latest results ---
+        emotions = None
+        if self.emotions is not None:
+            self.emotions.submit(small, tracks)
+            emotions = self.emotions.results()
+        
+        # Per-face records, updated in place; the primary face is who the brain talks to
+        primary = self.scene.update(tracks, faces, apparel, frame.shape[1], image=small, emotions=emotions)
         
         analysis = {
             "face_detected": len(faces) > 0,
-            "dominant_emotion": "neutral",
-            "features": {"shirt_color": "unknown", "hair_color": "unknown"},
-            "face_count": len(faces)
+            "dominant_emotion": primary.emotion if primary else "neutral",
+            "emotion_confidence": primary.confidence if primary else 0.0,
+            "features": dict(primary.features) if primary else {"shirt_color": "unknown", "hair_color": "unknown"},
+            "face_count": len(faces),
+            "face_ids": [t.id for t in tracks],
+            "primary_id": primary.track_id if primary else None
         }
         
-        annotated = frame.copy()
-        
-        for (x, y, w, h) in faces:
-            cv2.rectangle(annotated, (x, y), (x+w, y+h), (0, 255, 0), 2)
-            
-            # --- Apparel Analysis (Heuristic) ---
-            # 1. Hair: Segment above forehead
-            hair_y = max(0, y - int(h * 0.3))
-            hair_region = frame[hair_y:y, x:x+w]
-            hair_color = self._get_dominant_color_name(hair_region)
-            
-            # 2. Shirt: Segment below chin
-            shirt_y = min(frame.shape[0], y + h + int(h * 0.2))
-            shirt_h = min(frame.shape[0], shirt_y + int(h * 0.6)) - shirt_y
-            if shirt_h > 0:
-                shirt_region = frame[shirt_y:shirt_y+shirt_h, x:x+w]
-                shirt_color = self._get_dominant_color_name(shirt_region)
-                
+        annotated = self._canvas_for(frame) if annotate else None
+        if annotated is not None:
+            for track, (x, y, w, h) in zip(tracks, faces):
+                shirt_color = apparel[track.id]["shirt_color"]
+                hair_color = apparel[track.id]["hair_color"]
+                # Primary face in green, everyone else in yellow
+                color = (0, 255, 0) if primary and track.id == primary.track_id else (0, 255, 255)
+                cv2.rectangle(annotated, (x, y), (x+w, y+h), color, 2)
                 # Draw shirt ROI for debug
-                cv2.rectangle(annotated, (x, shirt_y), (x+w, shirt_y+shirt_h), (255, 0, 0), 1)
-            else:
-                shirt_color = "unknown"
-                
-            analysis["features"] = {
-                "shirt_color": shirt_color,
-                "hair_color": hair_color
-            }
-            
-            # Overlay info
-            info_text = f"Shirt:{shirt_color} Hair:{hair_color}"
-            cv2.putText(annotated, info_text, (x, y+h+20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-            
-            if w > frame.shape[1] * 0.4:
-                analysis["dominant_emotion"] = "surprised" # Simple proximity heuristic
+                _, (sx0, sy0, sx1, sy1) = apparel_regions((x, y, w, h), frame.shape)
+                if sy1 > sy0:
+                    cv2.rectangle(annotated, (sx0, sy0), (sx1, sy1), (255, 0, 0), 1)
+                # Overlay info
+                info_text = f"#{track.id} Shirt:{shirt_color} Hair:{hair_color}"
+                cv2.putText(annotated, info_text, (x, y+h+20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
         
         return analysis, annotated
 
-    def _get_dominant_color_name(self, roi):
-        if roi is None or roi.size == 0: return "unknown"
-        
-        # Calculate average color
-        avg_color_per_row = np.average(roi, axis=0)
-        avg_color = np.average(avg_color_per_row, axis=0) # BGR
-        b, g, r = avg_color
-        
-        # Simple classification
-        if r > 200 and g > 200 and b > 200: return "white"
-        if r < 50 and g < 50 and b < 50: return "black"
-        if r > 150 and g < 100 and b < 100: return "red"
-        if b > 150 and g < 100 and r < 100: return "blue"
-        if g > 150 and r < 100 and b < 100: return "green"
-        if r > 200 and g > 200 and b < 100: return "yellow"
-        if r > 100 and g > 100 and b > 100: return "gray"
-        return "neutral"
+    def _downscale(self, frame):
+        """Returns (analysis image, scale) using a buffer reused across frames."""
+        height, width = frame.shape[:2]
+        if not self.analysis_width or width <= self.analysis_width:
+            return frame, 1.0
+        scale = self.analysis_width / width
+        size = (self.analysis_width, int(round(height * scale)))
+        if self._small is None or self._small.shape[:2] != (size[1], size[0]):
+            self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        cv2.resize(frame, size, dst=self._small, interpolation=cv2.INTER_AREA)
+        return self._small, scale
+
+    def _canvas_for(self, frame):
+        """Copies the frame into the reused annotation buffer (callers encode it before the next frame)."""
+        if self._canvas is None or self._canvas.shape != frame.shape:
+            self._canvas = np.empty_like(frame)
+        np.copyto(self._canvas, frame)
+        return self._canvas
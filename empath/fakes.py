@@ -0,0 +1,120 @@
+import itertools
+import time
+import numpy as np
+
+from .tts import Speech
+
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model=None, contents=None, config=None):
+        owner = self._owner
+        owner.calls += 1
+        time.sleep(owner.first_token_delay + owner.chunk_delay * len(owner._chunks(contents)))
+        return _FakeResponse(owner.reply_for(contents))
+
+    def generate_content_stream(self, model=None, contents=None, config=None):
+        owner = self._owner
+        owner.calls += 1
+        time.sleep(owner.first_token_delay)
+        for chunk in owner._chunks(contents):
+            time.sleep(owner.chunk_delay)
+            yield _FakeResponse(chunk)
+
+
+class FakeGenAIClient:
+    """
+    Local stand-in for google.genai.Client.
+    Mimics `client.models.generate_content` and `generate_content_stream`
+    with a deterministic reply and configurable latency, so the streaming
+    speech pipeline can be exercised without network access or quota.
+    Pass it to EmpathBrain(genai_client=...) in tests and benchmarks.
+    """
+
+    DEFAULT_REPLY = (
+        "Hello there, it is lovely to see you. "
+        "I can see you are in a good mood today! "
+        "Shall we play a little game together?"
+    )
+
+    def __init__(self, reply=None, first_token_delay=0.4, chunk_delay=0.05, chunk_words=3):
+        self.reply = reply or self.DEFAULT_REPLY
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.chunk_words = max(1, chunk_words)
+        self.calls = 0
+        self.models = _FakeModels(self)
+
+    def reply_for(self, contents):
+        return self.reply(contents) if callable(self.reply) else self.reply
+
+    def _chunks(self, contents):
+        words = self.reply_for(contents).split(" ")
+        return [
+            " ".join(words[i:i + self.chunk_words]) + (" " if i + self.chunk_words < len(words) else "")
+            for i in range(0, len(words), self.chunk_words)
+        ]
+
+
+class FakeSTTBackend:
+    """
+    Deterministic stand-in for an STT backend (see empath/stt.py).
+    Sleeps `latency` seconds per utterance, like a network recognizer, and
+    returns `transcripts` in order (cycling), so the ear pipeline can be
+    benchmarked from WAV files without a microphone or network.
+    """
+
+    name = "fake"
+    streaming = False
+    needs_network = False
+    sample_rate = 16000
+
+    def __init__(self, transcripts=("hello reachy",), latency=1.5):
+        self.transcripts = list(transcripts)
+        self.latency = latency
+        self._counter = itertools.count()
+        self.calls = 0
+
+    def transcribe(self, pcm, sample_rate=None):
+        self.calls = next(self._counter) + 1 # Safe with several recognition workers
+        text = self.transcripts[(self.calls - 1) % len(self.transcripts)]
+        time.sleep(self.latency)
+        return text
+
+
+class FakeTTSBackend:
+    """
+    Deterministic stand-in for a TTS backend (see empath/tts.py).
+    Sleeps `latency` plus `per_char` seconds per character, like a network
+    synthesizer, and returns a voiced buzz `seconds_per_char` long per
+    character, so the voice pipeline can be timed without an engine.
+    """
+
+    name = "fake"
+    needs_network = False
+    sample_rate = 16000
+
+    def __init__(self, latency=0.3, per_char=0.002, seconds_per_char=0.06):
+        self.latency = latency
+        self.per_char = per_char
+        self.seconds_per_char = seconds_per_char
+        self.calls = 0
+
+    @property
+    def voice(self):
+        return "fake"
+
+    def synthesize(self, text):
+        self.calls += 1
+        time.sleep(self.latency + self.per_char * len(text))
+        t = np.arange(int(len(text) * self.seconds_per_char * self.sample_rate)) / float(self.sample_rate)
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) # ~4 syllables per second
+        pcm = 6000 * envelope * np.sign(np.sin(2 * np.pi * 140 * t)) # 140 Hz glottal buzz
+        return Speech(pcm.astype(np.int16), self.sample_rate, text)
@@ -0,0 +1,139 @@
+import threading
+import time
+
+
+class FrameBus:
+    """
+    Single-producer frame bus.
+    One capture thread pulls frames from the robot and publishes them into a
+    small ring buffer tagged with monotonically increasing sequence numbers.
+    Any number of readers (vision loop, video streamers, brain) can fetch the
+    latest frame or block until a newer one arrives.
+
+    Frames are shared by reference, never copied. Published frames must be
+    treated as read-only by every consumer.
+    """
+
+    def __init__(self, capacity=4, idle_interval=0.1, max_fps=30):
+        self.capacity = max(1, capacity)
+        self.idle_interval = idle_interval
+        self.min_period = 1.0 / max_fps if max_fps else 0.0
+
+        self._slots = [None] * self.capacity  # (seq, timestamp, frame)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._running = False
+        self._closed = False
+        self._thread = None
+
+    # --- Producer side ---
+
+    def publish(self, frame):
+        """Stores a frame in the ring and wakes waiting readers. Returns its sequence number."""
+        with self._cond:
+            self._seq += 1
+            self._slots[self._seq % self.capacity] = (self._seq, time.time(), frame)
+            self._cond.notify_all()
+            return self._seq
+
+    def start(self, source, is_ready=None):
+        """
+        Launches the capture thread.
+        `source` is a zero-arg callable returning a BGR frame or None
+        (e.g. RobotController.get_frame). `is_ready` optionally gates capture
+        until the hardware bridge is up.
+        """
+        if self._running:
+            return
+        self._running = True
+        self._closed = False
+        self._thread = threading.Thread(target=self._capture_loop, args=(source, is_ready), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._closed = True
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _capture_loop(self, source, is_ready):
+        print("📸 [FrameBus] Capture thread started.")
+        while self._running:
+            if is_ready is not None and not is_ready():
+                time.sleep(1)
+                continue
+
+            started = time.time()
+            try:
+                frame = source()
+            except Exception as e:
+                print(f"⚠️ [FrameBus] Capture Error: {e}")
+                frame = None
+
+            if frame is None:
+                time.sleep(self.idle_interval)
+                continue
+
+            self.publish(frame)
+
+            # Pace capture so a fast camera does not spin the CPU
+            elapsed = time.time() - started
+            if elapsed < self.min_period:
+                time.sleep(self.min_period - elapsed)
+
+    # --- Consumer side ---
+
+    @property
+    def seq(self):
+        return self._seq
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def latest(self):
+        """Returns (seq, frame) for the newest frame, or (0, None) if nothing was captured yet."""
+        with self._cond:
+            slot = self._slots[self._seq % self.capacity]
+        if slot is None:
+            return 0, None
+        return slot[0], slot[2]
+
+    def latest_frame(self, max_age=None):
+        """Convenience accessor for callers that only need the pixels (e.g. the brain)."""
+        with self._cond:
+            slot = self._slots[self._seq % self.capacity]
+        if slot is None:
+            return None
+        if max_age is not None and time.time() - slot[1] > max_age:
+            return None
+        return slot[2]
+
+    def wait_for(self, after_seq, timeout=1.0):
+        """
+        Blocks until a frame newer than `after_seq` is published.
+        Returns (seq, frame); frame is None on timeout or shutdown.
+        Slow readers simply skip to the newest frame instead of replaying old ones.
+        """
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._seq <= after_seq and not self._closed:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return after_seq, None
+                self._cond.wait(remaining)
+            slot = self._slots[self._seq % self.capacity]
+        if slot is None or slot[0] <= after_seq:
+            return after_seq, None
+        return slot[0], slot[2]
+
+    def get(self, seq):
+        """Returns the frame for a specific sequence number if it is still in the ring."""
+        with self._cond:
+            slot = self._slots[seq % self.capacity]
+        if slot is None or slot[0] != seq:
+            return None
+        return slot[2]
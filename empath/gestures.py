@@ -0,0 +1,120 @@
+import json
+import os
+import time
+import numpy as np
+from reachy_mini.utils import create_head_pose
+
+DEFAULT_LIBRARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gestures.json")
+
+HEAD_AXES = ("x", "y", "z", "roll", "pitch", "yaw")
+
+
+def _minjerk(u):
+    return u * u * u * (10 - 15 * u + 6 * u * u)
+
+
+EASINGS = {"minjerk": _minjerk, "linear": lambda u: u}
+
+
+class CompiledGesture:
+    """
+    One gesture sampled at the control rate.
+    `heads[i]` / `antennas[i]` are the i-th 4x4 head pose and antenna pair
+    (radians), built once at load time and only referenced during playback.
+    `params` keeps the raw head parameters and antenna angles in degrees for
+    blending out of an interrupted pose.
+    """
+
+    __slots__ = ("name", "dt", "speed", "blend_samples", "params", "heads", "antennas", "length")
+
+    def __init__(self, name, dt, speed, blend, params):
+        self.name = name
+        self.dt = dt
+        self.speed = speed
+        self.blend_samples = max(1, int(round(blend / dt)))
+        self.params = params # (N, 8): x, y, z, roll, pitch, yaw, antenna_l, antenna_r
+        self.length = len(params)
+        self.heads = [create_head_pose(**dict(zip(HEAD_AXES, row[:6].tolist()))) for row in params]
+        radians = np.deg2rad(params[:, 6:8])
+        self.antennas = [radians[i] for i in range(self.length)]
+
+    @property
+    def duration(self):
+        return self.length * self.dt / self.speed
+
+    def play(self, mini, cancel, speed=1.0, start_from=None):
+        """
+        Streams the trajectory to the robot, sample by sample, until done or
+        `cancel` is set. `start_from` (a params row) eases in from a pose some
+        other gesture was interrupted at. Returns the index of the last sample sent.
+        """
+        dt = self.dt / (self.speed * speed)
+        blend = start_from is not None and not np.array_equal(start_from, self.params[0])
+        started = time.monotonic()
+        sent = -1
+        for i in range(self.length):
+            if blend and i < self.blend_samples:
+                # Only this short ease-in computes poses on the fly
+                w = (i + 1) / self.blend_samples
+                row = start_from + (self.params[i] - start_from) * w
+                mini.set_target(head=create_head_pose(**dict(zip(HEAD_AXES, row[:6].tolist()))), antennas=np.deg2rad(row[6:8]))
+            else:
+                mini.set_target(head=self.heads[i], antennas=self.antennas[i])
+            sent = i
+            delay = started + (i + 1) * dt - time.monotonic()
+            if delay > 0 and cancel.wait(delay):
+                break
+            if cancel.is_set():
+                break
+        return sent
+
+
+class GestureLibrary:
+    """
+    Declarative gesture set (empath/gestures.json, or EMPATH_GESTURES).
+    Every gesture is compiled once at startup into pose arrays sampled at
+    `rate` Hz; adding an expression only means adding keyframes to the file.
+    """
+
+    def __init__(self, path=None, rate=50):
+        self.path = path or os.getenv("EMPATH_GESTURES", DEFAULT_LIBRARY)
+        self.dt = 1.0 / rate
+        with open(self.path) as f:
+            spec = json.load(f)
+        self.gestures = {
+            name: self._compile(name, definition)
+            for name, definition in spec.items()
+            if not name.startswith("_")
+        }
+        print(f"🤖 [Gestures] Compiled {len(self.gestures)} gestures from {os.path.basename(self.path)}")
+
+    def get(self, name):
+        return self.gestures.get(name)
+
+    def __contains__(self, name):
+        return name in self.gestures
+
+    def names(self):
+        return sorted(self.gestures)
+
+    def _compile(self, name, definition):
+        ease = EASINGS[definition.get("ease", "minjerk")]
+        current = np.zeros(8)
+        rows = [current.copy()]
+        for keyframe in definition["keyframes"]:
+            target = current.copy()
+            if "head" in keyframe:
+                head = keyframe["head"]
+                unknown = set(head) - set(HEAD_AXES)
+                if unknown:
+                    raise ValueError(f"Gesture '{name}': unknown head axes {sorted(unknown)}")
+                target[:6] = [head.get(axis, 0.0) for axis in HEAD_AXES]
+            if "antennas" in keyframe:
+                target[6:8] = keyframe["antennas"]
+
+            steps = max(1, int(round(keyframe.get("t", 0.5) / self.dt)))
+            for step in range(1, steps + 1):
+                rows.append(current + (target - current) * ease(step / steps))
+            rows.extend(target.copy() for _ in range(int(round(keyframe.get("hold", 0.0) / self.dt))))
+            current = target
+        return CompiledGesture(name, self.dt, definition.get("speed", 1.0), definition.get("blend", 0.25), np.array(rows))
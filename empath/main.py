@@ -1,16 +1,20 @@
-from fastapi import FastAPI, WebSocket, BackgroundTasks
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 import uvicorn
-import cv2
+import os
 import threading
-import time
-import asyncio
 from empath.detector import EmpathEye
 from empath.robot_controller import RobotController
-from empath.brain import EmpathBrain
+from empath.brain import EmpathBrain, BrainBusyError, BrainTimeoutError
 from empath.voice import EmpathVoice
 from empath.hearing import EmpathEar
+from empath.frame_bus import FrameBus
+from empath.mjpeg import MJPEGBroadcaster
+from empath.wake_words import WakeWordEngine, EngagementGate
+from empath.motion import PRIORITY_IDLE
+from empath.emotion_state import EmotionStateTracker
+from empath.tracing import tracer
 
 app = FastAPI(title="Reachy Empath API")
 
@@ -39,67 +43,110 @@ robot = RobotController()
 print("🔹 Init Eye...")
 eye = EmpathEye()
 
+# Frame Bus: one capture thread feeds everyone
+frames = FrameBus()
+# Annotated frames are JPEG-encoded once here and shared by every /video_feed client
+video_stream = MJPEGBroadcaster()
+
+# Per-frame emotion labels -> stable state + rate-limited mirroring gestures
+mirror = EmotionStateTracker()
+
 voice = EmpathVoice()
+voice.prewarm() # Canned lines play instantly from the speech cache
 brain = None 
 
-# Engagement timer to allow conversation after initial wake word
-# We start with a high value to allow immediate engagement on first run
-last_engagement_time = time.time() 
+# Stream replies sentence by sentence into the voice (EMPATH_STREAM_REPLIES=0 to disable)
+STREAM_REPLIES = os.getenv("EMPATH_STREAM_REPLIES", "1") == "1"
+
+def express_reply(response):
+    """Persona expressions based on the reply text."""
+    lr = response.lower()
+    if any(x in lr for x in ["haha", "lol", "😊", "funny", "excellent"]):
+        robot.trigger_gesture("giggles")
+    elif any(x in lr for x in ["sad", "sorry", "unfortunate", "bad"]):
+        robot.trigger_gesture("bashful")
+    else:
+        robot.trigger_gesture("agree")
+
+def express_while_speaking(sentences):
+    """Passes sentences through, reacting physically to the first one as it starts playing."""
+    for i, sentence in enumerate(sentences):
+        if i == 0:
+            express_reply(sentence)
+        yield sentence
+
+# Wake phrases (and their usual mis-transcriptions) live in empath/wake_words.py
+wake_words = WakeWordEngine()
+# Engagement timer to allow conversation after initial wake word (starts engaged for the first run)
+engagement = EngagementGate(wake_words)
+
+# Set when a streaming partial already acknowledged the phrase in progress
+partial_acknowledged = False
+
+def on_hear_partial(text):
+    """Partial transcripts from a streaming STT backend: react to the wake word before the phrase ends."""
+    global partial_acknowledged
+    if partial_acknowledged or not brain:
+        return
+    match = wake_words.match(text)
+    if match:
+        partial_acknowledged = True
+        engagement.engage()
+        print(f"⚡ [Main] Wake word in partial: '{text}' ({match.phrase}, {match.score:.2f})")
+        robot.trigger_gesture("agree")
 
 def on_hear_text(text):
-    global last_engagement_time
+    global partial_acknowledged
     raw_text = text.lower().strip()
+    already_acknowledged, partial_acknowledged = partial_acknowledged, False
     
     if len(raw_text) < 2: return # Ignore noise
     
-    wake_words = [
-        "hello reachy", "hey reachy", "hi reachy", "reachy", 
-        "jarvis", "tadashi", "hey richie", "hello ritchie",
-        "hey ricky", "hey rici", "hey reach", "hey bridgey",
-        "hello", "hi", "hey", "talk back", "can you hear", "can you talk"
-    ]
-    
-    # Priority Activation (Wake words)
-    is_active = any(w in raw_text for w in wake_words)
-    
-    # Secondary Activation (Already Engaged or Face Detected)
-    if not is_active:
-        # Extended conversation window (5 minutes) to allow follow-up questions
-        if time.time() - last_engagement_time < 300:
-            is_active = True
-            print(f"🔄 [Main] Session Active (Time remaining: {300 - (time.time() - last_engagement_time):.0f}s)")
-        # If a face is clearly seen (not neutral/passive)
-        elif state.current_emotion != "neutral":
-            is_active = True
+    # Wake word first, then the 5-minute follow-up window, then a clearly expressive face
+    with tracer.span("wake_word") as span:
+        is_active, reason, match = engagement.decide(raw_text, state.current_emotion)
+        span.set(active=is_active, reason=reason)
+    if match and match.method != "exact":
+        print(f"🎯 [Main] Wake word '{match.phrase}' matched ({match.method}, {match.score:.2f})")
+    elif reason == "session":
+        print(f"🔄 [Main] Session Active (Time remaining: {engagement.remaining():.0f}s)")
 
     if is_active:
         print(f"🚀 [Main] ACTIVATED: '{raw_text}'")
-        last_engagement_time = time.time() # Update session timer
+        engagement.engage() # Update session timer
         
         if brain:
             # Physical acknowledgment
-            robot.trigger_gesture("agree") 
+            if not already_acknowledged:
+                robot.trigger_gesture("agree") 
             
             def process_and_reply():
-                frame = robot.get_frame() # Will be None if camera is off
-                response = brain.process_query(raw_text, state.current_emotion, frame=frame)
-                
-                # Persona expressions
-                lr = response.lower()
-                if any(x in lr for x in ["haha", "lol", "😊", "funny", "excellent"]):
-                    robot.trigger_gesture("giggles")
-                elif any(x in lr for x in ["sad", "sorry", "unfortunate", "bad"]):
-                    robot.trigger_gesture("bashful")
-                else:
-                    robot.trigger_gesture("agree")
+                frame = frames.latest_frame(max_age=1.0) # Will be None if camera is off
+                visual_notes = eye.scene.visual_notes() # Active speaker, else the nearest face
+                try:
+                    if STREAM_REPLIES:
+                        # First sentence plays while the rest is still being generated
+                        sentences = brain.stream_query(raw_text, state.current_emotion, frame=frame, visual_notes=visual_notes)
+                        voice.speak_stream(express_while_speaking(sentences))
+                        return
+                    response = brain.query(raw_text, state.current_emotion, frame=frame, visual_notes=visual_notes)
+                except (BrainBusyError, BrainTimeoutError) as e:
+                    print(f"⏳ [Main] Reply skipped: {e}")
+                    return
                 
+                express_reply(response)
                 voice.speak(response)
                 
-            threading.Thread(target=process_and_reply, daemon=True).start()
+            # The interaction's trace follows the reply into its thread
+            threading.Thread(target=tracer.wrap(process_and_reply), daemon=True).start()
     else:
         print(f"👂 [Main] Passive speech ignored (Wait for wake word): '{raw_text}'")
 
-ear = EmpathEar(callback=on_hear_text)
+# Barge-in: the voice stops as soon as the user starts talking (EMPATH_BARGE_IN=0 to disable).
+# The ear follows what the voice plays, so neither barge-in nor transcripts fire on the robot's own speech.
+ear = EmpathEar(callback=on_hear_text, on_partial=on_hear_partial,
+                on_speech_start=voice.barge_in if os.getenv("EMPATH_BARGE_IN", "1") == "1" else None,
+                playback=voice.activity)
 
 def init_brain():
     global brain
@@ -122,61 +169,59 @@ def connect_robot_bg():
 async def lifespan(app: FastAPI):
     # Startup
     threading.Thread(target=connect_robot_bg, daemon=True).start()
+    frames.start(robot.get_frame, is_ready=lambda: state.is_connected)
+    threading.Thread(target=vision_loop, daemon=True).start()
     yield
     # Shutdown
+    frames.stop()
+    video_stream.close()
     robot.disconnect()
     ear.stop_listening()
+    voice.shutdown()
+    if eye.emotions:
+        eye.emotions.close()
+    if brain:
+        brain.shutdown()
+    tracer.close()
 
 # Assign lifespan to the existing app
 app.router.lifespan_context = lifespan
 
 # Logic Loop
-def generate_frames():
-    """Video streaming generator function."""
-    while True:
-        if not state.is_connected:
-            time.sleep(1)
-            continue
-        
-        frame = robot.get_frame()
+def vision_loop():
+    """Analyzes every captured frame once, whether or not anybody is watching."""
+    seq = 0
+    while not frames.closed:
+        seq, frame = frames.wait_for(seq, timeout=1.0)
         if frame is None:
-            time.sleep(0.1)
             continue
             
         # Analyze Emotion & Features
-        analysis, annotated_frame = eye.analyze_frame(frame)
+        # Annotation (a full-size copy + drawing) only happens while someone watches /video_feed
+        try:
+            analysis, annotated_frame = eye.analyze_frame(frame, annotate=video_stream.has_subscribers)
+        except Exception as e:
+            # One bad frame must not stop the robot from seeing
+            print(f"⚠️ [Vision] Frame analysis error: {e}")
+            continue
         
-        state.current_emotion = analysis["dominant_emotion"]
-        # Save features for brain
+        # Smoothed state: one noisy frame no longer flips the emotion (or fires a gesture)
+        gesture = mirror.update(analysis["dominant_emotion"], analysis["face_detected"])
+        state.current_emotion = mirror.state
+        state.emotion_confidence = analysis.get("emotion_confidence", 0.0) # Primary face, calibrated (0 without a classifier)
+        # Save features for brain (the primary face's; everyone is in eye.scene)
         state.visual_features = analysis.get("features", {})
         
-        # Mirroring Logic (Visual Resonance)
-        if analysis["face_detected"]:
-            # Automatic reaction in simulation based on what he sees
-            if state.current_emotion == "happy":
-                robot.trigger_gesture("happy")
-            elif state.current_emotion == "sad":
-                robot.trigger_gesture("sad")
-            elif state.current_emotion == "angry":
-                robot.trigger_gesture("angry")
-            elif state.current_emotion == "surprise":
-                robot.trigger_gesture("surprised")
-            elif state.current_emotion == "fear":
-                robot.trigger_gesture("bashful")
-            elif state.current_emotion == "disgust":
-                robot.trigger_gesture("confused")
-        
-        # Encode
-        ret, buffer = cv2.imencode('.jpg', annotated_frame)
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+        # Mirroring Logic (Visual Resonance): only on a settled change of emotion
+        if gesture:
+            robot.trigger_gesture(gesture, priority=PRIORITY_IDLE)
         
-        time.sleep(0.05) 
+        video_stream.publish(annotated_frame)
 
 @app.get("/video_feed")
-async def video_feed():
-    return StreamingResponse(generate_frames(), media_type="multipart/x-mixed-replace; boundary=frame")
+async def video_feed(fps: float = None):
+    """Optional `fps` query param caps this client's frame rate."""
+    return StreamingResponse(video_stream.stream(max_fps=fps), media_type="multipart/x-mixed-replace; boundary=frame")
 
 @app.get("/status")
 def get_status():
@@ -184,10 +229,33 @@ def get_status():
         "mode": state.mode,
         "connected": state.is_connected,
         "emotion": state.current_emotion,
+        "emotion_confidence": state.emotion_confidence,
         "brain_online": brain is not None and not brain.offline,
-        "features": getattr(state, "visual_features", {})
+        "brain_pending": brain.pending if brain else 0,
+        "response_cache": brain.cache.stats() if brain else {},
+        "brain_tiers": brain.health() if brain else {},
+        "brain_hedge": brain.hedge_stats() if brain else {},
+        "features": getattr(state, "visual_features", {}),
+        "video_stream": video_stream.stats(),
+        "motion": robot.motion.stats(),
+        "mirror": mirror.stats(),
+        "face_tracking": eye.tracker.stats(),
+        "apparel": eye.apparel.stats(),
+        "emotion_classifier": eye.emotions.stats() if eye.emotions else {},
+        "ear": ear.latency_stats(),
+        "voice": voice.stats()
     }
 
+@app.get("/metrics")
+def get_metrics():
+    """Per-stage latency percentiles over recent interactions (stt, brain tiers, tts, to_first_audio...)."""
+    return tracer.metrics()
+
+@app.get("/scene")
+def get_scene():
+    """Everyone in view, nearest first; `primary` marks who the robot is talking to."""
+    return {"primary_id": eye.scene.primary_id, "faces": eye.scene.to_list()}
+
 @app.post("/chat")
 async def chat(payload: dict):
     """
@@ -197,10 +265,16 @@ async def chat(payload: dict):
     if not brain:
         return {"response": "My brain is still waking up..."}
     
-    frame = robot.get_frame()
-    # Pass visual features if available
-    features = getattr(state, "visual_features", {})
-    response = brain.process_query(user_text, state.current_emotion, frame=frame, visual_notes=features)
+    frame = frames.latest_frame(max_age=1.0)
+    # Pass visual features if available: the active speaker, else the nearest face
+    features = eye.scene.visual_notes()
+    try:
+        # Runs on the brain's bounded worker pool so /status and /video_feed stay responsive
+        response = await brain.aprocess_query(user_text, state.current_emotion, frame=frame, visual_notes=features)
+    except BrainBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except BrainTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     voice.speak(response)
     
     return {"response": response}
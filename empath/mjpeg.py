@@ -0,0 +1,127 @@
+import asyncio
+import os
+import threading
+import time
+import cv2
+
+
+class MJPEGBroadcaster:
+    """
+    Encode-once MJPEG fan-out for /video_feed.
+    The vision thread publishes raw frames; each new frame is JPEG-encoded
+    exactly once (and only while someone is watching) and shared by every
+    subscriber. Subscribers are woken by an asyncio.Event instead of polling
+    and always jump to the newest frame, so a slow client drops stale frames
+    rather than building a backlog.
+    """
+
+    BOUNDARY = b"frame"
+
+    def __init__(self, quality=None, max_width=None, max_fps=None):
+        self.quality = int(quality if quality is not None else os.getenv("EMPATH_STREAM_QUALITY", 70))
+        self.max_width = int(max_width if max_width is not None else os.getenv("EMPATH_STREAM_MAX_WIDTH", 640))
+        self.max_fps = float(max_fps if max_fps is not None else os.getenv("EMPATH_STREAM_MAX_FPS", 15))
+
+        self._lock = threading.Lock()
+        self._jpeg = None
+        self._seq = 0
+        self._subscribers = {}  # token -> (loop, asyncio.Event)
+        self._closed = False
+        self.frames_encoded = 0
+
+    @property
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, frame):
+        """Thread-safe. Encodes the frame once and wakes every waiting client."""
+        if frame is None or not self._subscribers:
+            return False
+
+        if self.max_width and frame.shape[1] > self.max_width:
+            scale = self.max_width / frame.shape[1]
+            frame = cv2.resize(frame, (self.max_width, int(frame.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+
+        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ret:
+            return False
+
+        chunk = (b'--' + self.BOUNDARY + b'\r\n'
+                 b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+        with self._lock:
+            self._jpeg = chunk
+            self._seq += 1
+            self.frames_encoded += 1
+            subscribers = list(self._subscribers.values())
+
+        for loop, event in subscribers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Loop already closed, subscriber is going away
+        return True
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for loop, event in subscribers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass
+
+    async def stream(self, max_fps=None):
+        """
+        Async generator of multipart chunks for one client.
+        `max_fps` caps this client only (clamped to the broadcaster cap).
+        """
+        fps = min(filter(None, [max_fps, self.max_fps]), default=None)
+        min_period = 1.0 / fps if fps else 0.0
+
+        token = object()
+        event = asyncio.Event()
+        with self._lock:
+            self._subscribers[token] = (asyncio.get_running_loop(), event)
+            last_seq = self._seq
+            chunk = self._jpeg
+
+        try:
+            # Show the last known frame right away so the dashboard is not blank
+            if chunk is not None:
+                yield chunk
+
+            while not self._closed:
+                await event.wait()
+                event.clear()
+
+                with self._lock:
+                    if self._seq == last_seq:
+                        continue
+                    last_seq = self._seq
+                    chunk = self._jpeg
+
+                sent_at = time.monotonic()
+                yield chunk
+
+                # Per-client cap: frames published while we sleep are skipped, not queued
+                if min_period:
+                    wait = min_period - (time.monotonic() - sent_at)
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+        finally:
+            with self._lock:
+                self._subscribers.pop(token, None)
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "frames_encoded": self.frames_encoded,
+            "quality": self.quality,
+            "max_width": self.max_width,
+            "max_fps": self.max_fps,
+        }
@@ -0,0 +1,199 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+
+from .tracing import tracer
+
+# Higher runs first and may interrupt anything lower
+PRIORITY_IDLE = 0 # Ambient mirroring of what the camera sees
+PRIORITY_REACTION = 5
+PRIORITY_CONVERSATION = 10 # Acknowledging / answering the user
+
+
+class _MotionJob:
+    __slots__ = ("name", "priority", "seq", "run", "future", "cancel", "preempted", "trace")
+
+    def __init__(self, name, priority, seq, run, trace=None):
+        self.name = name
+        self.priority = priority
+        self.seq = seq
+        self.run = run
+        self.future = Future()
+        self.cancel = threading.Event()
+        self.preempted = False
+        self.trace = trace # Interaction waiting for this gesture to start, held until it does
+
+    def settle(self, started):
+        """Lets go of the trace, recording the gesture start if it did start."""
+        trace, self.trace = self.trace, None
+        if trace:
+            if started:
+                trace.event("gesture_start", gesture=self.name)
+            trace.release()
+
+    def __lt__(self, other):
+        return (-self.priority, self.seq) < (-other.priority, other.seq)
+
+
+class MotionScheduler:
+    """
+    Single motion-executor thread fed by a priority queue.
+    - Coalescing: submitting a gesture that is already queued or playing
+      returns the existing future (a burst of "happy" plays once).
+    - Preemption: a higher-priority gesture interrupts the one playing; the
+      running gesture sees its cancel event set at its next wait.
+    - Bounded: beyond `max_pending` the lowest-priority queued gesture is dropped.
+    Every submission returns a concurrent.futures.Future resolving to True when
+    the gesture completed and False when it was preempted, cancelled or dropped.
+    `run(cancel)` receives a threading.Event and must use `cancel.wait()`
+    instead of time.sleep so it can be interrupted.
+    """
+
+    def __init__(self, max_pending=4):
+        self.max_pending = max_pending
+        self._queue = [] # heap of _MotionJob
+        self._pending = {} # name -> queued job
+        self._current = None
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._closed = False
+        self.completed = 0
+        self.preempted = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, name, run, priority=PRIORITY_CONVERSATION):
+        with self._cond:
+            if self._closed:
+                return self._resolved(False)
+
+            current = self._current
+            if current is not None and current.name == name and not current.cancel.is_set():
+                self.coalesced += 1
+                tracer.event("gesture_start", gesture=name, coalesced=True) # Already moving
+                return current.future
+
+            job = self._pending.get(name)
+            if job is not None:
+                self.coalesced += 1
+                if priority > job.priority:
+                    # Re-queue at the higher priority; the stale heap entry is skipped
+                    job.cancel.set()
+                    replacement = _MotionJob(name, priority, job.seq, run, job.trace)
+                    replacement.future = job.future
+                    job.trace = None
+                    self._push(replacement)
+                    self._preempt_below(priority)
+                return job.future
+
+            if len(self._pending) >= self.max_pending:
+                lowest = min(self._pending.values(), key=lambda j: (j.priority, j.seq))
+                if priority < lowest.priority:
+                    self.dropped += 1
+                    return self._resolved(False)
+                self._discard(lowest)
+                self.dropped += 1
+
+            trace = tracer.current
+            if trace:
+                trace.hold()
+            job = _MotionJob(name, priority, next(self._seq), run, trace)
+            self._push(job)
+            self._preempt_below(priority)
+            return job.future
+
+    def cancel(self, name=None):
+        """Cancels queued and playing gestures (all of them, or only `name`)."""
+        with self._cond:
+            for job in list(self._pending.values()):
+                if name is None or job.name == name:
+                    self._discard(job)
+            if self._current is not None and (name is None or self._current.name == name):
+                self._current.cancel.set()
+
+    @property
+    def busy(self):
+        return self._current is not None
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def stats(self):
+        current = self._current
+        return {
+            "playing": current.name if current else None,
+            "pending": len(self._pending),
+            "completed": self.completed,
+            "preempted": self.preempted,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+        }
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+        self.cancel()
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=2)
+
+    def _push(self, job):
+        heapq.heappush(self._queue, job)
+        self._pending[job.name] = job
+        self._cond.notify()
+
+    def _preempt_below(self, priority):
+        current = self._current
+        if current is not None and priority > current.priority:
+            current.preempted = True
+            current.cancel.set()
+
+    def _discard(self, job):
+        job.cancel.set()
+        del self._pending[job.name]
+        job.future.set_result(False)
+        job.settle(started=False)
+
+    def _resolved(self, value):
+        future = Future()
+        future.set_result(value)
+        return future
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                while self._queue and self._queue[0].cancel.is_set():
+                    heapq.heappop(self._queue) # Discarded or re-prioritized
+                if self._queue:
+                    job = heapq.heappop(self._queue)
+                    del self._pending[job.name]
+                    self._current = job
+                    return job
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            completed = False
+            job.settle(started=True)
+            try:
+                job.run(job.cancel)
+                completed = not job.cancel.is_set()
+            except Exception as e:
+                print(f"⚠️ [Motion] Gesture '{job.name}' failed: {e}")
+            finally:
+                with self._cond:
+                    self._current = None
+                    if completed:
+                        self.completed += 1
+                    elif job.preempted:
+                        self.preempted += 1
+                job.future.set_result(completed)
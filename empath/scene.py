@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+import cv2
+
+# A face wider than this share of the frame is "right in front" (the old surprised heuristic)
+CLOSE_PROXIMITY = 0.4
+
+
+class FaceRecord:
+    """One person in front of the robot, keyed by the tracker's face ID."""
+
+    __slots__ = ("track_id", "box", "features", "proximity", "emotion", "confidence", "mouth_activity", "first_seen", "last_spoke", "_mouth")
+
+    def __init__(self, track_id, now):
+        self.track_id = track_id
+        self.box = (0, 0, 0, 0) # Full-resolution pixels
+        self.features = {"shirt_color": "unknown", "hair_color": "unknown"}
+        self.proximity = 0.0 # Face width / frame width
+        self.emotion = "neutral"
+        self.confidence = 0.0 # Classifier confidence; 0 for the proximity heuristic
+        self.mouth_activity = 0.0 # Smoothed frame-to-frame change of the mouth area
+        self.first_seen = now
+        self.last_spoke = None
+        self._mouth = None # Previous mouth thumbnail
+
+    def to_dict(self, primary=False):
+        return {
+            "id": self.track_id,
+            "box": list(self.box),
+            "features": dict(self.features),
+            "proximity": round(self.proximity, 3),
+            "emotion": self.emotion,
+            "emotion_confidence": round(self.confidence, 3),
+            "speaking": self.mouth_activity >= SceneModel.TALK_THRESHOLD,
+            "mouth_activity": round(self.mouth_activity, 2),
+            "primary": primary,
+        }
+
+
+class SceneModel:
+    """
+    Everyone currently in view, one FaceRecord per tracked face ID.
+    Records are updated in place each frame and dropped when their track
+    disappears. The primary face (the one the brain talks to) is the active
+    speaker, judged from mouth movement and held for `speaker_hold` seconds
+    after they stop (EMPATH_SPEAKER_HOLD), otherwise the nearest face.
+    """
+
+    TALK_THRESHOLD = 4.0 # Mean absolute grey-level change of the mouth thumbnail
+    MOUTH_SIZE = (16, 8)
+
+    def __init__(self, speaker_hold=None, alpha=0.3, clock=time.monotonic):
+        self.speaker_hold = float(speaker_hold if speaker_hold is not None else os.getenv("EMPATH_SPEAKER_HOLD", 3.0))
+        self.alpha = alpha
+        self.clock = clock
+        self.records = {} # track id -> FaceRecord
+        self.primary_id = None
+        self._lock = threading.Lock()
+
+    def update(self, tracks, boxes, apparel, frame_width, image=None, emotions=None):
+        """
+        Folds one analysed frame into the scene.
+        `boxes` are the full-resolution boxes of `tracks`, `apparel` maps track
+        ID to features, `image` is the BGR analysis image the tracks live in
+        (used for mouth movement) and `emotions` maps track ID to the
+        classifier's (label, confidence), when there is a classifier.
+        Returns the primary FaceRecord or None.
+        """
+        now = self.clock()
+        with self._lock:
+            seen = set()
+            for track, box in zip(tracks, boxes):
+                record = self.records.get(track.id)
+                if record is None:
+                    record = self.records[track.id] = FaceRecord(track.id, now)
+                record.box = box
+                record.features = apparel.get(track.id, record.features)
+                record.proximity = box[2] / float(frame_width)
+                if emotions is not None:
+                    # Keep the last result until the classifier has seen this face again
+                    if track.id in emotions:
+                        record.emotion, record.confidence = emotions[track.id]
+                else:
+                    record.emotion = "surprised" if record.proximity > CLOSE_PROXIMITY else "neutral" # Simple proximity heuristic
+                if image is not None:
+                    self._update_mouth(record, track.box, image, now)
+                seen.add(track.id)
+            for track_id in [k for k in self.records if k not in seen]:
+                del self.records[track_id]
+            self.primary_id = self._pick_primary(now)
+            return self.records.get(self.primary_id)
+
+    def _update_mouth(self, record, box, image, now):
+        x, y, w, h = box
+        # Lower third of the face, middle half: lips and jaw
+        mouth = image[y + h * 2 // 3:y + h, x + w // 4:x + w - w // 4]
+        if mouth.size == 0:
+            record._mouth = None
+            return
+        # Shrink first, then convert: only 128 pixels go through cvtColor
+        thumb = cv2.cvtColor(cv2.resize(mouth, self.MOUTH_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        if record._mouth is not None:
+            change = float(cv2.absdiff(thumb, record._mouth).mean())
+            record.mouth_activity += self.alpha * (change - record.mouth_activity)
+            if record.mouth_activity >= self.TALK_THRESHOLD:
+                record.last_spoke = now
+        record._mouth = thumb
+
+    def _pick_primary(self, now):
+        if not self.records:
+            return None
+        speakers = [r for r in self.records.values() if r.last_spoke is not None and now - r.last_spoke <= self.speaker_hold]
+        if speakers:
+            return max(speakers, key=lambda r: (r.last_spoke, r.mouth_activity)).track_id
+        return max(self.records.values(), key=lambda r: r.proximity).track_id
+
+    @property
+    def primary(self):
+        with self._lock:
+            return self.records.get(self.primary_id)
+
+    def visual_notes(self):
+        """Context for brain queries: the primary face's features plus how many people are in view."""
+        with self._lock:
+            record = self.records.get(self.primary_id)
+            notes = dict(record.features) if record else {}
+            notes["people"] = len(self.records)
+            return notes
+
+    def to_list(self):
+        """Every face in view, nearest first."""
+        with self._lock:
+            records = sorted(self.records.values(), key=lambda r: r.proximity, reverse=True)
+            return [r.to_dict(primary=r.track_id == self.primary_id) for r in records]
+
+    def reset(self):
+        with self._lock:
+            self.records = {}
+            self.primary_id = None
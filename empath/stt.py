@@ -0,0 +1,218 @@
+import json
+import os
+import numpy as np
+
+from .audio import rms
+
+try:
+    import speech_recognition as sr
+except ImportError:
+    sr = None
+
+try:
+    import vosk
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+try:
+    from pywhispercpp.model import Model as WhisperCppModel
+    WHISPER_CPP_AVAILABLE = True
+except ImportError:
+    WHISPER_CPP_AVAILABLE = False
+
+
+class STTBackend:
+    """
+    Speech-to-text backend interface used by EmpathEar.
+
+    Every backend can `transcribe()` a finished utterance. Streaming backends
+    (`streaming = True`) also hand out RecognitionStreams that take raw PCM
+    as it is captured and report partial transcripts before the phrase ends.
+    Audio is 16-bit mono PCM at `sample_rate`.
+    """
+
+    name = "base"
+    streaming = False
+    needs_network = False
+    sample_rate = 16000
+
+    def transcribe(self, pcm, sample_rate=None):
+        raise NotImplementedError
+
+    def create_stream(self):
+        raise NotImplementedError(f"{self.name} backend does not support streaming")
+
+
+class RecognitionStream:
+    """
+    One continuous recognition session.
+    `accept(pcm)` returns (partial, final): `partial` is the running hypothesis
+    for the phrase in progress, `final` is set once the backend decided the
+    phrase ended. Either may be None.
+    """
+
+    def accept(self, pcm):
+        raise NotImplementedError
+
+    def finish(self):
+        """Flushes the phrase in progress and returns its final text (or None)."""
+        raise NotImplementedError
+
+
+class GoogleSTT(STTBackend):
+    """Free Google Web Speech API via SpeechRecognition. Network only, no partials."""
+
+    name = "google"
+    needs_network = True
+
+    def __init__(self, language="en-US"):
+        if sr is None:
+            raise RuntimeError("SpeechRecognition is not installed")
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm, sample_rate=None):
+        audio = pcm if isinstance(pcm, sr.AudioData) else sr.AudioData(pcm, sample_rate or self.sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return None
+
+
+class VoskSTT(STTBackend):
+    """
+    Offline streaming recognizer (Kaldi/Vosk, CPU).
+    Set EMPATH_VOSK_MODEL to a model directory, otherwise the small English
+    model is fetched once by vosk and then used offline.
+    """
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=None, lang="en-us", grammar=None):
+        if not VOSK_AVAILABLE:
+            raise RuntimeError("vosk is not installed (pip install vosk)")
+        vosk.SetLogLevel(-1)
+        model_path = model_path or os.getenv("EMPATH_VOSK_MODEL")
+        self.model = vosk.Model(model_path) if model_path else vosk.Model(lang=lang)
+        self.grammar = grammar
+
+    def _recognizer(self):
+        if self.grammar:
+            return vosk.KaldiRecognizer(self.model, self.sample_rate, json.dumps(self.grammar))
+        return vosk.KaldiRecognizer(self.model, self.sample_rate)
+
+    def create_stream(self):
+        return _VoskStream(self._recognizer())
+
+    def transcribe(self, pcm, sample_rate=None):
+        recognizer = self._recognizer()
+        recognizer.AcceptWaveform(bytes(pcm))
+        return json.loads(recognizer.FinalResult()).get("text") or None
+
+
+class _VoskStream(RecognitionStream):
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self._last_partial = None
+
+    def accept(self, pcm):
+        if self.recognizer.AcceptWaveform(bytes(pcm)):
+            self._last_partial = None
+            return None, json.loads(self.recognizer.Result()).get("text") or None
+        partial = json.loads(self.recognizer.PartialResult()).get("partial") or None
+        if partial == self._last_partial:
+            return None, None # Only report changes
+        self._last_partial = partial
+        return partial, None
+
+    def finish(self):
+        self._last_partial = None
+        return json.loads(self.recognizer.FinalResult()).get("text") or None
+
+
+class WhisperCppSTT(STTBackend):
+    """
+    Offline whisper.cpp recognizer (pywhispercpp, CPU).
+    Whisper is not natively incremental, so streams follow whisper.cpp's own
+    `stream` example: the phrase in progress is re-decoded every `step`
+    seconds for partials, and an energy endpointer closes the phrase after
+    `silence` seconds of quiet.
+    """
+
+    name = "whisper_cpp"
+    streaming = True
+
+    def __init__(self, model=None, threads=None, step=0.8, silence=0.7, energy_threshold=300, max_phrase=12.0):
+        if not WHISPER_CPP_AVAILABLE:
+            raise RuntimeError("pywhispercpp is not installed (pip install pywhispercpp)")
+        model = model or os.getenv("EMPATH_WHISPER_MODEL", "base.en")
+        self.model = WhisperCppModel(model, n_threads=threads or max(1, (os.cpu_count() or 2) // 2), print_progress=False, print_realtime=False)
+        self.step = step
+        self.silence = silence
+        self.energy_threshold = energy_threshold
+        self.max_phrase = max_phrase
+
+    def transcribe(self, pcm, sample_rate=None):
+        samples = np.frombuffer(bytes(pcm), dtype="<i2").astype(np.float32) / 32768.0
+        if samples.size == 0:
+            return None
+        text = " ".join(segment.text.strip() for segment in self.model.transcribe(samples)).strip()
+        return text or None
+
+    def create_stream(self):
+        return _WhisperStream(self)
+
+
+class _WhisperStream(RecognitionStream):
+    def __init__(self, backend):
+        self.backend = backend
+        self.bytes_per_second = backend.sample_rate * 2
+        self._phrase = bytearray()
+        self._in_speech = False
+        self._silent_bytes = 0
+        self._since_decode = 0
+
+    def accept(self, pcm):
+        loud = rms(pcm) >= self.backend.energy_threshold
+        if not self._in_speech:
+            if not loud:
+                return None, None
+            self._in_speech = True
+
+        self._phrase += pcm
+        self._since_decode += len(pcm)
+        self._silent_bytes = 0 if loud else self._silent_bytes + len(pcm)
+
+        phrase_seconds = len(self._phrase) / self.bytes_per_second
+        if self._silent_bytes / self.bytes_per_second >= self.backend.silence or phrase_seconds >= self.backend.max_phrase:
+            return None, self.finish()
+
+        if self._since_decode / self.bytes_per_second >= self.backend.step:
+            self._since_decode = 0
+            return self.backend.transcribe(self._phrase), None
+        return None, None
+
+    def finish(self):
+        phrase = bytes(self._phrase)
+        self._phrase = bytearray()
+        self._in_speech = False
+        self._silent_bytes = 0
+        self._since_decode = 0
+        return self.backend.transcribe(phrase) if phrase else None
+
+
+BACKENDS = {
+    "google": GoogleSTT,
+    "vosk": VoskSTT,
+    "whisper_cpp": WhisperCppSTT,
+}
+
+
+def create_backend(name=None, **kwargs):
+    """Builds the backend named by `name` or EMPATH_STT (default: google)."""
+    name = (name or os.getenv("EMPATH_STT", "google")).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STT backend '{name}' (use one of {', '.join(BACKENDS)})")
+    return BACKENDS[name](**kwargs)
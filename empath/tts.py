@@ -0,0 +1,294 @@
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import wave
+from collections import OrderedDict
+import numpy as np
+
+try:
+    from gtts import gTTS
+    GTTS_AVAILABLE = True
+except ImportError:
+    GTTS_AVAILABLE = False
+
+_SPACES = re.compile(r"\s+")
+
+
+class Speech:
+    """Synthesized audio held in memory: 16-bit mono PCM at `sample_rate`."""
+
+    __slots__ = ("pcm", "sample_rate", "text")
+
+    def __init__(self, pcm, sample_rate, text=""):
+        self.pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+        self.sample_rate = int(sample_rate)
+        self.text = text
+
+    @property
+    def duration(self):
+        return len(self.pcm) / float(self.sample_rate)
+
+    @property
+    def nbytes(self):
+        return self.pcm.nbytes
+
+    def to_wav(self):
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(self.pcm.tobytes())
+        return buf.getvalue()
+
+    @classmethod
+    def from_wav(cls, data, text=""):
+        with wave.open(io.BytesIO(data), "rb") as w:
+            if w.getsampwidth() != 2:
+                raise ValueError("Expected 16-bit WAV")
+            pcm = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+            if w.getnchannels() > 1:
+                pcm = pcm.reshape(-1, w.getnchannels()).mean(axis=1).astype(np.int16)
+            return cls(pcm, w.getframerate(), text)
+
+
+def _run(command, data=None, timeout=30):
+    """Runs a command with `data` on stdin and returns its stdout, all through pipes."""
+    result = subprocess.run(command, input=data, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"{command[0]} failed: {result.stderr.decode(errors='ignore').strip()[:200]}")
+    return result.stdout
+
+
+class TTSBackend:
+    """
+    Text-to-speech backend interface used by EmpathVoice.
+    `synthesize(text)` returns a Speech, entirely in memory. `voice` names
+    the backend and its settings; it is part of the synthesis cache key.
+    """
+
+    name = "base"
+    needs_network = False
+
+    @property
+    def voice(self):
+        return self.name
+
+    def synthesize(self, text):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    """
+    Google Translate TTS (gTTS), British English. Network only. The MP3 is
+    written to a BytesIO and decoded through an ffmpeg or mpg123 pipe.
+    """
+
+    name = "gtts"
+    needs_network = True
+    sample_rate = 24000 # What gTTS serves
+
+    def __init__(self, lang="en", tld="co.uk"):
+        if not GTTS_AVAILABLE:
+            raise RuntimeError("gTTS is not installed (pip install gTTS)")
+        self.lang = lang
+        self.tld = tld # British accent for professional 'Tadashi' feel
+        if shutil.which("ffmpeg"):
+            self._decoder = ["ffmpeg", "-loglevel", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1", "-ar", str(self.sample_rate), "pipe:1"]
+        elif shutil.which("mpg123"):
+            self._decoder = ["mpg123", "-q", "-s", "-m", "-r", str(self.sample_rate), "-"]
+        else:
+            raise RuntimeError("gTTS needs ffmpeg or mpg123 to decode its MP3 in memory")
+
+    @property
+    def voice(self):
+        return f"gtts:{self.lang}:{self.tld}"
+
+    def synthesize(self, text):
+        mp3 = io.BytesIO()
+        gTTS(text=text, lang=self.lang, tld=self.tld, slow=False).write_to_fp(mp3)
+        pcm = np.frombuffer(_run(self._decoder, mp3.getvalue()), dtype="<i2")
+        return Speech(pcm, self.sample_rate, text)
+
+
+class EspeakBackend(TTSBackend):
+    """Offline formant synthesis with espeak-ng (or espeak). Robotic, but instant and always there."""
+
+    name = "espeak"
+
+    def __init__(self, voice=None, speed=165):
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+        if not self.binary:
+            raise RuntimeError("espeak-ng is not installed (apt install espeak-ng)")
+        self.voice_name = voice or os.getenv("EMPATH_ESPEAK_VOICE", "en-gb")
+        self.speed = speed
+
+    @property
+    def voice(self):
+        return f"espeak:{self.voice_name}:{self.speed}"
+
+    def synthesize(self, text):
+        # --stdout writes a WAV; text goes in on stdin so nothing is shell-quoted
+        wav = _run([self.binary, "--stdout", "-v", self.voice_name, "-s", str(self.speed)], text.encode("utf-8"))
+        return Speech.from_wav(wav, text)
+
+
+class PiperBackend(TTSBackend):
+    """
+    Offline neural TTS with the Piper CLI. EMPATH_PIPER_MODEL points at an
+    .onnx voice (its .onnx.json next to it gives the sample rate).
+    """
+
+    name = "piper"
+
+    def __init__(self, model=None, binary=None):
+        self.binary = binary or os.getenv("EMPATH_PIPER_BIN") or shutil.which("piper")
+        if not self.binary:
+            raise RuntimeError("piper is not installed (pip install piper-tts)")
+        self.model = model or os.getenv("EMPATH_PIPER_MODEL", "en_GB-alan-medium.onnx")
+        if not os.path.exists(self.model):
+            raise RuntimeError(f"Piper voice not found at '{self.model}' (set EMPATH_PIPER_MODEL)")
+        self.sample_rate = 22050
+        try:
+            with open(f"{self.model}.json", "r", encoding="utf-8") as f:
+                self.sample_rate = int(json.load(f)["audio"]["sample_rate"])
+        except Exception:
+            pass
+
+    @property
+    def voice(self):
+        return f"piper:{os.path.basename(self.model)}"
+
+    def synthesize(self, text):
+        raw = _run([self.binary, "--model", self.model, "--output_raw"], text.encode("utf-8"))
+        return Speech(np.frombuffer(raw, dtype="<i2"), self.sample_rate, text)
+
+
+BACKENDS = {
+    "gtts": GTTSBackend,
+    "piper": PiperBackend,
+    "espeak": EspeakBackend,
+}
+
+
+def create_tts(names=None):
+    """
+    Builds the backends named in `names` or EMPATH_TTS, a comma-separated
+    preference list (default: gtts,piper,espeak). Unknown and unavailable
+    ones are skipped with a warning; the rest are returned in order, so
+    offline engines back up gTTS.
+    """
+    names = names or os.getenv("EMPATH_TTS", "gtts,piper,espeak")
+    if isinstance(names, str):
+        names = [n.strip().lower() for n in names.split(",") if n.strip()]
+    backends = []
+    for name in names:
+        if name not in BACKENDS:
+            print(f"⚠️ [Voice] Unknown TTS backend '{name}' skipped (use one of {', '.join(BACKENDS)})")
+            continue
+        try:
+            backends.append(BACKENDS[name]())
+        except Exception as e:
+            print(f"⚠️ [Voice] TTS backend '{name}' unavailable: {e}")
+    return backends
+
+
+class SpeechCache:
+    """
+    Content-addressed cache of synthesized audio: the key is a hash of the
+    voice and the (whitespace-normalized) text, so a repeated line is never
+    synthesized twice. LRU in memory up to `max_bytes` (EMPATH_TTS_CACHE_MB);
+    with a directory (EMPATH_TTS_CACHE_DIR) entries are also kept as WAV
+    files and survive restarts.
+    """
+
+    def __init__(self, max_bytes=None, directory=None):
+        self.max_bytes = int(max_bytes if max_bytes is not None else float(os.getenv("EMPATH_TTS_CACHE_MB", 32)) * 1024 * 1024)
+        self.directory = directory if directory is not None else os.getenv("EMPATH_TTS_CACHE_DIR")
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self._entries = OrderedDict() # key -> Speech
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(voice, text):
+        normalized = _SPACES.sub(" ", text).strip()
+        return hashlib.sha256(f"{voice}\n{normalized}".encode("utf-8")).hexdigest()[:32]
+
+    def get(self, key):
+        with self._lock:
+            speech = self._entries.get(key)
+            if speech is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return speech
+        speech = self._load(key)
+        with self._lock:
+            if speech is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(key, speech)
+        return speech
+
+    def put(self, key, speech):
+        if speech is None or not len(speech.pcm):
+            return
+        self._remember(key, speech)
+        if self.directory:
+            path = os.path.join(self.directory, f"{key}.wav")
+            tmp_path = None
+            try:
+                # Own temp file per writer: prewarm and the synth worker may store the same line at once
+                fd, tmp_path = tempfile.mkstemp(prefix=f"{key}.", suffix=".tmp", dir=self.directory)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(speech.to_wav())
+                os.replace(tmp_path, path) # Atomic swap, never a half-written entry
+            except Exception as e:
+                print(f"⚠️ [Voice] Could not persist cached speech: {e}")
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def _remember(self, key, speech):
+        if speech.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = speech
+            self._bytes += speech.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(os.path.join(self.directory, f"{key}.wav"), "rb") as f:
+                return Speech.from_wav(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ [Voice] Could not read cached speech: {e}")
+            return None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "megabytes": round(self._bytes / 1048576.0, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,351 @@
+import json
+import os
+import re
+import time
+from collections import deque
+
+# phrase -> minimum confidence to accept a *fuzzy* match (exact hits always score 1.0).
+# Short greetings are exact-only so "this" / "they" / "high" never wake the robot.
+DEFAULT_PHRASES = {
+    "hello reachy": 0.75, "hey reachy": 0.75, "hi reachy": 0.75,
+    # Single words need a tighter edit-distance bound ("reach" must not wake "reachy")
+    "reachy": 0.85, "jarvis": 0.85, "tadashi": 0.85,
+    # Known speech-to-text mishearings of "hey reachy"
+    "hey richie": 1.0, "hello ritchie": 1.0, "hey ricky": 1.0, "hey rici": 1.0,
+    "hey reach": 1.0, "hey bridgey": 1.0,
+    "hello": 1.0, "hi": 1.0, "hey": 1.0,
+    "talk back": 0.85, "can you hear": 0.85, "can you talk": 0.85,
+}
+
+PHONETIC_SCORE = 0.9
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+# --- Phonetic keys ---
+
+_VOWELS = set("aeiou")
+
+
+def metaphone(word):
+    """
+    Compact Metaphone: enough of Lawrence Philips' rules to fold the usual
+    transcription variants together ("reachy" / "richie" / "ritchie" -> "RXA").
+    Unlike classic Metaphone a sounded final vowel is kept as "A", so "reachy"
+    and the everyday word "reach" ("RX") stay apart.
+    """
+    w = "".join(c for c in word.lower() if c.isalpha())
+    if not w:
+        return ""
+    for prefix, repl in (("kn", "n"), ("gn", "n"), ("pn", "n"), ("wr", "r"), ("ae", "e"), ("wh", "w")):
+        if w.startswith(prefix):
+            w = repl + w[len(prefix):]
+            break
+    if w[0] == "x":
+        w = "s" + w[1:]
+
+    key = []
+    i = 0
+    n = len(w)
+    while i < n:
+        c = w[i]
+        nxt = w[i + 1] if i + 1 < n else ""
+        prev = w[i - 1] if i > 0 else ""
+        if c == prev and c != "c":
+            i += 1
+            continue
+        if c in _VOWELS:
+            if i == 0:
+                key.append("A")
+        elif c == "b":
+            if not (prev == "m" and i == n - 1):
+                key.append("B")
+        elif c == "c":
+            if nxt == "h":
+                key.append("X")
+                i += 1
+            elif nxt in "iey":
+                key.append("S")
+            elif not (prev == "s" and nxt in "iey"):
+                key.append("K")
+        elif c == "d":
+            if nxt == "g" and i + 2 < n and w[i + 2] in "iey":
+                key.append("J")
+                i += 1
+            else:
+                key.append("T")
+        elif c == "g":
+            if nxt == "h" and not (i + 2 < n and w[i + 2] in _VOWELS):
+                i += 1 # Silent "gh" as in "night"
+            elif nxt == "n":
+                pass
+            elif nxt in "iey":
+                key.append("J")
+            else:
+                key.append("K")
+        elif c == "h":
+            if nxt in _VOWELS and prev not in "cgpst":
+                key.append("H")
+        elif c == "k":
+            if prev != "c":
+                key.append("K")
+        elif c == "p":
+            if nxt == "h":
+                key.append("F")
+                i += 1
+            else:
+                key.append("P")
+        elif c == "q":
+            key.append("K")
+        elif c == "s":
+            if nxt == "h":
+                key.append("X")
+                i += 1
+            elif nxt == "i" and i + 2 < n and w[i + 2] in "ao":
+                key.append("X")
+            else:
+                key.append("S")
+        elif c == "t":
+            if nxt == "h":
+                key.append("0")
+                i += 1
+            elif nxt == "c" and i + 2 < n and w[i + 2] == "h":
+                pass # "tch" -> "ch"
+            elif nxt == "i" and i + 2 < n and w[i + 2] in "ao":
+                key.append("X")
+            else:
+                key.append("T")
+        elif c == "v":
+            key.append("F")
+        elif c in "wy":
+            if nxt in _VOWELS:
+                key.append(c.upper())
+        elif c == "x":
+            key.append("KS")
+        elif c == "z":
+            key.append("S")
+        else:
+            key.append(c.upper())
+        i += 1
+    if n > 1 and (w[-1] in "aiouy" or (w[-1] == "e" and w[-2] in "aeiouy")):
+        key.append("A")
+    return "".join(key)
+
+
+_SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"]) for c in letters}
+
+
+def soundex(word):
+    w = "".join(c for c in word.lower() if c.isalpha())
+    if not w:
+        return ""
+    code = [w[0].upper()]
+    last = _SOUNDEX_CODES.get(w[0])
+    for c in w[1:]:
+        digit = _SOUNDEX_CODES.get(c)
+        if digit != "0" and digit != last:
+            code.append(digit)
+        if c not in "hw":
+            last = digit
+    return ("".join(code) + "000")[:4]
+
+
+PHONETIC_ENCODERS = {"metaphone": metaphone, "soundex": soundex}
+
+
+def edit_distance(a, b, limit=None):
+    """Levenshtein distance with an optional early-exit bound."""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+# --- Token-level Aho-Corasick ---
+
+class _TokenAutomaton:
+    """
+    Aho-Corasick automaton whose alphabet is whole tokens, so phrases only ever
+    match on word boundaries and every phrase is found in a single pass.
+    """
+
+    def __init__(self, sequences):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for sequence, value in sequences:
+            node = 0
+            for token in sequence:
+                if token not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[node][token] = len(self.goto) - 1
+                node = self.goto[node][token]
+            self.output[node].append((len(sequence), value))
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and token not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(token, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def search(self, tokens):
+        """Yields (start_index, value) for every phrase occurrence."""
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(token, 0)
+            for length, value in self.output[node]:
+                yield i - length + 1, value
+
+
+class WakeMatch:
+    __slots__ = ("phrase", "score", "method", "start")
+
+    def __init__(self, phrase, score, method, start):
+        self.phrase = phrase
+        self.score = score
+        self.method = method
+        self.start = start
+
+    def __repr__(self):
+        return f"WakeMatch({self.phrase!r}, score={self.score:.2f}, method={self.method})"
+
+
+class WakeWordEngine:
+    """
+    Shared wake-word matcher for both entry points.
+    Phrases are compiled once into token-level Aho-Corasick automata (one on the
+    words, one on their phonetic keys), so matching is a single pass over the
+    transcript and always respects word boundaries. An edit-distance pass
+    catches near misses the phonetic keys do not fold together. Every match
+    carries a confidence score that is compared to the phrase's threshold.
+    Custom phrases/thresholds can be passed in, or loaded from the JSON object
+    file named by EMPATH_WAKE_PHRASES ({"phrase": threshold, ...}).
+    """
+
+    def __init__(self, phrases=None, phonetic=None, phonetic_score=PHONETIC_SCORE):
+        if phrases is None and os.getenv("EMPATH_WAKE_PHRASES"):
+            with open(os.getenv("EMPATH_WAKE_PHRASES")) as f:
+                phrases = json.load(f)
+        self.phrases = dict(phrases or DEFAULT_PHRASES)
+        self.phonetic_score = phonetic_score
+        encoder_name = phonetic or os.getenv("EMPATH_WAKE_PHONETIC", "metaphone")
+        self.encode = PHONETIC_ENCODERS[encoder_name]
+
+        self._phrase_tokens = {phrase: tuple(tokenize(phrase)) for phrase in self.phrases}
+        self._exact = _TokenAutomaton((tokens, phrase) for phrase, tokens in self._phrase_tokens.items())
+        self._phonetic = _TokenAutomaton(
+            (tuple(self.encode(t) for t in tokens), phrase)
+            for phrase, tokens in self._phrase_tokens.items()
+            if self.phrases[phrase] < 1.0
+        )
+        # Fuzzy candidates grouped by word count so each transcript window is compared once
+        self._fuzzy = {}
+        for phrase, tokens in self._phrase_tokens.items():
+            if self.phrases[phrase] < 1.0:
+                self._fuzzy.setdefault(len(tokens), []).append((" ".join(tokens), phrase))
+        self._phonetic_cache = {}
+
+    def match(self, text):
+        """Returns the best WakeMatch above its phrase threshold, or None."""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+
+        best = None
+        for start, phrase in self._exact.search(tokens):
+            # Longest exact phrase wins ("hey reachy" over "hey")
+            if best is None or len(phrase) > len(best.phrase):
+                best = WakeMatch(phrase, 1.0, "exact", start)
+        if best is not None:
+            return best
+
+        codes = [self._phonetic_key(t) for t in tokens]
+        for start, phrase in self._phonetic.search(codes):
+            if self.phonetic_score >= self.phrases[phrase] and (best is None or len(phrase) > len(best.phrase)):
+                best = WakeMatch(phrase, self.phonetic_score, "phonetic", start)
+        if best is not None:
+            return best
+
+        for size, candidates in self._fuzzy.items():
+            for start in range(0, len(tokens) - size + 1):
+                window = " ".join(tokens[start:start + size])
+                for target, phrase in candidates:
+                    threshold = self.phrases[phrase]
+                    longest = max(len(window), len(target))
+                    limit = int((1.0 - threshold) * longest)
+                    if abs(len(window) - len(target)) > limit:
+                        continue # Length alone rules it out
+                    distance = edit_distance(window, target, limit)
+                    if distance > limit:
+                        continue
+                    score = 1.0 - distance / longest
+                    if score >= threshold and (best is None or score > best.score):
+                        best = WakeMatch(phrase, score, "fuzzy", start)
+        return best
+
+    def is_wake(self, text):
+        return self.match(text) is not None
+
+    def _phonetic_key(self, token):
+        key = self._phonetic_cache.get(token)
+        if key is None:
+            if len(self._phonetic_cache) > 4096:
+                self._phonetic_cache.clear()
+            key = self._phonetic_cache[token] = self.encode(token)
+        return key
+
+
+class EngagementGate:
+    """
+    The activation rule of on_hear_text, shared by both apps and the benchmarks.
+    A transcript activates the robot when it holds a wake word, when it comes
+    within `window` seconds of the last exchange (follow-up questions), or
+    while the camera sees a non-neutral face. The gate starts engaged so the
+    first thing said after startup is answered.
+    """
+
+    def __init__(self, engine=None, window=300.0):
+        self.engine = engine or WakeWordEngine()
+        self.window = window
+        self.last_engagement = time.time()
+
+    def engage(self, at=None):
+        """Restarts the conversation window."""
+        self.last_engagement = time.time() if at is None else at
+
+    def remaining(self, at=None):
+        """Seconds left in the conversation window (0 once it closed)."""
+        return max(0.0, self.window - ((time.time() if at is None else at) - self.last_engagement))
+
+    def decide(self, text, emotion="neutral", at=None):
+        """Returns (active, reason, match); reason is the match method, "session", "face" or None."""
+        match = self.engine.match(text)
+        if match is not None:
+            return True, match.method, match
+        if self.remaining(at) > 0:
+            return True, "session", None
+        if emotion != "neutral":
+            return True, "face", None
+        return False, None, None
@@ -0,0 +1,119 @@
+import os
+import cv2
+import numpy as np
+
+COLOR_NAMES = ("black", "white", "gray", "red", "orange", "brown", "yellow", "green", "blue", "purple", "pink")
+_INDEX = {name: i for i, name in enumerate(COLOR_NAMES)}
+
+# OpenCV hue (0-179) -> colour for saturated pixels
+_HUE_LUT = np.empty(180, dtype=np.uint8)
+for _lo, _hi, _name in ((0, 8, "red"), (8, 20, "orange"), (20, 35, "yellow"), (35, 85, "green"),
+                        (85, 130, "blue"), (130, 150, "purple"), (150, 170, "pink"), (170, 180, "red")):
+    _HUE_LUT[_lo:_hi] = _INDEX[_name]
+
+
+def _classify_hsv(h, s, v):
+    labels = _HUE_LUT[np.minimum(h, 179)]
+    labels = np.where((labels == _INDEX["orange"]) & (v < 150), _INDEX["brown"], labels)
+    achromatic = s < 50
+    labels = np.where(achromatic, np.where(v > 190, _INDEX["white"], _INDEX["gray"]), labels)
+    return np.where(v < 55, _INDEX["black"], labels).astype(np.uint8)
+
+
+# The rules above baked into one (hue, saturation/8, value/8) table: a pixel costs a single lookup
+_h, _s, _v = np.meshgrid(np.arange(180), np.arange(32) * 8 + 4, np.arange(32) * 8 + 4, indexing="ij")
+_LUT = _classify_hsv(_h, _s, _v)
+del _h, _s, _v
+
+
+def classify_pixels(hsv):
+    """Colour index per pixel for an (..., 3) HSV uint8 array."""
+    return _LUT[hsv[..., 0], hsv[..., 1] >> 3, hsv[..., 2] >> 3]
+
+
+def apparel_regions(box, frame_shape):
+    """Hair (above the forehead) and shirt (below the chin) rectangles for a face box, clipped."""
+    x, y, w, h = box
+    height, width = frame_shape[:2]
+    hair = (x + w // 10, max(0, y - int(h * 0.25)), x + w - w // 10, max(0, y + int(h * 0.05)))
+    shirt_y = min(height, y + h + int(h * 0.2))
+    shirt = (x, shirt_y, x + w, min(height, shirt_y + int(h * 0.6)))
+    return tuple((max(0, x0), y0, min(width, x1), y1) for x0, y0, x1, y1 in (hair, shirt))
+
+
+class ApparelAnalyzer:
+    """
+    Shirt and hair colour per tracked face.
+    All due ROIs of a frame are sampled on a `sample_side` grid, stacked and
+    converted to HSV in one call; each pixel is named from a hue table, and
+    the ROI takes the colour with the most pixels (so striped or patterned
+    shirts still read as their main colour). Results are cached per track ID
+    and refreshed every `refresh_every` frames (EMPATH_APPAREL_REFRESH).
+    """
+
+    def __init__(self, refresh_every=None, sample_side=24, min_share=0.3):
+        self.refresh_every = max(1, int(refresh_every or os.getenv("EMPATH_APPAREL_REFRESH", 15)))
+        self.sample_side = sample_side
+        self.min_share = min_share
+        self._cache = {} # track id -> (frame index, features)
+        self._frame = 0
+        self.computed = 0
+        self.reused = 0
+
+    def analyze(self, frame, tracks):
+        """Returns {track id: {"shirt_color", "hair_color"}} for `tracks` (objects with .id and .box)."""
+        self._frame += 1
+        results = {}
+        due = []
+        for track in tracks:
+            cached = self._cache.get(track.id)
+            if cached is not None and self._frame - cached[0] < self.refresh_every:
+                results[track.id] = cached[1]
+                self.reused += 1
+            else:
+                due.append(track)
+
+        if due:
+            names = self.classify_regions(frame, [r for t in due for r in apparel_regions(t.box, frame.shape)])
+            for i, track in enumerate(due):
+                features = {"shirt_color": names[2 * i + 1], "hair_color": names[2 * i]}
+                self._cache[track.id] = (self._frame, features)
+                results[track.id] = features
+            self.computed += len(due)
+
+        # Forget faces that left long ago
+        if len(self._cache) > 4 * max(1, len(tracks)) + 8:
+            horizon = self._frame - 10 * self.refresh_every
+            self._cache = {k: v for k, v in self._cache.items() if v[0] >= horizon}
+        return results
+
+    def classify_regions(self, frame, regions):
+        """Dominant colour name for each (x0, y0, x1, y1) region of a BGR frame, in one batch."""
+        side = self.sample_side
+        batch = np.zeros((len(regions) * side, side, 3), dtype=np.uint8)
+        valid = np.zeros(len(regions), dtype=bool)
+        for i, (x0, y0, x1, y1) in enumerate(regions):
+            if x1 - x0 < 2 or y1 - y0 < 2:
+                continue
+            # Nearest-neighbour sampling: the vote needs pixels, not averages (INTER_AREA would read every pixel)
+            cv2.resize(frame[y0:y1, x0:x1], (side, side), dst=batch[i * side:(i + 1) * side], interpolation=cv2.INTER_NEAREST)
+            valid[i] = True
+
+        labels = classify_pixels(cv2.cvtColor(batch, cv2.COLOR_BGR2HSV)).reshape(len(regions), -1)
+        # Per-region histogram in one bincount: offset each region's labels into its own bin range
+        offsets = np.arange(len(regions))[:, None] * len(COLOR_NAMES)
+        counts = np.bincount((labels + offsets).ravel(), minlength=len(regions) * len(COLOR_NAMES)).reshape(len(regions), -1)
+        best = counts.argmax(axis=1)
+        share = counts.max(axis=1) / float(side * side)
+        return [
+            COLOR_NAMES[b] if ok and s >= self.min_share else "unknown"
+            for b, s, ok in zip(best, share, valid)
+        ]
+
+    def stats(self):
+        total = self.computed + self.reused
+        return {
+            "refresh_every": self.refresh_every,
+            "cached_faces": len(self._cache),
+            "reuse_ratio": round(self.reused / total, 3) if total else None,
+        }
@@ -0,0 +1,313 @@
+import os
+import threading
+import time
+from collections import deque
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size ring of raw PCM bytes fed by the capture thread.
+    Capture never blocks: it just keeps writing and overwrites the oldest audio.
+    Readers track their own absolute byte position, so recognition can lag
+    behind (e.g. while a model call is running) without any audio being lost,
+    as long as it catches up within the buffer length.
+    """
+
+    def __init__(self, seconds=30, sample_rate=16000, sample_width=2):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.capacity = int(seconds * sample_rate) * sample_width
+        self._buf = bytearray(self.capacity)
+        self._written = 0 # Total bytes ever written (absolute position of the write head)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.overruns = 0
+
+    @property
+    def position(self):
+        return self._written
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def write(self, data):
+        if not data:
+            return
+        with self._cond:
+            data = memoryview(data)
+            if len(data) > self.capacity:
+                self._written += len(data) - self.capacity
+                data = data[-self.capacity:]
+            start = self._written % self.capacity
+            first = min(len(data), self.capacity - start)
+            self._buf[start:start + first] = data[:first]
+            if first < len(data):
+                self._buf[:len(data) - first] = data[first:]
+            self._written += len(data)
+            self._cond.notify_all()
+
+    def read(self, position, max_bytes=None, timeout=0.5):
+        """
+        Returns (data, new_position) with everything written since `position`.
+        Waits up to `timeout` for new audio. If the reader fell further behind
+        than the ring holds, it is moved forward to the oldest retained byte.
+        """
+        with self._cond:
+            if self._written <= position and not self._closed:
+                self._cond.wait(timeout)
+            oldest = max(0, self._written - self.capacity)
+            if position < oldest:
+                self.overruns += 1
+                position = oldest
+            end = self._written if max_bytes is None else min(self._written, position + max_bytes)
+            if end <= position:
+                return b"", position
+            start = position % self.capacity
+            length = end - position
+            first = min(length, self.capacity - start)
+            data = bytes(self._buf[start:start + first])
+            if first < length:
+                data += bytes(self._buf[:length - first])
+            return data, end
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def seconds_behind(self, position):
+        return (self._written - position) / float(self.sample_rate * self.sample_width)
+
+
+def rms(pcm, sample_width=2):
+    """Root-mean-square energy of 16-bit little-endian PCM (0-32768)."""
+    if not pcm:
+        return 0.0
+    samples = np.frombuffer(pcm, dtype="<i2" if sample_width == 2 else "<i4").astype(np.float32)
+    return float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+
+
+
+class DropOldestQueue:
+    """
+    Bounded FIFO where a full queue evicts its oldest item instead of blocking
+    the producer. Used between audio capture and recognition: capture must
+    never stall, and under overload the freshest speech is the most useful.
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize = max(1, maxsize)
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        """Adds an item; returns the evicted item (or None)."""
+        with self._cond:
+            evicted = None
+            if len(self._items) >= self.maxsize:
+                evicted = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+            return evicted
+
+    def get(self, timeout=None):
+        """Pops the oldest item, or returns None after `timeout`."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SpeechOnsetDetector:
+    """
+    Energy-based "someone started talking" detector fed by the capture thread.
+    Calls `on_start()` once audio has stayed above `threshold` for
+    `min_speech` seconds, then re-arms after `min_silence` seconds of quiet.
+    `threshold` may be a callable, e.g. SpeechRecognition's dynamic energy
+    threshold. Used for barge-in: it fires long before the phrase is finished
+    and transcribed.
+    """
+
+    def __init__(self, on_start, threshold=300, sample_rate=16000, min_speech=0.25, min_silence=0.4):
+        self.on_start = on_start
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.min_speech = min_speech
+        self.min_silence = min_silence
+        self._loud = 0.0 # Seconds of continuous speech
+        self._quiet = 0.0
+        self._active = False
+        self.onsets = 0
+
+    def feed(self, pcm):
+        if not pcm:
+            return
+        seconds = len(pcm) / (2.0 * self.sample_rate)
+        threshold = self.threshold() if callable(self.threshold) else self.threshold
+        if rms(pcm) >= threshold:
+            self._loud += seconds
+            self._quiet = 0.0
+            if not self._active and self._loud >= self.min_speech:
+                self._active = True
+                self.onsets += 1
+                try:
+                    self.on_start()
+                except Exception as e:
+                    print(f"⚠️ Ear onset callback error: {e}")
+        else:
+            self._quiet += seconds
+            if self._quiet >= self.min_silence:
+                self._loud = 0.0
+                self._active = False
+
+
+class TappedStream:
+    """Wraps an audio input stream so every chunk read is also passed to `tap(data)`."""
+
+    def __init__(self, stream, tap):
+        self._stream = stream
+        self._tap = tap
+
+    def read(self, *args, **kwargs):
+        data = self._stream.read(*args, **kwargs)
+        self._tap(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class PlaybackActivity:
+    """
+    What the speaker is playing, shared between EmpathVoice and EmpathEar.
+    The audio output reports every chunk it writes (`note`); the ear asks
+    whether, and how loudly, the robot was talking at a given moment so it
+    can ignore its own voice. Chunks queued ahead of the speaker (e.g. in the
+    aplay pipe) are laid end to end after the audio still playing. `tail`
+    (EMPATH_ECHO_TAIL) covers output latency and room reverb after a chunk.
+    """
+
+    def __init__(self, tail=None, history=15.0):
+        self.tail = float(tail if tail is not None else os.getenv("EMPATH_ECHO_TAIL", 0.3))
+        self.history = history
+        self._spans = deque() # (start, end, rms), in playback order
+        self._lock = threading.Lock()
+
+    def note(self, pcm, sample_rate, at=None):
+        """Records one chunk of 16-bit PCM (a numpy array) as it is handed to the speaker."""
+        if not len(pcm):
+            return
+        at = time.time() if at is None else at
+        samples = np.asarray(pcm, dtype=np.float32)
+        level = float(np.sqrt(np.mean(samples * samples)))
+        with self._lock:
+            start = max(at, self._spans[-1][1]) if self._spans else at
+            self._spans.append((start, start + len(pcm) / float(sample_rate), level))
+            while self._spans[0][1] < at - self.history:
+                self._spans.popleft()
+
+    def cut(self, at=None):
+        """Playback stopped early: forget audio that was queued but will never be heard."""
+        at = time.time() if at is None else at
+        with self._lock:
+            while self._spans and self._spans[-1][0] >= at:
+                self._spans.pop()
+            if self._spans and self._spans[-1][1] > at:
+                start, _, level = self._spans.pop()
+                self._spans.append((start, at, level))
+
+    def level(self, at=None):
+        """Loudest RMS the speaker played within `tail` seconds before `at` (0.0 when silent)."""
+        at = time.time() if at is None else at
+        loudest = 0.0
+        with self._lock:
+            for start, end, level in reversed(self._spans):
+                if end + self.tail < at:
+                    break
+                if start <= at:
+                    loudest = max(loudest, level)
+        return loudest
+
+    def overlap(self, start, end, tail=None):
+        """Seconds of [start, end] during which the speaker was playing, `tail` (default: self.tail) included."""
+        tail = self.tail if tail is None else tail
+        total, covered = 0.0, start
+        with self._lock:
+            for s, e, _ in self._spans:
+                s, e = max(s, covered), min(e + tail, end)
+                if e > s:
+                    total += e - s
+                    covered = e
+        return total
+
+    @property
+    def active(self):
+        now = time.time()
+        with self._lock:
+            return bool(self._spans) and self._spans[-1][0] <= now <= self._spans[-1][1] + self.tail
+
+
+class EchoSuppressor:
+    """
+    Ear-side half of echo suppression, reading the PlaybackActivity the voice
+    writes to. Every captured chunk goes through `observe()`. While the
+    speaker plays, the expected echo is the reference level times the
+    speaker-to-mic coupling, learned on the fly (it follows the quietest
+    ratios quickly and louder ones slowly, so the user talking over the robot
+    barely moves it). Captured audio only counts as the user once it is
+    `margin` (EMPATH_ECHO_MARGIN) times louder than that expected echo
+    (energy ducking). An utterance that overlaps playback without any such
+    audio is the robot hearing itself (`is_echo`).
+    """
+
+    def __init__(self, activity, margin=None, coupling=None, min_speech=0.15):
+        self.activity = activity
+        self.margin = float(margin or os.getenv("EMPATH_ECHO_MARGIN", 2.0))
+        self.coupling = float(coupling or os.getenv("EMPATH_ECHO_COUPLING", 0.5))
+        self.min_speech = min_speech
+        self._voiced = deque(maxlen=512) # (time, seconds) of chunks louder than the echo
+        self.echo_chunks = 0
+        self.gated = 0
+
+    def threshold(self, base, at=None):
+        """`base` energy threshold, raised above the robot's own echo while it is talking."""
+        return max(base, self.margin * self.coupling * self.activity.level(at))
+
+    def observe(self, pcm, base, sample_rate=16000, at=None):
+        """Classifies one captured chunk; returns True if it is nothing but the robot's echo."""
+        at = time.time() if at is None else at
+        energy = rms(pcm)
+        reference = self.activity.level(at)
+        threshold = max(base, self.margin * self.coupling * reference)
+        seconds = len(pcm) / (2.0 * sample_rate)
+        # Learn only from chunks the speaker played all the way through: in the playback tail, or in the
+        # chunk where a line starts (before its echo arrives), the mic hears the room and drags it towards 0
+        if reference > 0 and self.activity.overlap(at - seconds, at, tail=0.0) >= 0.99 * seconds:
+            ratio = energy / reference
+            self.coupling += (0.3 if ratio < self.coupling else 0.02) * (ratio - self.coupling)
+        if energy >= threshold:
+            self._voiced.append((at, seconds))
+            return False
+        if reference > 0:
+            self.echo_chunks += 1
+            return True
+        return False
+
+    def is_echo(self, start, end):
+        """True if audio captured over [start, end] overlapped playback and held no speech above the echo."""
+        if not self.activity.overlap(start, end):
+            return False
+        voiced = sum(seconds for at, seconds in list(self._voiced) if start <= at <= end)
+        return voiced < self.min_speech
+
+    def stats(self):
+        return {"coupling": round(self.coupling, 3), "echo_chunks": self.echo_chunks, "gated": self.gated}
@@ -1,14 +1,32 @@
 import os
-import io
-import cv2
-import PIL.Image
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeoutError
 from dotenv import load_dotenv
 from google import genai
 from google.genai import types
 from huggingface_hub import InferenceClient, login
+from .sentences import SentenceSplitter, split_sentences
+from .image_prep import FramePreprocessor, frame_hash
+from .response_cache import ResponseCache, context_digest
+from .resilience import CircuitBreaker, BackendUnavailable
+from .tracing import tracer
 
 load_dotenv()
 
+class BrainBusyError(RuntimeError):
+    """Raised when the inference queue is full and a query is rejected."""
+
+class BrainTimeoutError(TimeoutError):
+    """Raised when a query does not finish within the request timeout."""
+
+FALLBACK_REPLY = "I'm listening, and I'm right here with you. Let's take a moment together."
+
+# Tiers whose answers are safe to cache (degraded fallbacks are not)
+UNCACHEABLE_TIERS = (None, "local", "fallback")
+
 class EmpathBrain:
     """
     Core intelligence module for Reachy-Mini. 
@@ -16,24 +34,69 @@ class EmpathBrain:
     and NVIDIA PersonaPlex for empathetic conversation fallback.
     """
     
-    def __init__(self, gemini_model="gemini-robotics-er-1.5-preview"):
+    def __init__(self, gemini_model="gemini-robotics-er-1.5-preview", max_concurrency=None, max_pending=None, request_timeout=None, genai_client=None,
+                 hedge=None, hedge_delay=None, tier_budgets=None):
         self.gemini_key = os.getenv("GEMINI_API_KEY")
         self.hf_token = os.getenv("HF_TOKEN")
         
         self.vla_online = False
+        self.offline = False
         self.personaplex_client = None
+        self._anon_client = None
+        self.hf_timeout = float(os.getenv("EMPATH_HF_TIMEOUT", 8))
+
+        # One breaker per tier: a backend that keeps failing is skipped at zero cost until its backoff expires
+        self.breakers = {
+            "gemini": CircuitBreaker("gemini"),
+            "zephyr": CircuitBreaker("zephyr"),
+            "phi3": CircuitBreaker("phi3"),
+        }
+
+        # Bounded inference pool: at most `max_concurrency` blocking LLM calls run at once,
+        # at most `max_pending` (running + waiting) are admitted, the rest are rejected fast.
+        self.max_concurrency = int(max_concurrency or os.getenv("EMPATH_BRAIN_WORKERS", 2))
+        self.max_pending = int(max_pending or os.getenv("EMPATH_BRAIN_QUEUE", 4))
+        self.request_timeout = float(request_timeout or os.getenv("EMPATH_BRAIN_TIMEOUT", 20))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="empath-brain")
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        # Hedged mode: if Gemini has not answered after `hedge_delay`, race PersonaPlex against it
+        if hedge is None:
+            hedge = os.getenv("EMPATH_BRAIN_HEDGE", "0") == "1"
+        self.hedge = hedge
+        self.hedge_delay = float(hedge_delay or os.getenv("EMPATH_HEDGE_DELAY", 1.2))
+        # Max seconds each tier may take before its answer is abandoned, e.g. "gemini=4,personaplex=6"
+        self.tier_budgets = {"gemini": 4.0, "personaplex": 6.0}
+        self.tier_budgets.update(tier_budgets or self._parse_budgets(os.getenv("EMPATH_TIER_BUDGETS", "")))
+        self._hedge_pool = ThreadPoolExecutor(max_workers=self.max_concurrency * 2, thread_name_prefix="empath-hedge")
+        self._hedge_lock = threading.Lock()
+        self.hedges_launched = 0
+        self.tier_wins = {}
+
+        # Downscaled JPEG/WebP uploads with a small cache for static scenes
+        self.image_prep = FramePreprocessor()
+        # Repeated greetings / small talk are answered from here
+        self.cache = ResponseCache()
+        # Which tier produced the answer, tracked per worker thread
+        self._tier = threading.local()
         
         # Explicit HF Login for gated model access
         if self.hf_token:
             try:
                 login(token=self.hf_token) # Removed unsupported new_session=False
-                self.personaplex_client = InferenceClient(token=self.hf_token)
+                self.personaplex_client = InferenceClient(token=self.hf_token, timeout=self.hf_timeout)
                 print("🧠 [Brain] PersonaPlex Fallback (nvidia/personaplex-7b-v1) is READY.")
             except Exception as e:
                 print(f"⚠️ [Brain] PersonaPlex Login/Init Failed: {e}")
                 
         # Initialize Gemini VLA
-        if self.gemini_key:
+        if genai_client is not None:
+            self.genai_client = genai_client
+            self.vla_model = gemini_model
+            self.vla_online = True
+            print(f"🧠 [Brain] Using injected model client ({type(genai_client).__name__}).")
+        elif self.gemini_key:
             try:
                 self.genai_client = genai.Client(api_key=self.gemini_key)
                 self.vla_model = gemini_model
@@ -43,8 +106,179 @@ class EmpathBrain:
                 print(f"⚠️ [Brain] Gemini VLA Init Failed: {e}")
                 self.offline = True # Set offline if VLA fails to initialize
 
-    def process_query(self, text, emotion="neutral", frame=None, visual_notes=None):
-        """Generates a response using Gemini VLA or PersonaPlex Fallback."""
+    @property
+    def pending(self):
+        return self._pending
+
+    def submit_query(self, text, emotion="neutral", frame=None, visual_notes=None):
+        """
+        Schedules process_query on the bounded worker pool.
+        Returns a concurrent Future, or raises BrainBusyError when the queue is full.
+        """
+        self._acquire()
+        try:
+            future = self._executor.submit(tracer.wrap(self.process_query), text, emotion, frame, visual_notes)
+        except Exception:
+            self._release()
+            raise
+        # Slot is held until the worker actually finishes (or the queued call is cancelled)
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _acquire(self):
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                raise BrainBusyError(f"Brain is busy ({self._pending} queries pending)")
+            self._pending += 1
+
+    def _release(self):
+        with self._pending_lock:
+            self._pending -= 1
+
+    def query(self, text, emotion="neutral", frame=None, visual_notes=None, timeout=None):
+        """
+        Blocking variant of aprocess_query: runs on the worker pool and waits at most
+        `timeout` (default request_timeout). Raises BrainBusyError or BrainTimeoutError.
+        """
+        future = self.submit_query(text, emotion, frame, visual_notes)
+        try:
+            return future.result(timeout or self.request_timeout)
+        except FuturesTimeoutError:
+            future.cancel() # Frees the slot if it never started; a running call finishes on its own
+            raise BrainTimeoutError(f"Brain did not answer within {timeout or self.request_timeout:.0f}s")
+
+    async def aprocess_query(self, text, emotion="neutral", frame=None, visual_notes=None, timeout=None):
+        """
+        Non-blocking variant of process_query for async handlers.
+        The blocking network calls run on the worker pool so the event loop stays free.
+        """
+        future = self.submit_query(text, emotion, frame, visual_notes)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.request_timeout)
+        except asyncio.TimeoutError:
+            raise BrainTimeoutError(f"Brain did not answer within {timeout or self.request_timeout:.0f}s")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+        self.cache.close()
+
+    @staticmethod
+    def _parse_budgets(spec):
+        budgets = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            name, _, seconds = item.partition("=")
+            try:
+                budgets[name.strip()] = float(seconds)
+            except ValueError:
+                print(f"⚠️ [Brain] Ignoring bad tier budget '{item}'")
+        return budgets
+
+    @property
+    def last_tier(self):
+        """Tier that answered the most recent query on the calling thread."""
+        return getattr(self._tier, "name", None)
+
+    def _mark_tier(self, name):
+        self._tier.name = name
+
+    def _cache_key(self, text, emotion, frame, visual_notes):
+        scene = None
+        if frame is not None and not self.cache.bypass_visual and self.cache.is_visual(text):
+            scene = frame_hash(frame)
+        # Every tier sees the visual notes (Gemini through the frame), so a reply made for a
+        # person in a red shirt is not replayed to one in a blue shirt
+        return self.cache.make_key(text, emotion, scene, context_digest(visual_notes))
+
+    def stream_query(self, text, emotion="neutral", frame=None, visual_notes=None):
+        """
+        Generator variant of process_query that yields the reply sentence by sentence.
+        Gemini is called through the streaming API so the first sentence can be
+        spoken while the rest is still being generated. Non-streaming tiers
+        yield their full answer split into sentences. In hedged mode the
+        hedge delay and tier budgets apply to Gemini's first chunk.
+        Holds one slot of the bounded worker pool while it runs.
+        """
+        self._acquire()
+        try:
+            with tracer.span("brain", stream=True) as span:
+                for i, sentence in enumerate(self._stream_answer(text, emotion, frame, visual_notes)):
+                    if i == 0:
+                        tracer.event("brain.first_sentence")
+                    yield sentence
+                span.set(tier=self.last_tier)
+        finally:
+            self._release()
+
+    def _stream_answer(self, text, emotion, frame, visual_notes):
+        key = self._cache_key(text, emotion, frame, visual_notes)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._mark_tier("cache")
+            for sentence in split_sentences(cached):
+                yield sentence
+            return
+
+        self._mark_tier(None)
+        breaker = self.breakers["gemini"]
+        if self.vla_online and not self.offline and breaker.allow():
+            if self.hedge:
+                yield from self._stream_hedged(text, emotion, frame, key)
+                return
+            splitter = SentenceSplitter()
+            spoken = []
+            start = time.monotonic()
+            settled = False
+            try:
+                with tracer.span("brain.gemini", stream=True):
+                    for chunk in self._stream_gemini_vla(text, emotion, frame):
+                        for sentence in splitter.feed(chunk):
+                            spoken.append(sentence)
+                            yield sentence
+                breaker.record_success(time.monotonic() - start) # The stream reached its end
+                settled = True
+                for sentence in splitter.flush():
+                    spoken.append(sentence)
+                    yield sentence
+                self._mark_tier("gemini")
+                self.cache.put(key, " ".join(spoken))
+                return
+            except Exception as e:
+                breaker.record_failure(time.monotonic() - start, e)
+                settled = True
+                print(f"⚠️ [Brain] VLA Stream Error: {e}. Falling back to PersonaPlex...")
+                if spoken:
+                    return # Already talking, do not restart the reply from another model
+            finally:
+                if not settled:
+                    # Consumer stopped early (e.g. barge-in): says nothing about Gemini either way
+                    breaker.abandon()
+
+        response = self._answer(text, emotion, frame, visual_notes, use_vla=False)
+        if self.last_tier not in UNCACHEABLE_TIERS:
+            self.cache.put(key, response)
+        for sentence in split_sentences(response):
+            yield sentence
+
+    def process_query(self, text, emotion="neutral", frame=None, visual_notes=None, use_vla=True, use_cache=True):
+        """Generates a response using Gemini VLA or PersonaPlex Fallback, behind the response cache."""
+        with tracer.span("brain") as span:
+            key = self._cache_key(text, emotion, frame, visual_notes) if use_cache else None
+            cached = self.cache.get(key)
+            if cached is not None:
+                print("🗄️ [Brain] Answered from cache.")
+                self._mark_tier("cache")
+                span.set(tier="cache")
+                return cached
+
+            self._mark_tier(None)
+            response = self._answer(text, emotion, frame, visual_notes, use_vla)
+            span.set(tier=self.last_tier)
+            if self.last_tier not in UNCACHEABLE_TIERS:
+                self.cache.put(key, response)
+            return response
+
+    def _answer(self, text, emotion, frame, visual_notes, use_vla=True):
         if visual_notes is None: visual_notes = {}
         
         # Inject visual context into text for the fallback models
@@ -54,6 +288,8 @@ class EmpathBrain:
             hair = visual_notes.get("hair_color", "unknown")
             if shirt != "unknown": context_str += f"[Visual: User is wearing a {shirt} shirt] "
             if hair != "unknown": context_str += f"[Visual: User has {hair} hair] "
+            people = visual_notes.get("people", 1)
+            if people > 1: context_str += f"[Visual: {people} people are in front of you; you are talking to the one described] "
         
         # Weather Check (Simple heuristic trigger)
         if "weather" in text.lower():
@@ -82,10 +318,17 @@ class EmpathBrain:
                     print(f"⚠️ [Brain] PersonaPlex Error in offline mode: {e}")
             return self._local_intelligence(full_text) # Fallback to local if PersonaPlex also fails or is not ready
 
+        # Hedged race between VLA and PersonaPlex bounds the tail latency
+        if self.hedge and self.vla_online and use_vla:
+            return self._answer_hedged(text, emotion, frame)
+
         # 1. Attempt VLA if online and frame provided
-        if self.vla_online:
+        if self.vla_online and use_vla:
             try:
-                return self._call_gemini_vla(text, emotion, frame) # VLA uses original text and frame
+                # VLA uses original text and frame
+                return self.breakers["gemini"].call(self._call_gemini_vla, text, emotion, frame)
+            except BackendUnavailable:
+                print("🔌 [Brain] VLA circuit open. Skipping to PersonaPlex...")
             except Exception as e:
                 print(f"⚠️ [Brain] VLA Error: {e}. Falling back to PersonaPlex...")
 
@@ -97,16 +340,249 @@ class EmpathBrain:
                 print(f"⚠️ [Brain] PersonaPlex Error: {e}")
 
         # 3. Final Fallback
-        return "I'm listening, and I'm right here with you. Let's take a moment together."
+        self._mark_tier("fallback")
+        return FALLBACK_REPLY
 
-    def _call_gemini_vla(self, text, emotion, frame):
+    def _answer_hedged(self, text, emotion, frame):
+        """
+        Launches Gemini, and PersonaPlex as well if Gemini is still silent after
+        `hedge_delay` (or failed early). The first good answer wins; the loser is
+        cancelled if it has not started, otherwise its result is discarded.
+        Each tier is abandoned once its budget from launch is spent.
+        """
+        def run(tier, fn, *args):
+            # Runs on a hedge worker; report the tier that really answered (PersonaPlex may degrade to local)
+            self._mark_tier(None)
+            try:
+                return fn(*args), self.last_tier or tier
+            except BackendUnavailable:
+                return None, None
+
+        racers = {} # future -> (tier, launched_at)
+        start = time.monotonic()
+        racers[self._hedge_pool.submit(tracer.wrap(run, hold=False), "gemini", self.breakers["gemini"].call, self._call_gemini_vla, text, emotion, frame)] = ("gemini", start)
+        secondary_launched = self.personaplex_client is None # Nothing to hedge with
+        degraded = None
+
+        while racers:
+            now = time.monotonic()
+            deadlines = [launched + self.tier_budgets.get(tier, self.request_timeout) for tier, launched in racers.values()]
+            if not secondary_launched:
+                deadlines.append(start + self.hedge_delay)
+            done, _ = wait(list(racers), timeout=max(0.0, min(deadlines) - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                tier, _ = racers.pop(future)
+                try:
+                    response, answered_by = future.result()
+                except Exception as e:
+                    print(f"⚠️ [Brain] Hedge {tier} Error: {e}")
+                    continue
+                if answered_by in UNCACHEABLE_TIERS:
+                    if response and not degraded:
+                        degraded = (response, answered_by)
+                    continue
+                for loser in racers:
+                    loser.cancel()
+                self._record_win(answered_by)
+                self._mark_tier(answered_by)
+                return response
+
+            now = time.monotonic()
+            for future, (tier, launched) in list(racers.items()):
+                if now >= launched + self.tier_budgets.get(tier, self.request_timeout):
+                    print(f"⏱️ [Brain] {tier} exceeded its {self.tier_budgets.get(tier, self.request_timeout):.1f}s budget.")
+                    future.cancel()
+                    del racers[future]
+
+            # Hedge on delay, or right away when the primary already gave up
+            if not secondary_launched and (now >= start + self.hedge_delay or not racers):
+                secondary_launched = True
+                with self._hedge_lock:
+                    self.hedges_launched += 1
+                print("🏁 [Brain] Hedging with PersonaPlex...")
+                tracer.event("brain.hedge")
+                racers[self._hedge_pool.submit(tracer.wrap(run, hold=False), "personaplex", self._call_personaplex, text, emotion)] = ("personaplex", now)
+
+        if degraded:
+            self._record_win(degraded[1])
+            self._mark_tier(degraded[1])
+            return degraded[0]
+        self._record_win("fallback")
+        self._mark_tier("fallback")
+        return FALLBACK_REPLY
+
+    def _stream_hedged(self, text, emotion, frame, key):
+        """
+        Streaming counterpart of _answer_hedged (the Gemini breaker has already
+        let the call through). Gemini streams on a hedge worker; if its first
+        chunk has not arrived after `hedge_delay` (or it failed early),
+        PersonaPlex is launched too. Whichever answers first is spoken: the
+        rest of Gemini's stream, or PersonaPlex's reply split into sentences.
+        Gemini's budget bounds its time to first chunk; once it is talking,
+        a chunk that takes longer than `request_timeout` ends the reply.
+        """
+        events = queue.Queue() # (tier, payload) from both racers
+        stop_gemini = threading.Event()
+        gemini_too_slow = threading.Event() # Set with stop_gemini when Gemini ran out of time
+        breaker = self.breakers["gemini"]
+
+        def stream_gemini():
+            started = time.monotonic()
+            finished = False
+            try:
+                with tracer.span("brain.gemini", stream=True, hedged=True):
+                    for chunk in self._stream_gemini_vla(text, emotion, frame):
+                        if stop_gemini.is_set():
+                            break # Lost, too slow, or the listener went away; stop reading the stream
+                        events.put(("gemini", chunk))
+                    else:
+                        finished = True
+            except Exception as e:
+                breaker.record_failure(time.monotonic() - started, e)
+                events.put(("gemini.error", e))
+                return
+            if finished:
+                breaker.record_success(time.monotonic() - started)
+                events.put(("gemini", None)) # End of stream
+            elif gemini_too_slow.is_set():
+                breaker.record_failure(time.monotonic() - started, TimeoutError("Gemini stream exceeded its budget"))
+            else:
+                breaker.abandon() # Lost the race or the listener stopped: not Gemini's fault
+
+        def ask_personaplex():
+            self._mark_tier(None)
+            try:
+                response = self._call_personaplex(text, emotion)
+            except Exception as e:
+                events.put(("personaplex.error", e))
+                return
+            events.put(("personaplex", (response, self.last_tier or "personaplex")))
+
+        start = time.monotonic()
+        self._hedge_pool.submit(tracer.wrap(stream_gemini, hold=False))
+        gemini_live = True
+        personaplex_at = None # When PersonaPlex was launched, while its answer is still awaited
+        secondary_launched = self.personaplex_client is None # Nothing to hedge with
+        degraded = None
+        first_chunk = None
+
+        try:
+            while first_chunk is None and (gemini_live or personaplex_at is not None or not secondary_launched):
+                now = time.monotonic()
+                deadlines = []
+                if gemini_live:
+                    deadlines.append(start + self.tier_budgets.get("gemini", self.request_timeout))
+                if personaplex_at is not None:
+                    deadlines.append(personaplex_at + self.tier_budgets.get("personaplex", self.request_timeout))
+                if not secondary_launched:
+                    deadlines.append(start + self.hedge_delay)
+                try:
+                    tier, payload = events.get(timeout=max(0.0, min(deadlines) - now))
+                except queue.Empty:
+                    tier, payload = None, None
+
+                if tier == "gemini" and gemini_live:
+                    if payload is None:
+                        gemini_live = False # Finished without saying anything
+                    else:
+                        first_chunk = payload
+                        break
+                elif tier == "gemini.error" and gemini_live:
+                    print(f"⚠️ [Brain] VLA Stream Error: {payload}. Falling back to PersonaPlex...")
+                    gemini_live = False
+                elif tier == "personaplex" and personaplex_at is not None:
+                    personaplex_at = None
+                    response, answered_by = payload
+                    if answered_by not in UNCACHEABLE_TIERS:
+                        stop_gemini.set()
+                        self._record_win(answered_by)
+                        self._mark_tier(answered_by)
+                        self.cache.put(key, response)
+                        yield from split_sentences(response)
+                        return
+                    if response and not degraded:
+                        degraded = (response, answered_by)
+                elif tier == "personaplex.error" and personaplex_at is not None:
+                    print(f"⚠️ [Brain] Hedge personaplex Error: {payload}")
+                    personaplex_at = None
+
+                now = time.monotonic()
+                budget = self.tier_budgets.get("gemini", self.request_timeout)
+                if gemini_live and now >= start + budget:
+                    print(f"⏱️ [Brain] gemini exceeded its {budget:.1f}s budget to first chunk.")
+                    gemini_live = False
+                    gemini_too_slow.set()
+                    stop_gemini.set()
+                budget = self.tier_budgets.get("personaplex", self.request_timeout)
+                if personaplex_at is not None and now >= personaplex_at + budget:
+                    print(f"⏱️ [Brain] personaplex exceeded its {budget:.1f}s budget.")
+                    personaplex_at = None
+
+                # Hedge on delay, or right away when Gemini already gave up
+                if not secondary_launched and (now >= start + self.hedge_delay or not gemini_live):
+                    secondary_launched = True
+                    personaplex_at = now
+                    with self._hedge_lock:
+                        self.hedges_launched += 1
+                    print("🏁 [Brain] Hedging with PersonaPlex...")
+                    tracer.event("brain.hedge")
+                    self._hedge_pool.submit(tracer.wrap(ask_personaplex, hold=False))
+
+            if first_chunk is None:
+                tier, response = (degraded[1], degraded[0]) if degraded else ("fallback", FALLBACK_REPLY)
+                self._record_win(tier)
+                self._mark_tier(tier)
+                yield from split_sentences(response)
+                return
+
+            # Gemini spoke first: PersonaPlex's answer, if any, is discarded
+            self._record_win("gemini")
+            self._mark_tier("gemini")
+            splitter = SentenceSplitter()
+            spoken = []
+            chunk = first_chunk
+            while chunk is not None:
+                for sentence in splitter.feed(chunk):
+                    spoken.append(sentence)
+                    yield sentence
+                try:
+                    tier, chunk = events.get(timeout=self.request_timeout)
+                    while tier not in ("gemini", "gemini.error"):
+                        tier, chunk = events.get(timeout=self.request_timeout)
+                except queue.Empty:
+                    print(f"⏱️ [Brain] Gemini stream stalled for {self.request_timeout:.0f}s; ending the reply.")
+                    gemini_too_slow.set()
+                    return
+                if tier == "gemini.error":
+                    print(f"⚠️ [Brain] VLA Stream Error: {chunk}. Ending the reply here.")
+                    return # Already talking, do not restart the reply from another model
+            for sentence in splitter.flush():
+                spoken.append(sentence)
+                yield sentence
+            self.cache.put(key, " ".join(spoken))
+        finally:
+            stop_gemini.set() # Finished, lost, or the listener stopped early (barge-in)
+
+    def _record_win(self, tier):
+        with self._hedge_lock:
+            self.tier_wins[tier] = self.tier_wins.get(tier, 0) + 1
+
+    def hedge_stats(self):
+        return {
+            "enabled": self.hedge,
+            "delay_s": self.hedge_delay,
+            "budgets_s": self.tier_budgets,
+            "hedges_launched": self.hedges_launched,
+            "wins": dict(self.tier_wins),
+        }
+
+    def _gemini_request(self, text, emotion, frame):
         contents = []
         if frame is not None:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_img = PIL.Image.fromarray(rgb_frame)
-            img_byte_arr = io.BytesIO()
-            pil_img.save(img_byte_arr, format='PNG')
-            contents.append(types.Part.from_bytes(data=img_byte_arr.getvalue(), mime_type='image/png'))
+            image_bytes, mime_type = self.image_prep.prepare(frame)
+            if image_bytes:
+                contents.append(types.Part.from_bytes(data=image_bytes, mime_type=mime_type))
         
         system_prompt = (
             "You are Reachy, a warm and kind AI companion. "
@@ -117,17 +593,34 @@ class EmpathBrain:
         )
         contents.append(system_prompt)
         
+        config = types.GenerateContentConfig(
+            temperature=0.85,
+            top_p=0.95,
+            max_output_tokens=150
+        )
+        return contents, config
+
+    def _call_gemini_vla(self, text, emotion, frame):
+        contents, config = self._gemini_request(text, emotion, frame)
         response = self.genai_client.models.generate_content(
             model=self.vla_model,
             contents=contents,
-            config=types.GenerateContentConfig(
-                temperature=0.85,
-                top_p=0.95,
-                max_output_tokens=150
-            )
+            config=config
         )
+        self._mark_tier("gemini")
         return response.text
 
+    def _stream_gemini_vla(self, text, emotion, frame):
+        """Yields raw text chunks as Gemini produces them."""
+        contents, config = self._gemini_request(text, emotion, frame)
+        for chunk in self.genai_client.models.generate_content_stream(
+            model=self.vla_model,
+            contents=contents,
+            config=config
+        ):
+            if chunk.text:
+                yield chunk.text
+
     def _call_personaplex(self, text, emotion):
         """
         Robust Multi-Layer Fallback Strategy:
@@ -136,34 +629,50 @@ class EmpathBrain:
         3. Local Rule-Based Fallback (Math/Greetings)
         """
         # Layer 1: Authenticated
-        if self.hf_token:
+        if self.hf_token and self.personaplex_client:
             try:
-                return self._hf_chat_request(self.personaplex_client, "HuggingFaceH4/zephyr-7b-beta", text, emotion)
+                return self.breakers["zephyr"].call(self._hf_chat_request, self.personaplex_client, "HuggingFaceH4/zephyr-7b-beta", text, emotion)
+            except BackendUnavailable:
+                pass # Known dead, costs nothing
             except Exception as e:
                 print(f"⚠️ [Brain] Auth Layer Failed: {e}")
 
         # Layer 2: Anonymous (in case token has bad perms)
         try:
-            print("🧠 [Brain] Attempting Anonymous Inference...")
-            anon_client = InferenceClient() # No token
-            return self._hf_chat_request(anon_client, "microsoft/Phi-3-mini-4k-instruct", text, emotion)
+            return self.breakers["phi3"].call(self._hf_chat_request, self._anonymous_client(), "microsoft/Phi-3-mini-4k-instruct", text, emotion)
+        except BackendUnavailable:
+            pass
         except Exception as e:
              print(f"⚠️ [Brain] Anon Layer Failed: {e}")
 
         # Layer 3: Local Rule-Based (The "Lobotomy" Mode that still works)
         return self._local_intelligence(text)
 
+    def _anonymous_client(self):
+        """Long-lived tokenless client, created on first use and reused afterwards."""
+        if self._anon_client is None:
+            print("🧠 [Brain] Creating Anonymous Inference client...")
+            self._anon_client = InferenceClient(timeout=self.hf_timeout) # No token
+        return self._anon_client
+
+    def health(self):
+        """Breaker state and latency per tier, for /status."""
+        return {name: breaker.stats() for name, breaker in self.breakers.items()}
+
     def _hf_chat_request(self, client, model, text, emotion):
         messages = [
             {"role": "system", "content": f"You are Reachy (PersonaPlex). User emotion: {emotion}. Keep it short."},
             {"role": "user", "content": text}
         ]
         response = client.chat_completion(messages=messages, model=model, max_tokens=100)
+        self._mark_tier(f"hf:{model}")
         return response.choices[0].message.content.strip()
 
     def _local_intelligence(self, text):
         """Zero-latency local processing for basic tasks."""
         print("🧠 [Brain] Using Local Intelligence.")
+        self._mark_tier("local")
+        tracer.event("brain.local")
         text_lower = text.lower()
         
         # Math capabilities
@@ -0,0 +1,207 @@
+import os
+import threading
+import time
+import cv2
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# Output order of FER+ (emotion-ferplus-8.onnx, ONNX model zoo), named the way EmotionStateTracker expects
+FERPLUS_LABELS = ("neutral", "happy", "surprised", "sad", "angry", "disgust", "fear", "contempt")
+
+
+def softmax(logits, temperature=1.0):
+    z = np.asarray(logits, dtype=np.float64) / temperature
+    z = z - z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def fit_temperature(logits, labels, grid=None):
+    """Temperature that minimises the negative log-likelihood of held-out `labels` (class indices)."""
+    logits = np.asarray(logits, dtype=np.float64)
+    rows = np.arange(len(labels))
+    grid = np.linspace(0.5, 5.0, 46) if grid is None else grid
+    def nll(t):
+        return -np.log(np.maximum(softmax(logits, t)[rows, labels], 1e-12)).mean()
+    return float(min(grid, key=nll))
+
+
+def clip_box(box, width, height):
+    """`box` (x, y, w, h) clamped to a width x height image, or None when nothing of it is inside."""
+    x, y, w, h = (int(v) for v in box)
+    x0, y0 = max(0, x), max(0, y)
+    x1, y1 = min(width, x + w), min(height, y + h)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1 - x0, y1 - y0
+
+
+class EmotionClassifier:
+    """
+    Facial-expression CNN (FER+ layout: 64x64 grey crop in, 8 logits out) on CPU.
+    All faces of a frame go through the network as one batch. Confidences
+    are temperature-scaled softmax probabilities (EMPATH_FER_TEMPERATURE;
+    fit it with fit_temperature on labeled crops). Runs on onnxruntime when
+    installed, otherwise OpenCV DNN. Models exported with a fixed batch of 1
+    fall back to one call per face.
+    """
+
+    def __init__(self, model=None, labels=FERPLUS_LABELS, temperature=None, backend=None, input_size=64, threads=None):
+        model = model or os.getenv("EMPATH_FER_MODEL", "emotion-ferplus-8.onnx")
+        if not os.path.exists(model):
+            raise RuntimeError(f"Emotion model not found at '{model}' (set EMPATH_FER_MODEL)")
+        self.labels = labels
+        self.temperature = float(temperature or os.getenv("EMPATH_FER_TEMPERATURE", 1.0))
+        self.input_size = input_size
+        self.backend = (backend or os.getenv("EMPATH_FER_BACKEND", "onnxruntime" if ONNXRUNTIME_AVAILABLE else "opencv")).lower()
+        threads = int(threads or os.getenv("EMPATH_FER_THREADS", 2)) # Leave cores for capture and tracking
+        if self.backend == "onnxruntime":
+            if not ONNXRUNTIME_AVAILABLE:
+                raise RuntimeError("onnxruntime is not installed (pip install onnxruntime)")
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = threads
+            self.session = ort.InferenceSession(model, options, providers=["CPUExecutionProvider"])
+            self.input_name = self.session.get_inputs()[0].name
+            # A symbolic (or missing) batch dimension means the model takes any batch size
+            self.batched = not isinstance(self.session.get_inputs()[0].shape[0], int)
+        elif self.backend == "opencv":
+            self.net = cv2.dnn.readNetFromONNX(model)
+            self.batched = True # Checked on the first multi-face frame
+        else:
+            raise ValueError(f"Unknown emotion backend '{self.backend}' (use onnxruntime or opencv)")
+
+    def preprocess(self, image, boxes):
+        """
+        Grey face crops of a BGR image as an (N, 1, S, S) float32 batch.
+        Boxes are clipped to the image; one with nothing inside raises ValueError.
+        """
+        side = self.input_size
+        height, width = image.shape[:2]
+        batch = np.empty((len(boxes), 1, side, side), dtype=np.float32)
+        for i, box in enumerate(boxes):
+            clipped = clip_box(box, width, height)
+            if clipped is None:
+                raise ValueError(f"Face box {tuple(box)} lies outside the {width}x{height} image")
+            x, y, w, h = clipped
+            crop = cv2.resize(image[y:y + h, x:x + w], (side, side), interpolation=cv2.INTER_AREA)
+            batch[i, 0] = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.ndim == 3 else crop
+        return batch
+
+    def classify(self, batch):
+        """Returns (label, confidence, probabilities) for each crop of a preprocessed batch."""
+        if len(batch) == 0:
+            return []
+        probs = softmax(self._forward(batch).reshape(len(batch), -1), self.temperature)
+        best = probs.argmax(axis=1)
+        return [(self.labels[b], float(p[b]), p) for b, p in zip(best, probs)]
+
+    def _forward(self, batch):
+        if self.batched or len(batch) == 1:
+            try:
+                return self._run(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    raise
+                self.batched = False
+                print(f"⚠️ [Eye] Emotion model rejected a batch of {len(batch)} ({e}). Classifying one face at a time.")
+        return np.concatenate([self._run(batch[i:i + 1]) for i in range(len(batch))])
+
+    def _run(self, batch):
+        if self.backend == "onnxruntime":
+            return self.session.run(None, {self.input_name: batch})[0]
+        self.net.setInput(batch)
+        return self.net.forward()
+
+
+class AsyncEmotionClassifier:
+    """
+    Runs an EmotionClassifier on its own thread so inference never stalls
+    the vision loop. `submit` only crops the faces (cheap) and replaces any
+    batch the worker has not started yet, at most once per `interval`
+    seconds (EMPATH_FER_INTERVAL); `results` returns the latest
+    {track id: (label, confidence)} without waiting.
+    """
+
+    def __init__(self, classifier, interval=None):
+        self.classifier = classifier
+        self.interval = float(interval if interval is not None else os.getenv("EMPATH_FER_INTERVAL", 0.2))
+        self._results = {}
+        self._pending = None
+        self._last_submit = 0.0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.faces = 0
+        self.dropped = 0
+        self.busy_seconds = 0.0
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, image, tracks):
+        """Queues the faces of `tracks` (objects with .id and .box in `image`). Returns False when throttled."""
+        now = time.monotonic()
+        if now - self._last_submit < self.interval:
+            return False
+        self._last_submit = now
+        # Tracked boxes can run off the frame edge; classify only what is inside it
+        height, width = image.shape[:2]
+        faces = []
+        for track in tracks:
+            box = clip_box(track.box, width, height)
+            if box is not None and box[2] >= 8 and box[3] >= 8:
+                faces.append((track.id, box))
+        try:
+            batch = self.classifier.preprocess(image, [box for _, box in faces]) # Copies: the image buffer is reused
+        except Exception as e:
+            print(f"⚠️ [Eye] Could not crop faces for the emotion classifier: {e}")
+            return False
+        with self._cond:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = ([track_id for track_id, _ in faces], batch)
+            self._cond.notify()
+        return True
+
+    def results(self):
+        return self._results
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                ids, batch = self._pending
+                self._pending = None
+            start = time.perf_counter()
+            try:
+                predictions = self.classifier.classify(batch)
+            except Exception as e:
+                print(f"⚠️ [Eye] Emotion classifier error: {e}")
+                continue
+            self.busy_seconds += time.perf_counter() - start
+            self.batches += 1
+            self.faces += len(ids)
+            # Swapped in one assignment, so readers never see a half-written dict
+            self._results = {track_id: (label, confidence) for track_id, (label, confidence, _) in zip(ids, predictions)}
+
+    def close(self, timeout=2.0):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout) # Let an in-flight batch finish before the model is torn down
+
+    def stats(self):
+        return {
+            "backend": self.classifier.backend,
+            "batched": self.classifier.batched,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "faces_per_second": round(self.faces / self.busy_seconds, 1) if self.busy_seconds else None,
+        }
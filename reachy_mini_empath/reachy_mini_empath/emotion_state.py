@@ -0,0 +1,115 @@
+import os
+import time
+from collections import Counter, deque
+
+# Detected emotion -> mirroring gesture ("surprised" is what EmpathEye emits)
+MIRROR_GESTURES = {
+    "happy": "happy",
+    "sad": "sad",
+    "angry": "angry",
+    "surprise": "surprised",
+    "surprised": "surprised",
+    "fear": "bashful",
+    "disgust": "confused",
+}
+
+
+class EmotionStateTracker:
+    """
+    Turns noisy per-frame emotion labels into a stable emotional state.
+    Labels are smoothed either by majority vote over the last `window` frames
+    or by a per-label exponential moving average (`mode="ema"`). The state
+    only switches when a new label's share reaches `enter` and the current
+    one has decayed below `exit` (hysteresis), and a mirroring gesture is
+    issued only on such a transition, at most once per `cooldown` seconds
+    per emotion.
+    """
+
+    def __init__(self, mode=None, window=None, alpha=0.25, enter=0.6, exit=0.35, cooldown=None, gestures=None, clock=time.monotonic):
+        self.mode = mode or os.getenv("EMPATH_MIRROR_MODE", "vote")
+        if self.mode not in ("vote", "ema"):
+            raise ValueError(f"Unknown smoothing mode '{self.mode}' (use vote or ema)")
+        self.window = int(window or os.getenv("EMPATH_MIRROR_WINDOW", 10))
+        self.alpha = alpha
+        self.enter = enter
+        self.exit = exit
+        self.cooldown = float(cooldown if cooldown is not None else os.getenv("EMPATH_MIRROR_COOLDOWN", 8.0))
+        self.gestures = MIRROR_GESTURES if gestures is None else gestures
+        self.clock = clock
+
+        self.state = "neutral"
+        self._history = deque(maxlen=self.window)
+        self._votes = Counter()
+        self._ema = {}
+        self._last_fired = {}
+        self.frames = 0
+        self.transitions = 0
+        self.gestures_issued = 0
+        self.suppressed = 0 # Transitions that fell inside their cooldown
+
+    def update(self, label, face_detected=True):
+        """
+        Feeds one analyzed frame. Frames without a face count as "neutral".
+        Returns the gesture to play for a fresh transition, else None.
+        """
+        self.frames += 1
+        label = label if face_detected and label else "neutral"
+        scores = self._observe(label)
+
+        if scores.get(self.state, 0.0) >= self.exit:
+            return None
+        best = max(scores, key=scores.get)
+        if best == self.state or scores[best] < self.enter:
+            return None
+
+        self.state = best
+        self.transitions += 1
+        gesture = self.gestures.get(best)
+        if gesture is None:
+            return None
+        now = self.clock()
+        last = self._last_fired.get(best)
+        if last is not None and now - last < self.cooldown:
+            self.suppressed += 1
+            return None
+        self._last_fired[best] = now
+        self.gestures_issued += 1
+        return gesture
+
+    def scores(self):
+        if self.mode == "ema":
+            return dict(self._ema)
+        # Shares of the full window, so a handful of early frames can't flip the state
+        return {label: count / self.window for label, count in self._votes.items()}
+
+    def reset(self):
+        self.state = "neutral"
+        self._history.clear()
+        self._votes.clear()
+        self._ema.clear()
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "mode": self.mode,
+            "frames": self.frames,
+            "transitions": self.transitions,
+            "gestures": self.gestures_issued,
+            "suppressed": self.suppressed,
+        }
+
+    def _observe(self, label):
+        if self.mode == "ema":
+            for key in self._ema:
+                self._ema[key] *= 1.0 - self.alpha
+            self._ema[label] = self._ema.get(label, 0.0) + self.alpha
+            return self._ema
+
+        if len(self._history) == self._history.maxlen:
+            oldest = self._history[0]
+            self._votes[oldest] -= 1
+            if not self._votes[oldest]:
+                del self._votes[oldest]
+        self._history.append(label)
+        self._votes[label] += 1
+        return self.scores()
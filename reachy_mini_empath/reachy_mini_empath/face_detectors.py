@@ -0,0 +1,186 @@
+import os
+import cv2
+import numpy as np
+
+try:
+    import mediapipe as mp
+    MEDIAPIPE_AVAILABLE = True
+except ImportError:
+    MEDIAPIPE_AVAILABLE = False
+
+
+class Detection:
+    """One detected face in pixel coordinates, the same for every backend."""
+
+    __slots__ = ("x", "y", "w", "h", "score")
+
+    def __init__(self, x, y, w, h, score=1.0):
+        self.x = int(x)
+        self.y = int(y)
+        self.w = int(w)
+        self.h = int(h)
+        self.score = float(score)
+
+    @property
+    def box(self):
+        return self.x, self.y, self.w, self.h
+
+    def __repr__(self):
+        return f"Detection({self.x}, {self.y}, {self.w}, {self.h}, score={self.score:.2f})"
+
+
+def _clip(detections, width, height):
+    """Clamps boxes to the frame and drops empty ones."""
+    clipped = []
+    for d in detections:
+        x, y = max(0, d.x), max(0, d.y)
+        w, h = min(width, d.x + d.w) - x, min(height, d.y + d.h) - y
+        if w > 0 and h > 0:
+            clipped.append(Detection(x, y, w, h, d.score))
+    return clipped
+
+
+class FaceDetector:
+    """
+    Face detector backend interface used by EmpathEye.
+    `detect(frame)` takes a BGR frame and returns a list of Detection,
+    clipped to the frame.
+    """
+
+    name = "base"
+
+    def detect(self, frame):
+        raise NotImplementedError
+
+
+class HaarDetector(FaceDetector):
+    """OpenCV's stock Haar cascade. Zero extra dependencies, slowest, no scores."""
+
+    name = "haar"
+
+    def __init__(self, scale_factor=1.1, min_neighbors=4):
+        self.cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        if self.cascade.empty():
+            raise RuntimeError("Haar cascade could not be loaded")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def detect(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors)
+        return [Detection(x, y, w, h) for (x, y, w, h) in faces]
+
+
+class MediaPipeDetector(FaceDetector):
+    """
+    MediaPipe BlazeFace (CPU), short-range model: tuned for faces within ~2 m
+    of the camera, which is where people stand in front of Reachy.
+    Uses the legacy `mp.solutions` API when present; newer mediapipe releases
+    only ship the Tasks API, which needs blaze_face_short_range.tflite
+    (EMPATH_MEDIAPIPE_MODEL).
+    """
+
+    name = "mediapipe"
+
+    def __init__(self, min_confidence=0.5, model=None):
+        if not MEDIAPIPE_AVAILABLE:
+            raise RuntimeError("mediapipe is not installed (pip install mediapipe)")
+        self.legacy = hasattr(mp, "solutions")
+        if self.legacy:
+            self.model = mp.solutions.face_detection.FaceDetection(model_selection=0, min_detection_confidence=min_confidence)
+            return
+        from mediapipe.tasks.python import BaseOptions, vision
+        model = model or os.getenv("EMPATH_MEDIAPIPE_MODEL", "blaze_face_short_range.tflite")
+        if not os.path.exists(model):
+            raise RuntimeError(f"MediaPipe model not found at '{model}' (set EMPATH_MEDIAPIPE_MODEL)")
+        options = vision.FaceDetectorOptions(base_options=BaseOptions(model_asset_path=model), min_detection_confidence=min_confidence)
+        self.model = vision.FaceDetector.create_from_options(options)
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        detections = []
+        if self.legacy:
+            for found in self.model.process(rgb).detections or []:
+                box = found.location_data.relative_bounding_box
+                detections.append(Detection(box.xmin * width, box.ymin * height, box.width * width, box.height * height, found.score[0]))
+        else:
+            result = self.model.detect(mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb))
+            for found in result.detections:
+                box = found.bounding_box # Already in pixels
+                detections.append(Detection(box.origin_x, box.origin_y, box.width, box.height, found.categories[0].score))
+        return _clip(detections, width, height)
+
+
+class YuNetDetector(FaceDetector):
+    """
+    OpenCV DNN YuNet (cv2.FaceDetectorYN, CPU). Needs the ONNX model from
+    opencv_zoo (face_detection_yunet_2023mar.onnx); point EMPATH_YUNET_MODEL at it.
+    """
+
+    name = "yunet"
+
+    def __init__(self, model=None, score_threshold=0.6, nms_threshold=0.3, top_k=50):
+        model = model or os.getenv("EMPATH_YUNET_MODEL", "face_detection_yunet_2023mar.onnx")
+        if not os.path.exists(model):
+            raise RuntimeError(f"YuNet model not found at '{model}' (set EMPATH_YUNET_MODEL)")
+        self.model = cv2.FaceDetectorYN.create(model, "", (320, 320), score_threshold, nms_threshold, top_k)
+        self._size = None
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        if self._size != (width, height):
+            self.model.setInputSize((width, height))
+            self._size = (width, height)
+        _, faces = self.model.detect(frame)
+        if faces is None:
+            return []
+        return _clip([Detection(f[0], f[1], f[2], f[3], f[14]) for f in faces], width, height)
+
+
+class SSDDetector(FaceDetector):
+    """
+    OpenCV DNN ResNet-10 SSD face detector (Caffe, CPU). Needs deploy.prototxt
+    and res10_300x300_ssd_iter_140000.caffemodel (EMPATH_SSD_PROTO / EMPATH_SSD_MODEL).
+    """
+
+    name = "ssd"
+
+    def __init__(self, proto=None, model=None, score_threshold=0.5, input_size=300):
+        proto = proto or os.getenv("EMPATH_SSD_PROTO", "deploy.prototxt")
+        model = model or os.getenv("EMPATH_SSD_MODEL", "res10_300x300_ssd_iter_140000.caffemodel")
+        for path in (proto, model):
+            if not os.path.exists(path):
+                raise RuntimeError(f"SSD file not found at '{path}' (set EMPATH_SSD_PROTO / EMPATH_SSD_MODEL)")
+        self.net = cv2.dnn.readNetFromCaffe(proto, model)
+        self.score_threshold = score_threshold
+        self.input_size = input_size
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, 1.0, (self.input_size, self.input_size), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        out = self.net.forward()[0, 0] # (N, 7): _, _, score, x1, y1, x2, y2 (relative)
+        out = out[out[:, 2] >= self.score_threshold]
+        scale = np.array([width, height, width, height])
+        detections = []
+        for row in out:
+            x1, y1, x2, y2 = row[3:7] * scale
+            detections.append(Detection(x1, y1, x2 - x1, y2 - y1, row[2]))
+        return _clip(detections, width, height)
+
+
+DETECTORS = {
+    "haar": HaarDetector,
+    "mediapipe": MediaPipeDetector,
+    "yunet": YuNetDetector,
+    "ssd": SSDDetector,
+}
+
+
+def create_detector(name=None, **kwargs):
+    """Builds the detector named by `name` or EMPATH_FACE_DETECTOR (default: haar)."""
+    name = (name or os.getenv("EMPATH_FACE_DETECTOR", "haar")).lower()
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown face detector '{name}' (use one of {', '.join(DETECTORS)})")
+    return DETECTORS[name](**kwargs)
@@ -0,0 +1,232 @@
+import os
+import cv2
+import numpy as np
+
+
+def box_iou(a, b):
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def _opencv_tracker(kind):
+    """KCF/CSRT live in opencv-contrib (cv2.legacy on 4.5+); MIL ships with plain OpenCV."""
+    for owner in (cv2, getattr(cv2, "legacy", None)):
+        factory = getattr(owner, f"Tracker{kind}_create", None) if owner is not None else None
+        if factory is not None:
+            return factory
+    raise RuntimeError(f"cv2.Tracker{kind} is not available (pip install opencv-contrib-python)")
+
+
+class Track:
+    """A face followed across frames. `id` stays the same for as long as the face does."""
+
+    __slots__ = ("id", "x", "y", "w", "h", "score", "age", "misses", "tracker")
+
+    MIN_SIDE = 4 # Pixels; a box clipped thinner than this has left the frame
+
+    def __init__(self, track_id, box, score=1.0):
+        self.id = track_id
+        self.x, self.y, self.w, self.h = (int(v) for v in box)
+        self.score = score
+        self.age = 0 # Frames since the track was created
+        self.misses = 0 # Consecutive full detections that did not find it
+        self.tracker = None
+
+    @property
+    def box(self):
+        return self.x, self.y, self.w, self.h
+
+    def move_to(self, box, size=None):
+        """
+        Moves the track to `box`, clipped to a `size` (width, height) frame when given.
+        Returns False, leaving the track where it was, when less than
+        MIN_SIDE pixels of it would be left in the frame.
+        """
+        x, y, w, h = (int(v) for v in box)
+        if size is not None:
+            x0, y0 = max(0, x), max(0, y)
+            w, h = min(size[0], x + w) - x0, min(size[1], y + h) - y0
+            x, y = x0, y0
+        if w < self.MIN_SIDE or h < self.MIN_SIDE:
+            return False
+        self.x, self.y, self.w, self.h = x, y, w, h
+        return True
+
+    def __repr__(self):
+        return f"Track(#{self.id}, {self.box})"
+
+
+class FaceTracker:
+    """
+    Detect-then-track wrapper around a FaceDetector.
+    The full-frame detector runs every `detect_every` frames, or right away
+    when a track is lost; in between each face is followed cheaply with
+    `mode`:
+      - "flow": Lucas-Kanade optical flow of corner features inside the box (default)
+      - "roi":  the detector on a small, downscaled window around the last box
+      - "kcf" / "csrt" / "mil": OpenCV single-object trackers
+      - "off":  full detection on every frame (IDs are still kept)
+    Full detections are matched to tracks by IoU, so IDs persist.
+    Configure with EMPATH_FACE_TRACKING and EMPATH_DETECT_EVERY.
+    """
+
+    MODES = ("roi", "flow", "kcf", "csrt", "mil", "off")
+
+    def __init__(self, detector, mode=None, detect_every=None, max_misses=2, iou_threshold=0.3, roi_margin=0.5, roi_face_px=80):
+        self.detector = detector
+        self.mode = (mode or os.getenv("EMPATH_FACE_TRACKING", "flow")).lower()
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown tracking mode '{self.mode}' (use one of {', '.join(self.MODES)})")
+        self._tracker_factory = _opencv_tracker(self.mode.upper()) if self.mode in ("kcf", "csrt", "mil") else None
+        self.detect_every = max(1, int(detect_every or os.getenv("EMPATH_DETECT_EVERY", 10)))
+        self.max_misses = max_misses
+        self.iou_threshold = iou_threshold
+        self.roi_margin = roi_margin
+        self.roi_face_px = roi_face_px
+        self.tracks = []
+        self._next_id = 1
+        self._since_full = 0
+        self._prev_gray = None
+        self.full_detections = 0
+        self.tracked_frames = 0
+        self.losses = 0
+
+    def update(self, frame):
+        """Returns the faces visible in `frame` as Tracks, their boxes inside the frame."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if self.mode == "flow" else None
+        visible = [t for t in self.tracks if t.misses == 0]
+        self._since_full += 1
+
+        if self.mode == "off" or not visible or self._since_full >= self.detect_every:
+            self._full_detect(frame)
+        elif all(self._follow(track, frame, gray) for track in visible):
+            self.tracked_frames += 1
+        else:
+            self.losses += 1
+            self._full_detect(frame) # Lost someone: re-detect on this very frame
+
+        self._prev_gray = gray
+        for track in self.tracks:
+            track.age += 1
+        return [t for t in self.tracks if t.misses == 0]
+
+    def reset(self):
+        self.tracks = []
+        self._since_full = 0
+        self._prev_gray = None
+
+    def stats(self):
+        frames = self.full_detections + self.tracked_frames
+        return {
+            "mode": self.mode,
+            "tracks": sum(1 for t in self.tracks if t.misses == 0),
+            "next_id": self._next_id,
+            "full_detections": self.full_detections,
+            "tracked_frames": self.tracked_frames,
+            "losses": self.losses,
+            "detect_ratio": round(self.full_detections / frames, 3) if frames else None,
+        }
+
+    # --- Full detection + association ---
+
+    def _full_detect(self, frame):
+        self.full_detections += 1
+        self._since_full = 0
+        detections = self.detector.detect(frame)
+
+        # Greedy IoU matching, best overlaps first
+        pairs = sorted(
+            ((box_iou(track.box, d.box), ti, di) for ti, track in enumerate(self.tracks) for di, d in enumerate(detections)),
+            reverse=True,
+        )
+        matched_tracks, matched_detections = set(), set()
+        for overlap, ti, di in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if ti in matched_tracks or di in matched_detections:
+                continue
+            matched_tracks.add(ti)
+            matched_detections.add(di)
+            track = self.tracks[ti]
+            track.move_to(detections[di].box, (frame.shape[1], frame.shape[0]))
+            track.score = detections[di].score
+            track.misses = 0
+            self._start_tracker(track, frame)
+
+        survivors = []
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track.misses += 1
+                if track.misses > self.max_misses:
+                    continue # Gone for good
+            survivors.append(track)
+        for di, detection in enumerate(detections):
+            if di not in matched_detections:
+                track = Track(self._next_id, detection.box, detection.score)
+                self._next_id += 1
+                self._start_tracker(track, frame)
+                survivors.append(track)
+        self.tracks = survivors
+
+    def _start_tracker(self, track, frame):
+        if self._tracker_factory is not None:
+            track.tracker = self._tracker_factory()
+            track.tracker.init(frame, track.box)
+
+    # --- Cheap per-frame following ---
+
+    def _follow(self, track, frame, gray):
+        size = (frame.shape[1], frame.shape[0])
+        if self.mode == "roi":
+            box = self._follow_roi(track, frame)
+        elif self.mode == "flow":
+            box = self._follow_flow(track, gray)
+        else:
+            ok, box = track.tracker.update(frame)
+            box = box if ok else None
+        if box is None:
+            return False
+        if not track.move_to(box, size):
+            # Followed off the edge of the frame: the face has left
+            self.tracks.remove(track)
+            return False
+        return True
+
+    def _follow_roi(self, track, frame):
+        height, width = frame.shape[:2]
+        mx, my = int(track.w * self.roi_margin), int(track.h * self.roi_margin)
+        x0, y0 = max(0, track.x - mx), max(0, track.y - my)
+        x1, y1 = min(width, track.x + track.w + mx), min(height, track.y + track.h + my)
+        window = frame[y0:y1, x0:x1]
+        # The face size is known, so shrink the window until the face is ~roi_face_px wide
+        scale = min(1.0, self.roi_face_px / max(1, track.w))
+        if scale < 1.0:
+            window = cv2.resize(window, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        found = self.detector.detect(window)
+        if not found:
+            return None
+        local = ((track.x - x0) * scale, (track.y - y0) * scale, track.w * scale, track.h * scale)
+        best = max(found, key=lambda d: box_iou(local, d.box))
+        if box_iou(local, best.box) <= 0:
+            return None
+        track.score = best.score
+        return best.x / scale + x0, best.y / scale + y0, best.w / scale, best.h / scale
+
+    def _follow_flow(self, track, gray):
+        if self._prev_gray is None:
+            return None
+        x, y, w, h = track.box
+        window = self._prev_gray[y:y + h, x:x + w]
+        corners = cv2.goodFeaturesToTrack(window, maxCorners=40, qualityLevel=0.01, minDistance=4) if window.size else None
+        if corners is None or len(corners) < 5:
+            return None
+        corners = corners + np.array([x, y], dtype=np.float32)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, corners, None, winSize=(15, 15), maxLevel=2)
+        good = status.ravel() == 1
+        if good.sum() < 5:
+            return None
+        dx, dy = np.median((moved - corners)[good].reshape(-1, 2), axis=0)
+        return x + dx, y + dy, w, h
@@ -4,56 +4,371 @@ try:
 except ImportError:
     print("⚠️ SpeechRecognition or PyAudio not found. Voice input disabled.")
     AUDIO_AVAILABLE = False
+import os
 import threading
 import time
+from collections import deque
+
+from .audio import AudioRingBuffer, DropOldestQueue, EchoSuppressor, SpeechOnsetDetector, TappedStream, rms
+from .stt import create_backend
+from .tracing import tracer
+
+if AUDIO_AVAILABLE:
+    class FileAudioSource(sr.AudioFile):
+        """
+        WAV/AIFF/FLAC file usable anywhere the microphone is, so the ear pipeline
+        can be tested and benchmarked without hardware. With `realtime=True` the
+        file plays against the wall clock like a live microphone: reads wait for
+        audio to "arrive", and audio nobody read within `overflow` seconds is
+        lost, just like a PyAudio input overflow.
+        """
+
+        def __init__(self, path, realtime=True, overflow=0.5):
+            super().__init__(path)
+            self.realtime = realtime
+            self.overflow = overflow
+            self.dropped_seconds = 0.0
+
+        def __enter__(self):
+            source = super().__enter__()
+            self.stream = _FileStream(self.stream, self.SAMPLE_RATE, self.SAMPLE_WIDTH, self.realtime, self.overflow)
+            return source
+
+        def __exit__(self, exc_type, exc_value, traceback):
+            self.dropped_seconds = self.stream.dropped_frames / float(self.SAMPLE_RATE)
+            super().__exit__(exc_type, exc_value, traceback)
+
+    class _FileStream:
+        """Wraps AudioFile's stream; `read(size)` takes a frame count, like PyAudio."""
+
+        def __init__(self, stream, sample_rate, sample_width, realtime=True, overflow=0.5):
+            self.stream = stream
+            self.sample_rate = sample_rate
+            self.sample_width = sample_width
+            self.realtime = realtime
+            self.overflow_frames = int(sample_rate * overflow)
+            self.started = None
+            self.position = 0 # Frames consumed
+            self.dropped_frames = 0
+            self.eof = False
+
+        def read(self, size=-1):
+            if self.realtime:
+                if self.started is None:
+                    self.started = time.time()
+                arrived = int((time.time() - self.started) * self.sample_rate)
+                # Audio older than the device buffer is gone
+                behind = arrived - self.position - self.overflow_frames
+                if behind > 0:
+                    skipped = len(self.stream.read(behind)) // self.sample_width
+                    self.position += skipped
+                    self.dropped_frames += skipped
+                # Wait for the requested chunk to be "captured"
+                wait = (self.position + max(size, 0) - arrived) / float(self.sample_rate)
+                if wait > 0:
+                    time.sleep(wait)
+            data = self.stream.read(size)
+            self.position += len(data) // self.sample_width
+            if not data:
+                self.eof = True
+            return data
+
+class UtteranceSegment:
+    """One captured utterance travelling from capture to callback, with per-stage timestamps."""
+
+    __slots__ = ("audio", "speech_end", "recognized_at", "delivered_at", "text", "echo")
+
+    def __init__(self, audio, speech_end, echo=False):
+        self.audio = audio
+        self.speech_end = speech_end
+        self.echo = echo # Captured while the robot was talking, with nothing louder than its own voice
+        self.recognized_at = None
+        self.delivered_at = None
+        self.text = None
+
+    def latencies(self):
+        """Seconds spent in each stage: speech end -> transcript -> callback done."""
+        return {
+            "stt": self.recognized_at - self.speech_end if self.recognized_at else None,
+            "callback": self.delivered_at - self.recognized_at if self.delivered_at and self.recognized_at else None,
+            "total": self.delivered_at - self.speech_end if self.delivered_at else None,
+        }
 
 class EmpathEar:
-    def __init__(self, callback):
+    """
+    Listening sub-system.
+    Capture and recognition never share a thread. With a segment backend
+    (default `google`), a capture thread cuts utterances with SpeechRecognition
+    and pushes them into a bounded drop-oldest queue drained by one or more
+    recognition workers, so speech during a slow recognize call is still
+    heard. With a local streaming backend (EMPATH_STT=vosk / whisper_cpp) the
+    microphone is captured continuously into a ring buffer and decoded
+    incrementally, so partial transcripts (`on_partial`) arrive before the
+    phrase ends.
+    `source` may be a path to an audio file instead of the microphone.
+    `on_speech_start` fires as soon as the user starts talking (energy onset,
+    before any transcript), which is what barge-in needs.
+    `playback` is the voice's PlaybackActivity. With it, audio captured while
+    the robot talks only counts as the user when it is louder than the
+    robot's own echo (EMPATH_ECHO: "gate" drops such utterances before
+    recognition, or feeds a streaming decoder silence instead; "tag" still
+    transcribes them for inspection but never delivers them, partials
+    included; "off" disables the check). Barge-in uses the same raised
+    threshold, so the robot does not interrupt itself.
+    """
+
+    def __init__(self, callback, backend=None, on_partial=None, buffer_seconds=30, source=None, workers=None, queue_size=None, on_speech_start=None, playback=None):
         self.callback = callback
+        self.on_partial = on_partial
+        self.vad_threshold = float(os.getenv("EMPATH_VAD_THRESHOLD", 300))
+        self.sample_rate = 16000 # Of the capture source, set once it is open
+        self.echo_mode = os.getenv("EMPATH_ECHO", "gate").lower()
+        self.echo = EchoSuppressor(playback) if playback is not None and self.echo_mode != "off" else None
+        self.onset = SpeechOnsetDetector(on_speech_start, threshold=self._onset_threshold) if on_speech_start else None
+        self.backend_name = backend or os.getenv("EMPATH_STT", "google")
+        self.backend = None
+        self.source_path = source
+        self.ring = AudioRingBuffer(seconds=buffer_seconds)
+        self.segments = DropOldestQueue(int(queue_size or os.getenv("EMPATH_EAR_QUEUE", 4)))
+        self.workers = int(workers or os.getenv("EMPATH_EAR_WORKERS", 1))
+        self.recent = deque(maxlen=50) # Finished segments, for latency stats
+        self.capture_done = threading.Event()
         if AUDIO_AVAILABLE:
             self.recognizer = sr.Recognizer()
-            self.microphone = sr.Microphone()
+            self.microphone = FileAudioSource(source) if source else sr.Microphone()
         self.listening = False
 
     def start_listening(self):
         if not AUDIO_AVAILABLE: return
         self.listening = True
-        threading.Thread(target=self._listen_loop, daemon=True).start()
+        self.capture_done.clear()
+        self.backend = self._load_backend()
+
+        if self.backend.streaming:
+            if not self.source_path:
+                self.microphone = sr.Microphone(sample_rate=self.backend.sample_rate)
+            threading.Thread(target=self._capture_loop, daemon=True).start()
+            threading.Thread(target=self._stream_loop, daemon=True).start()
+        else:
+            threading.Thread(target=self._segment_capture_loop, daemon=True).start()
+            for _ in range(self.workers):
+                threading.Thread(target=self._recognition_worker, daemon=True).start()
+
+    def _load_backend(self):
+        if not isinstance(self.backend_name, str):
+            return self.backend_name # Backend instance injected (e.g. FakeSTTBackend)
+        try:
+            backend = create_backend(self.backend_name)
+            if not backend.needs_network:
+                print(f"👂 Ear using local '{backend.name}' speech engine (offline).")
+            return backend
+        except Exception as e:
+            print(f"⚠️ Ear backend '{self.backend_name}' unavailable ({e}). Falling back to Google.")
+            return create_backend("google")
+
+    # --- Streaming path: capture thread -> ring buffer -> recognition thread ---
+
+    def _capture_loop(self):
+        try:
+            with self.microphone as source:
+                print("👂 Empath Ear is capturing continuously...")
+                self._set_sample_rate(source.SAMPLE_RATE)
+                while self.listening:
+                    # Never blocks on recognition: the ring just keeps the latest audio
+                    data = source.stream.read(source.CHUNK)
+                    if not data and getattr(source.stream, "eof", False):
+                        break # End of file source
+                    if self._on_chunk(data) and self.echo_mode == "gate":
+                        data = bytes(len(data)) # The decoder hears silence instead of the robot
+                    self.ring.write(data)
+        except Exception as e:
+            print(f"Ear Critical Error (Mic might be busy): {e}")
+        finally:
+            self.ring.close()
 
-    def _listen_loop(self):
+    def _stream_loop(self):
+        stream = self.backend.create_stream()
+        position = self.ring.position
+        phrase_start = None # When the audio of the phrase being decoded began
+        while self.listening:
+            try:
+                data, position = self.ring.read(position, timeout=0.5)
+                if not data:
+                    if self.ring.closed:
+                        final = stream.finish() # Capture ended mid-phrase
+                        if final and not self._heard_itself(final, phrase_start):
+                            self._deliver(final, tracer.begin(stt=self.backend.name, streaming=True))
+                        break
+                    continue
+                if phrase_start is None:
+                    phrase_start = time.time() - len(data) / (2.0 * self.sample_rate)
+                partial, final = stream.accept(data)
+                if partial and self.on_partial and not self._is_streamed_echo(phrase_start):
+                    self.on_partial(partial)
+                if final:
+                    if not self._heard_itself(final, phrase_start):
+                        print(f"👂 Ear Heard Context: '{final}'")
+                        self._deliver(final, tracer.begin(stt=self.backend.name, streaming=True))
+                    phrase_start = None
+            except Exception as e:
+                if self.listening:
+                    print(f"⚠️ Ear Stream Error: {e}")
+                    time.sleep(0.1)
+
+    # --- Segment path: capture thread -> bounded queue -> recognition workers ---
+
+    def _segment_capture_loop(self):
         try:
             with self.microphone as source:
-                print("👂 Empath Ear is adjusting for ambient noise...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=1.5)
-                self.recognizer.energy_threshold *= 1.2 # Be slightly less sensitive to noise
-                self.recognizer.dynamic_energy_threshold = True
-                print(f"👂 Ear is calibrated (Threshold: {self.recognizer.energy_threshold:.1f})")
-                print("👂 Empath Ear is listening (STAYING OPEN)...")
-                
+                if self.source_path:
+                    self.recognizer.dynamic_energy_threshold = False
+                    print(f"👂 Empath Ear is listening to file '{self.source_path}'...")
+                else:
+                    print("👂 Empath Ear is adjusting for ambient noise...")
+                    self.recognizer.adjust_for_ambient_noise(source, duration=1.5)
+                    self.recognizer.energy_threshold *= 1.2 # Be slightly less sensitive to noise
+                    self.recognizer.dynamic_energy_threshold = True
+                    print(f"👂 Ear is calibrated (Threshold: {self.recognizer.energy_threshold:.1f})")
+                    print("👂 Empath Ear is listening (STAYING OPEN)...")
+
+                if self.onset or self.echo:
+                    # See every chunk listen() reads, so speech onsets are reported mid-phrase
+                    self._set_sample_rate(source.SAMPLE_RATE)
+                    source.stream = TappedStream(source.stream, self._on_chunk)
+
                 while self.listening:
                     try:
-                        # Listen for audio
+                        # Listen for audio; recognition happens on the workers, so we are back here at once
                         audio = self.recognizer.listen(source, timeout=2, phrase_time_limit=10)
-                        
-                        try:
-                            # Uses Google Speech Recognition (free API)
-                            text = self.recognizer.recognize_google(audio, language="en-US")
-                            print(f"👂 Ear Heard Context: '{text}'")
-                            if text:
-                                self.callback(text)
-                        except sr.UnknownValueError:
-                            # Only print if we heard *something* but couldn't decode it
-                            pass
-                        except sr.RequestError as e:
-                            print(f"❌ Ear Service Error: {e}") 
-                            
                     except sr.WaitTimeoutError:
-                        continue 
-                    except Exception as e:
-                        if self.listening:
-                            print(f"⚠️ Ear Loop Inner Error: {e}")
+                        continue
+                    at_eof = getattr(source.stream, "eof", False)
+                    if at_eof and rms(audio.frame_data, audio.sample_width) < self.recognizer.energy_threshold:
+                        break # End of file, only trailing silence left
+                    speech_end = time.time()
+                    echo = self._is_echo(audio, speech_end)
+                    if echo and self.echo_mode == "gate":
+                        self.echo.gated += 1
+                        print("👂 Ear ignored its own voice.")
+                        continue
+                    evicted = self.segments.put(UtteranceSegment(audio, speech_end, echo))
+                    if evicted is not None:
+                        print(f"⚠️ Ear queue full, dropped an utterance ({self.segments.dropped} so far)")
+                    if at_eof:
+                        break
         except Exception as e:
             print(f"Ear Critical Error (Mic might be busy): {e}")
+        finally:
+            self.capture_done.set()
+
+    def _recognition_worker(self):
+        while self.listening:
+            segment = self.segments.get(timeout=0.5)
+            if segment is None:
+                if self.capture_done.is_set():
+                    break # File source exhausted and queue drained
+                continue
+            trace = self._begin_trace(segment)
+            try:
+                with tracer.activate(trace), tracer.span("stt", backend=self.backend.name) as span:
+                    segment.text = self.backend.transcribe(segment.audio)
+                    span.set(chars=len(segment.text or ""))
+                segment.recognized_at = time.time()
+                if segment.text and segment.echo:
+                    print(f"👂 Ear Heard Itself: '{segment.text}'")
+                    if trace:
+                        trace.set(outcome="echo")
+                elif segment.text:
+                    print(f"👂 Ear Heard Context: '{segment.text}'")
+                    delivered, trace = trace, None # Released by _deliver
+                    self._deliver(segment.text, delivered)
+                elif trace:
+                    trace.set(outcome="no_speech")
+                segment.delivered_at = time.time()
+                self.recent.append(segment)
+            except sr.RequestError as e:
+                print(f"❌ Ear Service Error: {e}")
+            except Exception as e:
+                if self.listening:
+                    print(f"⚠️ Ear Worker Error: {e}")
+            finally:
+                if trace:
+                    trace.release()
+
+    def _begin_trace(self, segment):
+        """One trace per utterance: capture and queueing are known by the time a worker picks it up."""
+        duration = len(segment.audio.frame_data) / float(segment.audio.sample_rate * segment.audio.sample_width)
+        trace = tracer.begin(start=segment.speech_end - duration, origin=segment.speech_end, stt=self.backend.name)
+        if trace:
+            trace.add_span("capture", trace.start, segment.speech_end)
+            trace.add_span("ear.queue", segment.speech_end, time.time())
+        return trace
+
+    def _deliver(self, text, trace):
+        """Runs the callback with the utterance's trace bound to this thread, then lets go of it."""
+        try:
+            with tracer.activate(trace):
+                self.callback(text)
+        finally:
+            if trace:
+                trace.release()
+
+    def latency_stats(self):
+        """Median per-stage latencies over recent utterances, plus queue health."""
+        def median(values):
+            values = sorted(v for v in values if v is not None)
+            return round(values[len(values) // 2], 3) if values else None
+
+        stages = [segment.latencies() for segment in list(self.recent)]
+        return {
+            "backend": getattr(self.backend, "name", None),
+            "queued": len(self.segments),
+            "dropped": self.segments.dropped,
+            "stt_s_p50": median(s["stt"] for s in stages),
+            "callback_s_p50": median(s["callback"] for s in stages),
+            "total_s_p50": median(s["total"] for s in stages),
+            "speech_onsets": self.onset.onsets if self.onset else None,
+            "echo": self.echo.stats() if self.echo else None,
+        }
+
+    # --- Echo suppression ---
+
+    def _base_threshold(self):
+        if self.backend is not None and not self.backend.streaming and AUDIO_AVAILABLE:
+            return self.recognizer.energy_threshold
+        return self.vad_threshold
+
+    def _onset_threshold(self):
+        base = self._base_threshold()
+        return self.echo.threshold(base) if self.echo else base
+
+    def _set_sample_rate(self, sample_rate):
+        self.sample_rate = sample_rate
+        if self.onset:
+            self.onset.sample_rate = sample_rate
+
+    def _on_chunk(self, data):
+        """Every captured chunk, on either path. Returns True if it is only the robot's own voice."""
+        echo = self.echo.observe(data, self._base_threshold(), self.sample_rate) if self.echo else False
+        if self.onset:
+            self.onset.feed(data)
+        return echo
+
+    def _is_streamed_echo(self, phrase_start):
+        """With EMPATH_ECHO=tag, whether the phrase decoded since `phrase_start` is the robot's own voice (gate already fed the decoder silence)."""
+        return self.echo_mode == "tag" and self.echo is not None and phrase_start is not None and self.echo.is_echo(phrase_start, time.time())
+
+    def _heard_itself(self, text, phrase_start):
+        if not self._is_streamed_echo(phrase_start):
+            return False
+        print(f"👂 Ear Heard Itself: '{text}'")
+        return True
+
+    def _is_echo(self, audio, speech_end):
+        if not self.echo:
+            return False
+        duration = len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+        return self.echo.is_echo(speech_end - duration, speech_end)
 
     def stop_listening(self):
         self.listening = False
@@ -1,8 +1,6 @@
+import os
 import threading
 import time
-import io
-import cv2
-import numpy as np
 from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 
@@ -11,16 +9,25 @@ from reachy_mini import ReachyMini, ReachyMiniApp
 # Relative imports
 from .detector import EmpathEye
 from .robot_controller import RobotController
-from .brain import EmpathBrain
+from .brain import EmpathBrain, BrainBusyError, BrainTimeoutError
 from .voice import EmpathVoice
 from .hearing import EmpathEar
+from .mjpeg import MJPEGBroadcaster
+from .wake_words import WakeWordEngine, EngagementGate
+from .motion import PRIORITY_IDLE
+from .emotion_state import EmotionStateTracker
+from .tracing import tracer
 
 load_dotenv()
 
+# Stream replies sentence by sentence into the voice (EMPATH_STREAM_REPLIES=0 to disable)
+STREAM_REPLIES = os.getenv("EMPATH_STREAM_REPLIES", "1") == "1"
+
 class EmpathState:
     def __init__(self):
         self.mode = "COMPANION" 
         self.current_emotion = "neutral"
+        self.emotion_confidence = 0.0
         self.visual_features = {}
 
 class ReachyMiniEmpath(ReachyMiniApp):
@@ -39,16 +46,21 @@ class ReachyMiniEmpath(ReachyMiniApp):
         
         self.eye = EmpathEye()
         self.voice = EmpathVoice()
+        self.voice.prewarm() # Canned lines play instantly from the speech cache
         self.brain = None
         self.ear = None
         
-        self.latest_frame_jpeg = None
-        self.last_engagement_time = time.time()
+        self.video_stream = MJPEGBroadcaster()
+        self.engagement = EngagementGate(WakeWordEngine()) # Wake words + 5-minute follow-up window
+        self.mirror = EmotionStateTracker()
         
         # 2. Async Init for Heavy Models
         def init_brain_thread():
             self.brain = EmpathBrain()
-            self.ear = EmpathEar(callback=self.on_hear_text)
+            # Barge-in: the voice stops as soon as the user starts talking (EMPATH_BARGE_IN=0 to disable).
+            # The ear follows what the voice plays, so neither barge-in nor transcripts fire on the robot's own speech.
+            barge_in = self.voice.barge_in if os.getenv("EMPATH_BARGE_IN", "1") == "1" else None
+            self.ear = EmpathEar(callback=self.on_hear_text, on_speech_start=barge_in, playback=self.voice.activity)
             self.ear.start_listening()
             print("🧠 [App] Brain & Ear Ready.")
             
@@ -61,8 +73,21 @@ class ReachyMiniEmpath(ReachyMiniApp):
             return {
                 "mode": self.state.mode,
                 "emotion": self.state.current_emotion,
+                "emotion_confidence": self.state.emotion_confidence,
                 "brain_online": self.brain is not None and not self.brain.offline,
-                "features": self.state.visual_features
+                "brain_pending": self.brain.pending if self.brain else 0,
+                "response_cache": self.brain.cache.stats() if self.brain else {},
+                "brain_tiers": self.brain.health() if self.brain else {},
+                "brain_hedge": self.brain.hedge_stats() if self.brain else {},
+                "features": self.state.visual_features,
+                "video_stream": self.video_stream.stats(),
+                "motion": self.robot.motion.stats(),
+                "mirror": self.mirror.stats(),
+                "face_tracking": self.eye.tracker.stats(),
+                "apparel": self.eye.apparel.stats(),
+                "emotion_classifier": self.eye.emotions.stats() if self.eye.emotions else {},
+                "ear": self.ear.latency_stats() if self.ear else {},
+                "voice": self.voice.stats()
             }
             
         @self.settings_app.post("/chat")
@@ -74,16 +99,20 @@ class ReachyMiniEmpath(ReachyMiniApp):
             self.on_hear_text(text) 
             return {"status": "processed"}
 
-        def video_stream_gen():
-            while not stop_event.is_set():
-                if self.latest_frame_jpeg:
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + self.latest_frame_jpeg + b'\r\n')
-                time.sleep(0.05)
+        @self.settings_app.get("/metrics")
+        def get_metrics():
+            # Per-stage latency percentiles over recent interactions (stt, brain tiers, tts, to_first_audio...)
+            return tracer.metrics()
+
+        @self.settings_app.get("/scene")
+        def get_scene():
+            # Everyone in view, nearest first; `primary` marks who the robot is talking to
+            return {"primary_id": self.eye.scene.primary_id, "faces": self.eye.scene.to_list()}
 
         @self.settings_app.get("/video_feed")
-        def video_feed():
-            return StreamingResponse(video_stream_gen(), media_type="multipart/x-mixed-replace; boundary=frame")
+        async def video_feed(fps: float = None):
+            # Encoded once per frame in the logic loop, shared by every client
+            return StreamingResponse(self.video_stream.stream(max_fps=fps), media_type="multipart/x-mixed-replace; boundary=frame")
 
         # 4. Main Logic Loop
         print("🚀 [App] Reachy Empath Running...")
@@ -91,67 +120,85 @@ class ReachyMiniEmpath(ReachyMiniApp):
         while not stop_event.is_set():
             # Vision Loop
             frame = self.robot.get_frame()
+            analysis = None
             if frame is not None:
-                analysis, annotated = self.eye.analyze_frame(frame)
-                
-                self.state.current_emotion = analysis["dominant_emotion"]
-                self.state.visual_features = analysis.get("features", {})
+                try:
+                    analysis, annotated = self.eye.analyze_frame(frame, annotate=self.video_stream.has_subscribers)
+                except Exception as e:
+                    # One bad frame must not stop the logic loop
+                    print(f"⚠️ [App] Frame analysis error: {e}")
+            if analysis is not None:
+                self.state.visual_features = analysis.get("features", {}) # Primary face (active speaker, else nearest)
+                self.state.emotion_confidence = analysis.get("emotion_confidence", 0.0)
                 
-                # Update visual mirror
-                if analysis["face_detected"]:
-                     self._handle_visual_mirroring(self.state.current_emotion)
-
-                # JPEG Encode for Stream
-                ret, buffer = cv2.imencode('.jpg', annotated)
-                if ret:
-                    self.latest_frame_jpeg = buffer.tobytes()
+                # Update visual mirror (smoothed; gestures only on a settled change)
+                self._handle_visual_mirroring(analysis["dominant_emotion"], analysis["face_detected"])
+
+                # JPEG Encode for Stream (skipped when nobody is watching)
+                self.video_stream.publish(annotated)
             
             time.sleep(0.05)
             
         # Cleanup
+        self.video_stream.close()
+        if self.eye.emotions: self.eye.emotions.close()
         if self.ear: self.ear.stop_listening()
+        self.voice.shutdown()
+        if self.brain: self.brain.shutdown() # Also writes the response cache's pending save
         self.robot.disconnect()
+        tracer.close()
 
-    def _handle_visual_mirroring(self, emotion):
+    def _handle_visual_mirroring(self, emotion, face_detected):
          # Mirroring Logic
-         if emotion == "happy": self.robot.trigger_gesture("happy")
-         elif emotion == "sad": self.robot.trigger_gesture("sad")
-         elif emotion == "angry": self.robot.trigger_gesture("angry")
-         elif emotion == "surprise": self.robot.trigger_gesture("surprised")
-         elif emotion == "fear": self.robot.trigger_gesture("bashful")
-         elif emotion == "disgust": self.robot.trigger_gesture("confused")
+         gesture = self.mirror.update(emotion, face_detected)
+         self.state.current_emotion = self.mirror.state
+         if gesture: self.robot.trigger_gesture(gesture, priority=PRIORITY_IDLE)
 
     def on_hear_text(self, text):
         raw_text = text.lower().strip()
         if len(raw_text) < 2: return
         
-        wake_words = ["reachy", "hello", "hi", "tadashi", "jarvis"]
-        is_active = any(w in raw_text for w in wake_words)
-        
-        if not is_active:
-             if time.time() - self.last_engagement_time < 300:
-                 is_active = True
-             elif self.state.current_emotion != "neutral":
-                 is_active = True
+        with tracer.span("wake_word") as span:
+            is_active, reason, _ = self.engagement.decide(raw_text, self.state.current_emotion)
+            span.set(active=is_active, reason=reason)
                  
         if is_active:
             print(f"🚀 [App] Activated: {raw_text}")
-            self.last_engagement_time = time.time()
+            self.engagement.engage()
             if self.brain:
                 self.robot.trigger_gesture("agree")
-                threading.Thread(target=self._process_reply, args=(raw_text,), daemon=True).start()
+                threading.Thread(target=tracer.wrap(self._process_reply), args=(raw_text,), daemon=True).start()
                 
     def _process_reply(self, text):
         frame = self.robot.get_frame()
-        response = self.brain.process_query(text, self.state.current_emotion, frame, self.state.visual_features)
+        visual_notes = self.eye.scene.visual_notes() # Active speaker, else the nearest face
+        try:
+            if STREAM_REPLIES:
+                # First sentence plays while the rest is still being generated
+                sentences = self.brain.stream_query(text, self.state.current_emotion, frame, visual_notes)
+                self.voice.speak_stream(self._express_while_speaking(sentences))
+                return
+            response = self.brain.query(text, self.state.current_emotion, frame, visual_notes)
+        except (BrainBusyError, BrainTimeoutError) as e:
+            print(f"⏳ [App] Reply skipped: {e}")
+            return
         
+        self._express_reply(response)
+        self.voice.speak(response)
+
+    def _express_reply(self, response):
         # Gestures based on response text
         lr = response.lower()
         if any(x in lr for x in ["haha", "lol", "funny"]): self.robot.trigger_gesture("giggles")
         elif any(x in lr for x in ["sad", "sorry"]): self.robot.trigger_gesture("bashful")
         else: self.robot.trigger_gesture("agree")
-            
-        self.voice.speak(response)
+
+    def _express_while_speaking(self, sentences):
+        """Passes sentences through, reacting physically to the first one as it starts playing."""
+        for i, sentence in enumerate(sentences):
+            if i == 0:
+                self._express_reply(sentence)
+            yield sentence
 
 if __name__ == "__main__":
     app = ReachyMiniEmpath()
@@ -0,0 +1,182 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None
+
+
+class AudioOutput:
+    """
+    Speaker interface used by EmpathVoice.
+    `play(speech, cancel)` blocks until the Speech has been played and
+    returns True, or stops early and returns False once the `cancel` event
+    is set. Audio is written in `chunk_seconds` pieces so a stop is heard
+    within one chunk. When `activity` (a PlaybackActivity) is set, every
+    chunk is reported to it as it is written, so the ear knows when it is
+    hearing the robot itself.
+    """
+
+    name = "base"
+    chunk_seconds = 0.05
+    activity = None
+
+    def play(self, speech, cancel=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _chunks(self, speech):
+        step = max(1, int(speech.sample_rate * self.chunk_seconds))
+        for i in range(0, len(speech.pcm), step):
+            chunk = speech.pcm[i:i + step]
+            if self.activity is not None:
+                self.activity.note(chunk, speech.sample_rate)
+            yield chunk
+
+
+class PyAudioOutput(AudioOutput):
+    """One PortAudio output stream, opened once and kept open (reopened only when the sample rate changes)."""
+
+    name = "pyaudio"
+
+    def __init__(self):
+        if pyaudio is None:
+            raise RuntimeError("PyAudio is not installed (pip install pyaudio)")
+        self._pa = pyaudio.PyAudio()
+        self._stream = None
+        self._rate = None
+
+    def _open(self, rate):
+        if self._stream is None or self._rate != rate:
+            self.close()
+            self._stream = self._pa.open(format=pyaudio.paInt16, channels=1, rate=rate, output=True)
+            self._rate = rate
+        return self._stream
+
+    def play(self, speech, cancel=None):
+        stream = self._open(speech.sample_rate)
+        for chunk in self._chunks(speech):
+            if cancel is not None and cancel.is_set():
+                return False
+            stream.write(chunk.tobytes())
+        return True
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+
+
+class AplayOutput(AudioOutput):
+    """ALSA `aplay` fed raw PCM through a pipe: Linux playback without PortAudio or temp files."""
+
+    name = "aplay"
+
+    def __init__(self, device=None):
+        if not shutil.which("aplay"):
+            raise RuntimeError("aplay is not installed (apt install alsa-utils)")
+        self.device = device or os.getenv("EMPATH_ALSA_DEVICE")
+
+    def play(self, speech, cancel=None):
+        command = ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r", str(speech.sample_rate)]
+        if self.device:
+            command += ["-D", self.device]
+        player = subprocess.Popen(command + ["-"], stdin=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            for chunk in self._chunks(speech):
+                if cancel is not None and cancel.is_set():
+                    player.kill() # Drops what is still buffered in the pipe
+                    return False
+                player.stdin.write(chunk.tobytes())
+            player.stdin.close()
+            while player.poll() is None:
+                if cancel is not None and cancel.is_set():
+                    player.kill()
+                    return False
+                time.sleep(self.chunk_seconds)
+            return True
+        except BrokenPipeError:
+            return False
+        finally:
+            if player.poll() is None:
+                player.kill()
+
+
+class AfplayOutput(AudioOutput):
+    """macOS `afplay`. It only reads files, so this is the one output that writes a temporary WAV."""
+
+    name = "afplay"
+
+    def __init__(self):
+        if not shutil.which("afplay"):
+            raise RuntimeError("afplay is only available on macOS")
+
+    def play(self, speech, cancel=None):
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+            tmp.write(speech.to_wav())
+            path = tmp.name
+        if self.activity is not None:
+            for _ in self._chunks(speech):
+                pass # afplay takes the whole file at once, so report all of it now
+        try:
+            player = subprocess.Popen(["afplay", path])
+            while player.poll() is None:
+                if cancel is not None and cancel.is_set():
+                    player.kill()
+                    return False
+                time.sleep(self.chunk_seconds)
+            return True
+        finally:
+            os.remove(path)
+
+
+class NullOutput(AudioOutput):
+    """No speaker: waits out the audio's duration, so timing matches real playback (headless runs, benchmarks)."""
+
+    name = "null"
+
+    def play(self, speech, cancel=None):
+        for chunk in self._chunks(speech):
+            if cancel is not None and cancel.is_set():
+                return False
+            time.sleep(len(chunk) / float(speech.sample_rate))
+        return True
+
+
+OUTPUTS = {
+    "pyaudio": PyAudioOutput,
+    "aplay": AplayOutput,
+    "afplay": AfplayOutput,
+    "null": NullOutput,
+}
+
+
+def create_output(name=None):
+    """
+    Builds the output named by `name` or EMPATH_AUDIO_OUT. The default,
+    "auto", prefers a persistent PyAudio stream, then aplay on Linux and
+    afplay on macOS, and finally the silent NullOutput. An unknown name
+    falls back to "auto" with a warning.
+    """
+    name = (name or os.getenv("EMPATH_AUDIO_OUT", "auto")).lower()
+    if name != "auto" and name not in OUTPUTS:
+        print(f"⚠️ [Voice] Unknown audio output '{name}' (use auto or one of {', '.join(OUTPUTS)}). Using auto.")
+        name = "auto"
+    if name != "auto":
+        return OUTPUTS[name]()
+    candidates = ["pyaudio", "afplay" if sys.platform == "darwin" else "aplay"]
+    for candidate in candidates:
+        try:
+            return OUTPUTS[candidate]()
+        except Exception as e:
+            print(f"⚠️ [Voice] Audio output '{candidate}' unavailable: {e}")
+    print("⚠️ [Voice] No audio output found. Speech will be silent.")
+    return NullOutput()
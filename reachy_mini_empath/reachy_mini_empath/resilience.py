@@ -0,0 +1,124 @@
+import random
+import threading
+import time
+
+from .tracing import tracer
+
+
+class BackendUnavailable(RuntimeError):
+    """Raised instead of calling a backend whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker with exponential backoff.
+
+    closed    -> calls go through; `failure_threshold` consecutive failures open it
+    open      -> calls are rejected instantly until the backoff expires
+    half_open -> a single probe call is let through; success closes the circuit,
+                 failure re-opens it with a doubled backoff (capped at `max_backoff`)
+
+    Also keeps a small latency profile so /status can show where time goes.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=3, base_backoff=5.0, max_backoff=300.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._trips = 0
+        self._retry_at = 0.0
+        self._probe_in_flight = False
+
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.last_error = None
+        self.last_latency = None
+        self.avg_latency = None
+
+    def allow(self):
+        """True if a call may go out now. Moves open -> half_open once the backoff expired."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self._retry_at:
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, latency):
+        with self._lock:
+            self.calls += 1
+            self._observe(latency)
+            self._consecutive_failures = 0
+            self._trips = 0
+            self._probe_in_flight = False
+            if self.state != self.CLOSED:
+                print(f"✅ [Breaker] {self.name} recovered.")
+            self.state = self.CLOSED
+
+    def record_failure(self, latency, error=None):
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self._observe(latency)
+            self.last_error = str(error)[:200] if error else None
+            self._consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._trips += 1
+                backoff = min(self.max_backoff, self.base_backoff * (2 ** (self._trips - 1)))
+                backoff *= random.uniform(0.8, 1.2) # Jitter so tiers do not all wake together
+                self._retry_at = time.monotonic() + backoff
+                self.state = self.OPEN
+                print(f"🔌 [Breaker] {self.name} OPEN for {backoff:.1f}s ({self._consecutive_failures} failures).")
+
+    def abandon(self):
+        """The call let through by `allow` was given up for reasons unrelated to the backend's health: record nothing, free the probe slot."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def call(self, fn, *args, **kwargs):
+        """Runs fn through the breaker. Raises BackendUnavailable without calling it if open."""
+        if not self.allow():
+            tracer.event("brain.skipped", tier=self.name)
+            raise BackendUnavailable(f"{self.name} circuit is open")
+        start = time.monotonic()
+        with tracer.span(f"brain.{self.name}"): # One span per tier attempt
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self.record_failure(time.monotonic() - start, e)
+                raise
+        self.record_success(time.monotonic() - start)
+        return result
+
+    def _observe(self, latency):
+        self.last_latency = latency
+        self.avg_latency = latency if self.avg_latency is None else 0.8 * self.avg_latency + 0.2 * latency
+
+    def stats(self):
+        retry_in = max(0.0, self._retry_at - time.monotonic()) if self.state == self.OPEN else 0.0
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "retry_in_s": round(retry_in, 1),
+            "last_latency_ms": round(self.last_latency * 1000, 1) if self.last_latency is not None else None,
+            "avg_latency_ms": round(self.avg_latency * 1000, 1) if self.avg_latency is not None else None,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,194 @@
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+# Queries whose answer depends on what the camera sees (or on the clock)
+_VISUAL_HINTS = re.compile(
+    r"\b(see|seeing|look|looking|looks|watch|wearing|wear|holding|hold|show|showing|"
+    r"color|colour|shirt|hair|this|that|these|those|front|table|toy|picture|camera)\b"
+)
+_VOLATILE_HINTS = re.compile(r"\b(weather|time|today|tonight|tomorrow|now|news|date)\b")
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Lowercases, strips punctuation and collapses whitespace: 'Hello, Reachy!' -> 'hello reachy'."""
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", text.lower())).strip()
+
+
+def context_digest(visual_notes):
+    """Short stable digest of the visual notes a reply was made with, or None when there are none."""
+    if not visual_notes:
+        return None
+    return zlib.crc32(json.dumps(visual_notes, sort_keys=True, default=str).encode("utf-8"))
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of brain replies keyed on (normalized text, emotion, scene
+    hash, visual context digest). Repeated greetings and small talk are
+    answered without touching Gemini or HuggingFace. Optionally persisted as
+    JSON so warm entries survive restarts; writes are batched on a timer
+    (EMPATH_CACHE_SAVE_INTERVAL seconds) instead of happening on every reply.
+    """
+
+    def __init__(self, ttl=None, max_entries=None, path=None, bypass_visual=None, save_interval=None):
+        self.ttl = float(ttl if ttl is not None else os.getenv("EMPATH_CACHE_TTL", 3600))
+        self.max_entries = int(max_entries if max_entries is not None else os.getenv("EMPATH_CACHE_SIZE", 256))
+        self.path = path if path is not None else os.getenv("EMPATH_CACHE_PATH")
+        # True: frame-dependent queries skip the cache. False: they are keyed on the scene hash instead.
+        if bypass_visual is None:
+            bypass_visual = os.getenv("EMPATH_CACHE_VISUAL_BYPASS", "1") == "1"
+        self.bypass_visual = bypass_visual
+        self.save_interval = float(save_interval if save_interval is not None else os.getenv("EMPATH_CACHE_SAVE_INTERVAL", 5.0))
+
+        self._entries = OrderedDict() # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock() # One writer of the cache file at a time
+        self._save_timer = None
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+        if self.path:
+            self._load()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.ttl > 0
+
+    def is_visual(self, text):
+        return bool(_VISUAL_HINTS.search(normalize_text(text)))
+
+    def make_key(self, text, emotion="neutral", scene_hash=None, context=None):
+        """
+        Returns the cache key for a query, or None if it must not be cached.
+        `scene_hash` is only used for frame-dependent queries; `context` (see
+        context_digest) separates replies made with different visual notes.
+        """
+        if not self.enabled:
+            return None
+        normalized = normalize_text(text)
+        context = "-" if context is None else f"{context:x}"
+        if not normalized or _VOLATILE_HINTS.search(normalized):
+            self._bypass()
+            return None
+        if _VISUAL_HINTS.search(normalized):
+            if self.bypass_visual or scene_hash is None:
+                self._bypass()
+                return None
+            return f"{normalized}|{emotion}|{scene_hash:x}|{context}"
+        return f"{normalized}|{emotion}|-|{context}"
+
+    def _bypass(self):
+        with self._lock:
+            self.bypassed += 1
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, response):
+        if key is None or not response:
+            return
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.path:
+            self._schedule_save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            self.flush()
+
+    def flush(self):
+        """Writes the cache file now (no-op without a path)."""
+        if not self.path:
+            return
+        with self._lock:
+            self._save_timer = None
+            snapshot = list(self._entries.items())
+        self._save(snapshot)
+
+    def close(self):
+        """Cancels the pending timed save and writes what is cached."""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+            self.flush()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    # --- Persistence ---
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"⚠️ [Cache] Could not load {self.path}: {e}")
+            return
+        now = time.time()
+        for key, expires_at, response in data:
+            if expires_at > now:
+                self._entries[key] = (expires_at, response)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        print(f"🗄️ [Cache] Loaded {len(self._entries)} cached replies.")
+
+    def _schedule_save(self):
+        """Saves once `save_interval` after the first unsaved put, off the reply path."""
+        if self.save_interval <= 0:
+            self.flush()
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return # A save is already due and will include this entry
+            self._save_timer = threading.Timer(self.save_interval, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save(self, items):
+        # Own temp file per writer: a shared one could be swapped in half-written by a concurrent save
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._save_lock:
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump([[key, expires_at, response] for key, (expires_at, response) in items], f)
+                os.replace(tmp_path, self.path) # Atomic swap, never a half-written cache
+            except Exception as e:
+                print(f"⚠️ [Cache] Could not persist {self.path}: {e}")
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
@@ -1,10 +1,11 @@
 import numpy as np
-import time
-import threading
 import cv2
 from reachy_mini import ReachyMini
 from reachy_mini.utils import create_head_pose
 
+from .motion import MotionScheduler, PRIORITY_CONVERSATION
+from .gestures import GestureLibrary
+
 class RobotController:
     """
     Advanced physical actuation layer. 
@@ -14,7 +15,9 @@ class RobotController:
     def __init__(self):
         self.mini = None
         self.running = False
-        self._is_moving = False
+        self.motion = MotionScheduler() # One executor thread for every gesture
+        self.gestures = GestureLibrary() # Keyframes compiled once from gestures.json
+        self._last_pose = None # Where an interrupted gesture left the head
         self.cap = None
         self.use_local_camera = False
 
@@ -35,6 +38,7 @@ class RobotController:
         return True
 
     def disconnect(self):
+        self.motion.cancel()
         if self.cap:
             self.cap.release()
         if self.mini:
@@ -54,136 +58,31 @@ class RobotController:
                 return None
         return None
 
-    def trigger_gesture(self, gesture_name):
+    @property
+    def is_moving(self):
+        return self.motion.busy
+
+    def trigger_gesture(self, gesture_name, priority=PRIORITY_CONVERSATION, speed=1.0):
         """
         Asynchronous expression trigger. Non-blocking to keep logic loop fluid.
+        Returns a future that resolves to True once the gesture has played.
         """
-        if self._is_moving:
-            return
-            
-        method = getattr(self, f"_{gesture_name}", None)
-        if method:
-            threading.Thread(target=method, daemon=True).start()
-        else:
-            print(f"⚠️ [Controller] Scripted gesture '{gesture_name}' not identified.")
+        gesture = self.gestures.get(gesture_name)
+        if gesture:
+            return self.motion.submit(gesture_name, lambda cancel: self._perform(gesture, cancel, speed), priority)
+        print(f"⚠️ [Controller] Scripted gesture '{gesture_name}' not identified.")
+        return None
 
-    # --- Scripted Gestures for PersonaPlex Feedback ---
+    def cancel_gestures(self, gesture_name=None):
+        self.motion.cancel(gesture_name)
 
-    def _happy(self):
-        self._is_moving = True
-        try:
-            if not self.mini: return
-            self.mini.goto_target(
-                antennas=np.deg2rad([45, -45]),
-                head=create_head_pose(z=10, pitch=-10),
-                duration=0.6
-            )
-            time.sleep(0.6)
+    def _perform(self, gesture, cancel, speed):
+        # Runs on the motion-executor thread only
+        if not self.mini: return
+        last = gesture.play(self.mini, cancel, speed, start_from=self._last_pose)
+        if last >= 0:
+            self._last_pose = gesture.params[last]
+        if cancel.is_set() and not self.motion.pending:
+            # Cancelled with nothing queued behind it: don't freeze mid-pose
             self.mini.goto_target(head=create_head_pose(), antennas=np.deg2rad([0,0]), duration=0.4)
-        finally:
-            self._is_moving = False
-
-    def _thinking(self):
-        self._is_moving = True
-        try:
-            if not self.mini: return
-            self.mini.goto_target(head=create_head_pose(pitch=-15, roll=10), antennas=np.deg2rad([30, 30]), duration=0.8)
-            time.sleep(1.0)
-            self.mini.goto_target(head=create_head_pose(), antennas=np.deg2rad([0,0]), duration=0.6)
-        finally:
-            self._is_moving = False
-
-    def _agree(self):
-        self._is_moving = True
-        try:
-            if not self.mini: return
-            for _ in range(2):
-                self.mini.goto_target(head=create_head_pose(pitch=15), duration=0.3)
-                time.sleep(0.3)
-                self.mini.goto_target(head=create_head_pose(pitch=-5), duration=0.3)
-                time.sleep(0.3)
-            self.mini.goto_target(head=create_head_pose(), duration=0.3)
-        finally:
-            self._is_moving = False
-
-    def _bashful(self):
-        self._is_moving = True
-        try:
-            if not self.mini: return
-            self.mini.goto_target(
-                head=create_head_pose(pitch=15, roll=-20),
-                antennas=np.deg2rad([110, -110]),
-                duration=0.8
-            )
-            time.sleep(1.5)
-            self.mini.goto_target(head=create_head_pose(), antennas=np.deg2rad([0,0]), duration=0.8)
-        finally:
-            self._is_moving = False
-
-    def _giggles(self):
-        self._is_moving = True
-        try:
-            if not self.mini: return
-            for _ in range(4):
-                phi = 10 if _ % 2 == 0 else -10
-                self.mini.goto_target(head=create_head_pose(roll=phi), duration=0.15)
-                time.sleep(0.15)
-            self.mini.goto_target(head=create_head_pose(), duration=0.2)
-        finally:
-            self._is_moving = False
-
-    def _sad(self):
-        self._is_moving = True
-        try:
-            if not self.mini: return
-            self.mini.goto_target(
-                head=create_head_pose(pitch=25), # Look down
-                antennas=np.deg2rad([130, -130]), # Droopy antennas
-                duration=1.0
-            )
-            time.sleep(1.5)
-            self.mini.goto_target(head=create_head_pose(), antennas=np.deg2rad([0,0]), duration=1.0)
-        finally:
-            self._is_moving = False
-
-    def _angry(self):
-        self._is_moving = True
-        try:
-            if not self.mini: return
-            # Fast, sharp movement
-            self.mini.goto_target(
-                head=create_head_pose(pitch=10, z=5), 
-                antennas=np.deg2rad([-20, 20]), # Forward/aggressive
-                duration=0.3
-            )
-            time.sleep(1.0)
-            self.mini.goto_target(head=create_head_pose(), antennas=np.deg2rad([0,0]), duration=0.8)
-        finally:
-            self._is_moving = False
-
-    def _surprised(self):
-        self._is_moving = True
-        try:
-            if not self.mini: return
-            self.mini.goto_target(
-                head=create_head_pose(pitch=-15, r=10), # Backwards/Up
-                antennas=np.deg2rad([60, -60]), # Wide open
-                duration=0.2
-            )
-            time.sleep(1.0)
-            self.mini.goto_target(head=create_head_pose(), antennas=np.deg2rad([0,0]), duration=0.6)
-        finally:
-            self._is_moving = False
-
-    def _confused(self):
-        self._is_moving = True
-        try:
-            if not self.mini: return
-            # Head tilt left then right
-            self.mini.goto_target(head=create_head_pose(roll=15, pitch=-5), antennas=np.deg2rad([30, 0]), duration=0.5)
-            time.sleep(0.5)
-            self.mini.goto_target(head=create_head_pose(roll=-15, pitch=-5), antennas=np.deg2rad([0, -30]), duration=0.5)
-            time.sleep(0.5)
-            self.mini.goto_target(head=create_head_pose(), antennas=np.deg2rad([0,0]), duration=0.5)
-        finally:
-            self._is_moving = False
+            self._last_pose = None
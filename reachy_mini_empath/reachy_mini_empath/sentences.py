@@ -0,0 +1,56 @@
+import re
+
+# Abbreviations that end with a period but do not end a sentence
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "st", "vs", "etc", "e.g", "i.e", "approx", "no"}
+
+# Sentence terminator followed by whitespace (the next sentence has started)
+_BOUNDARY = re.compile(r'([.!?…]+["\')\]]*|\n+)\s+')
+
+
+class SentenceSplitter:
+    """
+    Incremental sentence segmentation for streamed LLM output.
+    Feed text chunks as they arrive; complete sentences are returned as soon
+    as the following whitespace shows they are finished. Short fragments are
+    merged forward so TTS is not asked to speak a lone "Oh."
+    """
+
+    def __init__(self, min_chars=12):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, chunk):
+        """Adds a chunk and returns the list of sentences completed by it."""
+        if not chunk:
+            return []
+        self._buffer += chunk
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            end = match.end(1)
+            candidate = self._buffer[start:end].strip()
+            if self._is_abbreviation(candidate) or len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        """Returns whatever is left once the stream has ended."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+    def _is_abbreviation(self, candidate):
+        if not candidate.endswith("."):
+            return False
+        last_word = candidate[:-1].rsplit(None, 1)[-1].lower() if candidate[:-1].strip() else ""
+        # "3." inside "3.5" never reaches here (no whitespace), but "No. 5" and "Dr. Who" do
+        return last_word in _ABBREVIATIONS or (len(last_word) == 1 and last_word.isalpha())
+
+
+def split_sentences(text, min_chars=12):
+    """One-shot helper for non-streamed replies."""
+    splitter = SentenceSplitter(min_chars=min_chars)
+    return splitter.feed(text) + splitter.flush()
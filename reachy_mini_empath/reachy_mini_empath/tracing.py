@@ -0,0 +1,337 @@
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+
+class Span:
+    """One timed stage of an interaction (e.g. `stt`, `brain.gemini`, `tts`)."""
+
+    __slots__ = ("name", "start", "end", "attributes", "span_id", "parent_id")
+
+    def __init__(self, name, start, end=None, parent_id=None, attributes=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.attributes = dict(attributes or {})
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self):
+        return self.end - self.start if self.end is not None else None
+
+    def to_dict(self):
+        return {"name": self.name, "start": round(self.start, 6), "duration": _round(self.duration),
+                "span_id": self.span_id, "parent_id": self.parent_id, "attributes": self.attributes}
+
+
+class _NullSpan(Span):
+    """Handed out when no interaction is being traced; attributes go nowhere."""
+
+    def set(self, **attributes):
+        pass
+
+
+_NULL_SPAN = _NullSpan("null", 0.0, 0.0)
+
+
+class Trace:
+    """
+    One interaction, from the user finishing a sentence to the robot answering.
+    Spans are timed stages, events are instants (`first_audio`,
+    `gesture_start`). `origin` is when the user stopped talking; event
+    offsets in the metrics are measured from it.
+    Every component still working on the interaction holds the trace
+    (`hold` / `release`); it is finished and exported when the last one lets go.
+    """
+
+    def __init__(self, tracer, name, start=None, origin=None, **attributes):
+        self.tracer = tracer
+        self.name = name
+        self.start = time.time() if start is None else start
+        self.origin = self.start if origin is None else origin
+        self.end = None
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(name, self.start, attributes=attributes)
+        self.spans = []
+        self.events = [] # (name, at, attributes)
+        self._holds = 1
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.end is not None
+
+    def set(self, **attributes):
+        self.root.set(**attributes)
+
+    def add_span(self, name, start, end, parent=None, **attributes):
+        """Records a stage whose timestamps are already known. Ignored once the trace is finished."""
+        span = Span(name, start, end, (parent or self.root).span_id, attributes)
+        with self._lock:
+            if not self.finished:
+                self.spans.append(span)
+        return span
+
+    def event(self, name, at=None, **attributes):
+        with self._lock:
+            if not self.finished:
+                self.events.append((name, time.time() if at is None else at, attributes))
+
+    def first(self, name):
+        """Time of the first `name` event, or None."""
+        return next((at for event, at, _ in self.events if event == name), None)
+
+    def hold(self):
+        with self._lock:
+            self._holds += 1
+
+    def release(self):
+        with self._lock:
+            self._holds -= 1
+            if self._holds > 0 or self.finished:
+                return
+            self.end = max([time.time()] + [s.end for s in self.spans if s.end is not None])
+            self.root.end = self.end
+        self.tracer._finish(self)
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "origin": round(self.origin, 6),
+            "duration": _round(self.root.duration),
+            "attributes": self.root.attributes,
+            "spans": [span.to_dict() for span in self.spans],
+            "events": [{"name": name, "offset": _round(at - self.origin), "attributes": attrs} for name, at, attrs in self.events],
+        }
+
+    def to_otlp(self, service="reachy-empath"):
+        """The trace as an OTLP/JSON ExportTraceServiceRequest (what an OpenTelemetry collector's file receiver reads)."""
+        def otlp_span(span, events=()):
+            return {
+                "traceId": self.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": 1, # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(int(span.start * 1e9)),
+                "endTimeUnixNano": str(int((span.end if span.end is not None else span.start) * 1e9)),
+                "attributes": _otlp_attributes(span.attributes),
+                "events": [{"name": name, "timeUnixNano": str(int(at * 1e9)), "attributes": _otlp_attributes(attrs)} for name, at, attrs in events],
+            }
+
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service})},
+            "scopeSpans": [{
+                "scope": {"name": "empath.tracing"},
+                "spans": [otlp_span(self.root, self.events)] + [otlp_span(span) for span in self.spans],
+            }],
+        }]}
+
+
+class Tracer:
+    """
+    Lightweight per-interaction tracing for the ear -> brain -> voice -> gestures loop.
+    The ear begins a Trace for every utterance and binds it to the thread
+    that handles it; the code downstream opens spans on whatever trace is
+    bound (`span`, `event`) and does nothing when none is. `wrap` carries
+    the trace into another thread or worker pool.
+    Finished traces feed per-stage latency windows (`metrics`: p50/p95/p99)
+    and, with EMPATH_TRACE_FILE, are appended to that file as JSON lines in
+    EMPATH_TRACE_FORMAT "jsonl" (default) or "otlp" (OpenTelemetry OTLP/JSON).
+    EMPATH_TRACE=0 turns tracing off.
+    """
+
+    def __init__(self, path=None, fmt=None, window=500, enabled=None):
+        self.enabled = enabled
+        self.path = path
+        self.fmt = fmt
+        self.window = window
+        self.finished = 0
+        self.recent = deque(maxlen=50)
+        self._samples = {} # stage -> deque of seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._configured = False
+        self._file = None
+
+    def _configure(self):
+        # Read lazily: the environment (.env) is only complete once the app has started
+        if self.enabled is None:
+            self.enabled = os.getenv("EMPATH_TRACE", "1") == "1"
+        self.path = self.path or os.getenv("EMPATH_TRACE_FILE")
+        self.fmt = (self.fmt or os.getenv("EMPATH_TRACE_FORMAT", "jsonl")).lower()
+        self._configured = True
+
+    @property
+    def current(self):
+        """Trace bound to the calling thread, or None."""
+        return getattr(self._local, "trace", None)
+
+    def begin(self, name="interaction", start=None, origin=None, **attributes):
+        """Starts a trace (held once by the caller, who must `release` it). Returns None when tracing is off."""
+        if not self._configured:
+            self._configure()
+        if not self.enabled:
+            return None
+        return Trace(self, name, start, origin, **attributes)
+
+    @contextmanager
+    def activate(self, trace):
+        """Binds `trace` to the calling thread for the duration of the block."""
+        previous = self.current
+        self._local.trace = trace
+        try:
+            yield trace
+        finally:
+            self._local.trace = previous
+
+    def wrap(self, fn, hold=True):
+        """
+        `fn` bound to the calling thread's trace, to run on another thread.
+        With `hold` the trace stays open until `fn` returns; racers whose
+        result may be abandoned should pass hold=False.
+        """
+        trace = self.current
+        if trace is None:
+            return fn
+        if hold:
+            trace.hold()
+
+        def run(*args, **kwargs):
+            try:
+                with self.activate(trace):
+                    return fn(*args, **kwargs)
+            finally:
+                if hold:
+                    trace.release()
+        return run
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Times the block as a span of the current trace (a no-op span when nothing is traced)."""
+        trace = self.current
+        if trace is None:
+            yield _NULL_SPAN
+            return
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = next((s for t, s in reversed(stack) if t is trace), None)
+        span = Span(name, time.time(), parent_id=(parent or trace.root).span_id, attributes=attributes)
+        stack.append((trace, span))
+        try:
+            yield span
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.end = time.time()
+            stack.remove((trace, span))
+            with trace._lock:
+                if not trace.finished:
+                    trace.spans.append(span)
+
+    def event(self, name, **attributes):
+        trace = self.current
+        if trace is not None:
+            trace.event(name, **attributes)
+
+    def _finish(self, trace):
+        samples = [("total", trace.end - trace.origin)]
+        samples += [(span.name, span.duration) for span in trace.spans]
+        seen = set()
+        for name, at, _ in trace.events:
+            if name not in seen:
+                seen.add(name)
+                samples.append((f"to_{name}", at - trace.origin))
+        with self._lock:
+            self.finished += 1
+            self.recent.append(trace)
+            for stage, seconds in samples:
+                window = self._samples.get(stage)
+                if window is None:
+                    window = self._samples[stage] = deque(maxlen=self.window)
+                window.append(seconds)
+        self._export(trace)
+
+        reply = trace.first("first_audio")
+        if reply is not None:
+            stages = ", ".join(f"{s.name} {s.duration:.2f}" for s in trace.spans if s.name in ("stt", "brain", "tts"))
+            print(f"⏱️ [Trace] Answered {reply - trace.origin:.2f}s after the user stopped talking ({stages}).")
+
+    def _export(self, trace):
+        if not self.path:
+            return
+        line = json.dumps(trace.to_otlp() if self.fmt == "otlp" else trace.to_dict())
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._file = open(self.path, "a", buffering=1)
+                self._file.write(line + "\n")
+            except OSError as e:
+                print(f"⚠️ [Trace] Export to '{self.path}' failed: {e}")
+                self.path = None
+
+    def metrics(self):
+        """Per-stage latency percentiles (ms) over the last `window` interactions."""
+        with self._lock:
+            windows = {stage: sorted(values) for stage, values in self._samples.items()}
+        return {
+            "interactions": self.finished,
+            "stages": {
+                stage: {
+                    "count": len(values),
+                    "p50_ms": percentile(values, 50),
+                    "p95_ms": percentile(values, 95),
+                    "p99_ms": percentile(values, 99),
+                    "max_ms": round(values[-1] * 1000, 1),
+                }
+                for stage, values in sorted(windows.items()) if values
+            },
+        }
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of sorted seconds, in ms."""
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, math.ceil(q / 100.0 * len(values)) - 1))
+    return round(values[index] * 1000, 1)
+
+
+def _round(value):
+    return round(value, 6) if value is not None else None
+
+
+def _otlp_attributes(attributes):
+    def value(v):
+        if isinstance(v, bool):
+            return {"boolValue": v}
+        if isinstance(v, int):
+            return {"intValue": str(v)}
+        if isinstance(v, float):
+            return {"doubleValue": v}
+        return {"stringValue": str(v)}
+    return [{"key": key, "value": value(v)} for key, v in attributes.items() if v is not None]
+
+
+# Shared by every component of the app
+tracer = Tracer()
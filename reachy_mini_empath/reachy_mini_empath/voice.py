@@ -1,50 +1,372 @@
+import heapq
+import itertools
 import os
-import tempfile
+import queue
 import threading
-from gtts import gTTS
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .tts import create_tts, SpeechCache
+from .playback import create_output
+from .audio import PlaybackActivity
+from .tracing import tracer
+
+# Higher plays first and interrupts anything lower that is playing
+PRIORITY_CHATTER = 0 # Idle remarks; first to be dropped
+PRIORITY_REPLY = 5 # Answers to the user
+PRIORITY_URGENT = 10 # Must be heard: survives barge-in
+
+# Lines the robot says verbatim (loading notices, the brain's local fallback replies).
+# prewarm() synthesizes them at startup so they play with no synthesis latency.
+FIXED_PHRASES = (
+    "Brain loading...",
+    "My brain is still waking up...",
+    "Hello there! I'm operating on local power.",
+    "I'm doing well, staying resilient.",
+    "I can hear you, but my cloud brain is unreachable. Ask me a math question!",
+)
+
+
+class _Utterance:
+    """One queued line or streamed reply; `parts` yields synthesis futures, then None."""
+
+    __slots__ = ("text", "priority", "seq", "parts", "future", "cancel", "interrupted", "started", "trace")
+
+    def __init__(self, text, priority, seq, lookahead=2):
+        self.text = text
+        self.priority = priority
+        self.seq = seq
+        self.parts = queue.Queue(maxsize=lookahead) # Do not synthesize far ahead of playback
+        self.future = Future()
+        self.cancel = threading.Event()
+        self.interrupted = False
+        self.started = None # First audio out
+        self.trace = tracer.current # The interaction this line answers, held until it is done
+        if self.trace:
+            self.trace.hold()
+
+    def finish(self, completed):
+        if not self.future.done():
+            self.future.set_result(completed)
+        trace, self.trace = self.trace, None
+        if trace:
+            if self.started is not None:
+                trace.add_span("speech", self.started, time.time(), completed=completed, interrupted=self.interrupted)
+            trace.release()
+
+    def __lt__(self, other):
+        return (-self.priority, self.seq) < (-other.priority, other.seq)
+
 
 class EmpathVoice:
     """
     Professional Robot Voice module. 
     Handles speech synthesis with persona-consistent delivery.
+    Synthesis backends (EMPATH_TTS, e.g. gtts,piper,espeak) are tried in
+    order, audio stays in memory and goes straight to one audio output
+    (EMPATH_AUDIO_OUT), and every synthesized line is kept in a
+    content-addressed SpeechCache.
+    Speech is played by a single worker from a bounded priority queue
+    (EMPATH_VOICE_QUEUE): equal priorities play in order, a higher one
+    interrupts the line playing, and when the queue is full the oldest
+    lowest-priority line is dropped. `barge_in()` stops talking the moment
+    the user starts. `speak` and `speak_stream` return / resolve a Future
+    that is True when the line played to the end.
+    Everything played is reported to `activity` (a PlaybackActivity); hand it
+    to EmpathEar so the robot does not hear, and answer, itself.
     """
     
-    def __init__(self, use_system_afplay=True):
-        self.use_afplay = use_system_afplay
-        self._lock = threading.Lock()
+    def __init__(self, backends=None, output=None, cache=None, max_pending=None, activity=None):
+        self.backends = list(backends) if isinstance(backends, (list, tuple)) else create_tts(backends)
+        if not self.backends:
+            print("⚠️ [Voice] No TTS backend available. Replies will only be printed.")
+        self.output = output if output is not None and not isinstance(output, str) else create_output(output)
+        self.cache = cache or SpeechCache()
+        self.activity = activity or PlaybackActivity()
+        self.output.activity = self.activity
+        self.max_pending = int(max_pending or os.getenv("EMPATH_VOICE_QUEUE", 3))
+        self.synth_seconds = 0.0
+        self.synthesized = 0
 
-    def speak(self, text, emotion="neutral"):
+        self._queue = [] # heap of _Utterance
+        self._pending = [] # queued, not cancelled
+        self._current = None
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._closed = False
+        self.completed = 0
+        self.interrupted = 0
+        self.dropped = 0
+        self.barge_ins = 0
+        # Synthesis runs one line ahead of playback, in queue order
+        self._synth = ThreadPoolExecutor(max_workers=1)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def prewarm(self, phrases=FIXED_PHRASES, background=True):
+        """Synthesizes fixed lines into the cache ahead of time (in a background thread by default)."""
+        def run():
+            start = time.time()
+            ready = sum(1 for phrase in phrases if self.synthesize(phrase) is not None)
+            print(f"🔊 [Voice] Prewarmed {ready}/{len(phrases)} phrases in {time.time() - start:.1f}s.")
+        if background:
+            threading.Thread(target=run, daemon=True).start()
+        else:
+            run()
+
+    def synthesize(self, text):
+        """
+        Returns the Speech for `text`: from the cache when any backend already
+        rendered it, otherwise from the first backend that succeeds (None if all fail).
+        """
+        with tracer.span("tts", chars=len(text)) as span:
+            for backend in self.backends:
+                key = self.cache.key(backend.voice, text)
+                speech = self.cache.get(key)
+                if speech is not None:
+                    span.set(backend=backend.name, cached=True)
+                    return speech
+                start = time.time()
+                try:
+                    speech = backend.synthesize(text)
+                except Exception as e:
+                    print(f"⚠️ [Voice] Synthesis Error ({backend.name}): {e}")
+                    continue
+                self.synth_seconds += time.time() - start
+                self.synthesized += 1
+                self.cache.put(key, speech)
+                span.set(backend=backend.name, cached=False)
+                return speech
+            return None
+
+    def speak(self, text, emotion="neutral", priority=PRIORITY_REPLY):
         """
-        Thread-safe entry point for speech synthesis.
+        Queues `text` for playback and returns at once with a Future
+        (True when it played to the end, False if dropped or interrupted).
         """
         if not text:
-            return
+            return self._resolved(False)
             
+        utterance = self._enqueue(text, priority)
+        if utterance is None:
+            return self._resolved(False)
         print(f"🔊 [Voice] Speaking: '{text}'")
-        threading.Thread(target=self._synthesize_and_play, args=(text,), daemon=True).start()
+        utterance.parts.put(self._synth.submit(self._synthesize_unless_cancelled, text, utterance))
+        utterance.parts.put(None)
+        return utterance.future
+
+    def speak_stream(self, sentences, emotion="neutral", priority=PRIORITY_REPLY):
+        """
+        Pipelined speech for streamed replies.
+        Consumes `sentences` (any iterable, typically EmpathBrain.stream_query) in the
+        calling thread while synthesis and playback run behind it: sentence 1 is
+        playing while sentence 2 is synthesized and sentence 3 generated. The
+        whole reply is one queue entry, so nothing interleaves with it.
+        Blocks until the last sentence has played (or the reply was interrupted,
+        which also stops consuming `sentences`) and returns the text queued.
+        """
+        spoken = []
+        utterance = self._enqueue("", priority)
+        if utterance is None:
+            self._close_source(sentences)
+            return ""
+
+        try:
+            for sentence in sentences:
+                if utterance.cancel.is_set():
+                    break
+                if not sentence:
+                    continue
+                print(f"🔊 [Voice] Streaming: '{sentence}'")
+                spoken.append(sentence)
+                utterance.text = " ".join(spoken)
+                self._put_part(utterance, self._synth.submit(self._synthesize_unless_cancelled, sentence, utterance))
+        finally:
+            self._put_part(utterance, None)
+            if utterance.cancel.is_set():
+                self._close_source(sentences) # Barge-in: stop generating the rest of the reply
+
+        utterance.future.result()
+        return " ".join(spoken)
 
-    def _synthesize_and_play(self, text):
-        # We use a lock to prevent speech overlapping awkwardly
-        with self._lock:
+    def barge_in(self):
+        """
+        The user started talking: stop the line playing and drop queued ones.
+        PRIORITY_URGENT lines are kept. Returns True if anything was stopped.
+        """
+        with self._cond:
+            current = self._current
+            stopped = False
+            for utterance in list(self._pending):
+                if utterance.priority < PRIORITY_URGENT:
+                    self._discard(utterance)
+                    stopped = True
+            if current is not None and current.priority < PRIORITY_URGENT and not current.cancel.is_set():
+                current.interrupted = True
+                current.cancel.set()
+                stopped = True
+                if current.trace:
+                    current.trace.event("barge_in")
+            if stopped:
+                self.barge_ins += 1
+        if stopped:
+            print("✋ [Voice] Barge-in: user is talking, stopped speaking.")
+        return stopped
+
+    def cancel(self, pending_only=False):
+        """Drops every queued line and, unless `pending_only`, stops the one playing."""
+        with self._cond:
+            for utterance in list(self._pending):
+                self._discard(utterance)
+            if self._current is not None and not pending_only:
+                self._current.interrupted = True
+                self._current.cancel.set()
+
+    @property
+    def speaking(self):
+        return self._current is not None
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def stats(self):
+        current = self._current
+        return {
+            "backends": [b.name for b in self.backends],
+            "output": self.output.name,
+            "speaking": current is not None,
+            "current": current.text[:60] if current else None,
+            "pending": len(self._pending),
+            "completed": self.completed,
+            "interrupted": self.interrupted,
+            "dropped": self.dropped,
+            "barge_ins": self.barge_ins,
+            "synthesized": self.synthesized,
+            "mean_synth_ms": round(self.synth_seconds / self.synthesized * 1000, 1) if self.synthesized else None,
+            "cache": self.cache.stats(),
+        }
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+        self.cancel()
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=2)
+        self._synth.shutdown(wait=False)
+        self.output.close()
+
+    # --- Queue ---
+
+    def _enqueue(self, text, priority):
+        with self._cond:
+            if self._closed:
+                return None
+            if len(self._pending) >= self.max_pending:
+                lowest = min(self._pending, key=lambda u: (u.priority, u.seq))
+                if priority < lowest.priority:
+                    self.dropped += 1
+                    return None
+                self._discard(lowest)
+                self.dropped += 1
+            utterance = _Utterance(text, priority, next(self._seq))
+            heapq.heappush(self._queue, utterance)
+            self._pending.append(utterance)
+            current = self._current
+            if current is not None and priority > current.priority:
+                current.interrupted = True
+                current.cancel.set()
+            self._cond.notify()
+            return utterance
+
+    def _discard(self, utterance):
+        utterance.cancel.set()
+        self._pending.remove(utterance)
+        utterance.finish(False)
+
+    def _resolved(self, value):
+        future = Future()
+        future.set_result(value)
+        return future
+
+    def _put_part(self, utterance, part):
+        # Blocks while the reply is far enough ahead of playback, but never past a cancel
+        while True:
             try:
-                # 1. Synthesize using high-quality Google TTS (Fallback to local if needed)
-                tts = gTTS(text=text, lang='en', tld='co.uk', slow=False) # British accent for professional 'Tadashi' feel
-                
-                with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
-                    temp_path = tmp.name
-                    tts.save(temp_path)
-                
-                # 2. Playback based on OS
-                if self.use_afplay:
-                    # macOS high-fidelity playback
-                    os.system(f"afplay {temp_path}")
-                else:
-                    # Generic Linux/Other playback could go here (e.g. mpg123 or play)
-                    pass
-                
-                # 3. Cleanup
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
-                    
+                utterance.parts.put(part, timeout=0.1)
+                return
+            except queue.Full:
+                if utterance.cancel.is_set():
+                    return
+
+    @staticmethod
+    def _close_source(sentences):
+        close = getattr(sentences, "close", None)
+        if close is not None:
+            close()
+
+    def _next_utterance(self):
+        with self._cond:
+            while True:
+                while self._queue and self._queue[0].cancel.is_set():
+                    heapq.heappop(self._queue) # Dropped or cancelled
+                if self._queue:
+                    utterance = heapq.heappop(self._queue)
+                    self._pending.remove(utterance)
+                    self._current = utterance
+                    return utterance
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _run(self):
+        while True:
+            utterance = self._next_utterance()
+            if utterance is None:
+                return
+            completed = False
+            try:
+                # Nothing audible (source failed before its first sentence, all synthesis failed) is not a completed line
+                completed = self._play_utterance(utterance) and utterance.started is not None
             except Exception as e:
-                print(f"⚠️ [Voice] Synthesis Error: {e}")
+                print(f"⚠️ [Voice] Playback Error: {e}")
+            finally:
+                with self._cond:
+                    self._current = None
+                    if completed:
+                        self.completed += 1
+                    elif utterance.interrupted:
+                        self.interrupted += 1
+                utterance.finish(completed)
+
+    def _play_utterance(self, utterance):
+        cancel = utterance.cancel
+        while True:
+            try:
+                part = utterance.parts.get(timeout=0.1)
+            except queue.Empty:
+                if cancel.is_set():
+                    return False
+                continue
+            if part is None:
+                return not cancel.is_set()
+            while not part.done():
+                if cancel.wait(0.02):
+                    return False
+            speech = part.result()
+            if speech is None:
+                continue
+            if utterance.started is None:
+                utterance.started = time.time()
+                if utterance.trace:
+                    utterance.trace.event("first_audio", at=utterance.started)
+            if not self.output.play(speech, cancel=cancel):
+                self.activity.cut() # Whatever was queued ahead of the speaker is not heard
+                return False
+
+    def _synthesize_unless_cancelled(self, text, utterance):
+        if utterance.cancel.is_set():
+            return None
+        with tracer.activate(utterance.trace):
+            return self.synthesize(text)
@@ -1,20 +1,18 @@
-import os
-import tempfile
-from gtts import gTTS
+from empath.voice import EmpathVoice
 
 def test_voice():
     print("Testing Voice Synthesis and Playback...")
     text = "Hello Reachy, I am testing your voice system. Can you hear me?"
     try:
-        tts = gTTS(text=text, lang='en', tld='co.uk')
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
-            temp_path = tmp.name
-            tts.save(temp_path)
-            print(f"File saved to {temp_path}. Playing now...")
-            # Using absolute path for afplay
-            os.system(f"afplay {temp_path}")
-            os.remove(temp_path)
-            print("Playback finished.")
+        # Same pipeline as the robot: EMPATH_TTS backends -> in-memory audio -> EMPATH_AUDIO_OUT
+        voice = EmpathVoice()
+        speech = voice.synthesize(text)
+        if speech is None:
+            print("Voice Test Failed: no TTS backend could synthesize the text.")
+            return
+        print(f"Synthesized {speech.duration:.1f}s of audio. Playing now through '{voice.output.name}'...")
+        voice.output.play(speech)
+        print("Playback finished.")
     except Exception as e:
         print(f"Voice Test Failed: {e}")
 
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from empath.audio import PlaybackActivity, EchoSuppressor, rms
+
+RATE = 16000
+CHUNK = 0.1 # Seconds per captured chunk
+
+
+def tone(amplitude, seconds=CHUNK, rate=RATE):
+    """Square wave whose RMS is `amplitude`, as 16-bit samples."""
+    samples = np.full(int(seconds * rate), amplitude, dtype=np.int16)
+    samples[::2] *= -1
+    return samples
+
+
+def capture(amplitude, seconds=CHUNK):
+    return tone(amplitude, seconds).tobytes()
+
+
+@pytest.fixture
+def activity():
+    return PlaybackActivity(tail=0.3)
+
+
+def test_rms():
+    assert rms(b"") == 0.0
+    assert rms(capture(1000)) == pytest.approx(1000)
+
+
+def test_chunks_are_laid_end_to_end(activity):
+    activity.note(tone(4000, 1.0), RATE, at=10.0)
+    activity.note(tone(2000, 1.0), RATE, at=10.1) # Queued behind the first second
+    assert activity.level(at=10.5) == pytest.approx(4000)
+    assert activity.level(at=11.5) == pytest.approx(2000)
+    assert activity.level(at=12.2) == pytest.approx(2000) # Tail
+    assert activity.level(at=12.4) == 0.0
+    assert activity.overlap(10.0, 12.0, tail=0.0) == pytest.approx(2.0)
+    assert activity.overlap(9.0, 20.0) == pytest.approx(2.3)
+
+
+def test_cut_forgets_unplayed_audio(activity):
+    activity.note(tone(4000, 1.0), RATE, at=10.0)
+    activity.note(tone(2000, 1.0), RATE, at=10.0)
+    activity.cut(at=10.5)
+    assert activity.overlap(10.0, 20.0, tail=0.0) == pytest.approx(0.5)
+    assert activity.level(at=11.5) == 0.0
+
+
+def test_silence_is_never_echo(activity):
+    echo = EchoSuppressor(activity, margin=2.0, coupling=0.5)
+    assert echo.observe(capture(100), base=300, at=5.0) is False
+    assert echo.threshold(300, at=5.0) == 300
+    assert not echo.is_echo(4.0, 6.0)
+
+
+def test_robot_voice_is_echo(activity):
+    echo = EchoSuppressor(activity, margin=2.0, coupling=0.5)
+    activity.note(tone(4000, 2.0), RATE, at=10.0)
+    assert echo.threshold(300, at=10.5) == pytest.approx(4000)
+    for i in range(1, 11):
+        assert echo.observe(capture(1500), base=300, at=10.0 + i * CHUNK) is True
+    assert echo.is_echo(10.0, 11.0)
+    assert echo.stats()["echo_chunks"] == 10
+
+
+def test_user_talking_over_the_robot_is_not_echo(activity):
+    echo = EchoSuppressor(activity, margin=2.0, coupling=0.5)
+    activity.note(tone(4000, 2.0), RATE, at=10.0)
+    voiced = [echo.observe(capture(9000), base=300, at=10.0 + i * CHUNK) for i in range(1, 6)]
+    assert voiced == [False] * 5
+    assert not echo.is_echo(10.0, 10.6)
+
+
+def test_coupling_learns_the_room(activity):
+    echo = EchoSuppressor(activity, margin=2.0, coupling=0.5)
+    activity.note(tone(4000, 5.0), RATE, at=10.0)
+    for i in range(1, 31):
+        echo.observe(capture(400), base=300, at=10.0 + i * CHUNK) # Echo at 0.1x the reference
+    assert echo.coupling == pytest.approx(0.1, abs=0.01)
+    # A quieter user than the default coupling allowed now gets through
+    assert echo.observe(capture(2000), base=300, at=13.5) is False
+
+
+def test_coupling_ignores_the_playback_tail(activity):
+    echo = EchoSuppressor(activity, margin=2.0, coupling=0.5)
+    activity.note(tone(4000, 1.0), RATE, at=10.0)
+    for i in range(1, 4):
+        echo.observe(capture(0), base=300, at=11.0 + i * CHUNK) # Speaker done, room is silent
+    assert echo.coupling == 0.5
+
+
+def test_coupling_ignores_the_first_partial_chunk(activity):
+    echo = EchoSuppressor(activity, margin=2.0, coupling=0.5)
+    activity.note(tone(4000, 1.0), RATE, at=10.05)
+    echo.observe(capture(0), base=300, at=10.1) # Line started half way through this chunk
+    assert echo.coupling == 0.5
@@ -0,0 +1,107 @@
+import pytest
+
+from empath.emotion_state import EmotionStateTracker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def feed(tracker, label, frames, face_detected=True):
+    """Feeds `frames` identical frames and returns the gestures issued."""
+    gestures = [tracker.update(label, face_detected) for _ in range(frames)]
+    return [g for g in gestures if g]
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def make_tracker(clock, **kwargs):
+    options = dict(mode="vote", window=10, cooldown=8.0, clock=clock)
+    options.update(kwargs)
+    return EmotionStateTracker(**options)
+
+
+def test_switches_once_enter_share_is_reached(clock):
+    tracker = make_tracker(clock)
+    assert feed(tracker, "happy", 5) == []
+    assert tracker.update("happy") == "happy" # 6/10 frames
+    assert tracker.state == "happy"
+    assert feed(tracker, "happy", 10) == [] # Staying happy is not a new transition
+
+
+def test_flicker_does_not_switch(clock):
+    tracker = make_tracker(clock)
+    for _ in range(20):
+        assert tracker.update("happy") is None
+        assert tracker.update("sad") is None
+    assert tracker.state == "neutral"
+    assert tracker.stats()["transitions"] == 0
+
+
+def test_hysteresis_holds_state_until_exit(clock):
+    tracker = make_tracker(clock)
+    feed(tracker, "happy", 10)
+    feed(tracker, "neutral", 6) # Happy still at 4/10, above exit
+    assert tracker.state == "happy"
+    tracker.update("neutral") # 3/10, below exit; neutral at 7/10
+    assert tracker.state == "neutral"
+
+
+def test_missing_face_counts_as_neutral(clock):
+    tracker = make_tracker(clock)
+    assert feed(tracker, "happy", 10, face_detected=False) == []
+    assert feed(tracker, None, 10) == []
+    assert tracker.state == "neutral"
+
+
+def test_label_mapped_to_gesture(clock):
+    tracker = make_tracker(clock)
+    assert feed(tracker, "surprise", 6) == ["surprised"]
+    assert feed(tracker, "fear", 10) == ["bashful"]
+
+
+def test_unmapped_labels_switch_silently(clock):
+    tracker = make_tracker(clock, gestures={"happy": "happy"})
+    assert feed(tracker, "sad", 10) == []
+    assert tracker.state == "sad"
+
+
+def test_cooldown_suppresses_repeat_gestures(clock):
+    tracker = make_tracker(clock)
+    assert feed(tracker, "happy", 10) == ["happy"]
+    feed(tracker, "neutral", 10)
+    clock.now = 5.0
+    assert feed(tracker, "happy", 10) == []
+    assert tracker.state == "happy"
+    assert tracker.stats()["suppressed"] == 1
+    feed(tracker, "neutral", 10)
+    clock.now = 20.0
+    assert feed(tracker, "happy", 10) == ["happy"]
+
+
+def test_ema_mode(clock):
+    tracker = make_tracker(clock, mode="ema", alpha=0.25)
+    gestures = feed(tracker, "angry", 3)
+    assert gestures == [] # 1 - 0.75**3 = 0.58, below enter
+    assert tracker.update("angry") == "angry"
+    assert tracker.scores()["angry"] == pytest.approx(1 - 0.75 ** 4)
+
+
+def test_reset(clock):
+    tracker = make_tracker(clock)
+    feed(tracker, "happy", 10)
+    tracker.reset()
+    assert tracker.state == "neutral"
+    assert tracker.scores() == {}
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        EmotionStateTracker(mode="median")
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from empath.face_detectors import Detection
+from empath.face_tracker import FaceTracker, Track, box_iou
+
+WIDTH, HEIGHT = 320, 240
+
+
+class ScriptedDetector:
+    """Returns the boxes it is told to, and counts full-frame calls."""
+
+    def __init__(self):
+        self.boxes = []
+        self.calls = 0
+
+    def detect(self, frame):
+        self.calls += 1
+        return [Detection(*box) for box in self.boxes]
+
+
+def blank():
+    return np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+def textured(x, y, size=60, seed=7):
+    """A frame with a noisy square at (x, y) that optical flow can follow."""
+    frame = blank()
+    patch = np.random.default_rng(seed).integers(0, 255, (size, size, 3), dtype=np.uint8)
+    frame[y:y + size, x:x + size] = patch
+    return frame
+
+
+@pytest.fixture
+def detector():
+    return ScriptedDetector()
+
+
+def test_box_iou():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (20, 20, 10, 10)) == 0.0
+    assert box_iou((0, 0, 10, 10), (5, 0, 10, 10)) == pytest.approx(50 / 150)
+
+
+def test_track_is_clipped_to_the_frame():
+    track = Track(1, (-10, 200, 50, 60))
+    assert track.move_to((-10, 200, 50, 60), (WIDTH, HEIGHT))
+    assert track.box == (0, 200, 40, 40)
+    assert not track.move_to((WIDTH - 2, 10, 50, 50), (WIDTH, HEIGHT)) # 2 px left
+    assert track.box == (0, 200, 40, 40)
+
+
+def test_ids_persist_across_detections(detector):
+    tracker = FaceTracker(detector, mode="off")
+    detector.boxes = [(10, 10, 50, 50), (200, 100, 60, 60)]
+    first = {t.id: t.box for t in tracker.update(blank())}
+    detector.boxes = [(205, 104, 60, 60), (14, 12, 50, 50)] # Moved a little, listed in another order
+    second = {t.id: t.box for t in tracker.update(blank())}
+    assert set(first) == set(second) == {1, 2}
+    assert second[1] == (14, 12, 50, 50)
+    assert second[2] == (205, 104, 60, 60)
+
+
+def test_lost_face_is_kept_for_max_misses(detector):
+    tracker = FaceTracker(detector, mode="off", max_misses=2)
+    detector.boxes = [(10, 10, 50, 50)]
+    tracker.update(blank())
+    detector.boxes = []
+    assert tracker.update(blank()) == []
+    assert tracker.update(blank()) == []
+    detector.boxes = [(12, 10, 50, 50)]
+    assert [t.id for t in tracker.update(blank())] == [1] # Came back within max_misses
+    detector.boxes = []
+    for _ in range(3):
+        tracker.update(blank())
+    detector.boxes = [(12, 10, 50, 50)]
+    assert [t.id for t in tracker.update(blank())] == [2] # Gone for good, new ID
+
+
+def test_flow_follows_between_detections(detector):
+    tracker = FaceTracker(detector, mode="flow", detect_every=10)
+    detector.boxes = [(100, 80, 60, 60)]
+    tracker.update(textured(100, 80))
+    for step in range(1, 6):
+        (track,) = tracker.update(textured(100 + 3 * step, 80 + 2 * step))
+    assert detector.calls == 1
+    assert track.id == 1
+    assert abs(track.x - 115) <= 3 and abs(track.y - 90) <= 3 # Boxes are whole pixels, so sub-pixel steps round off
+    assert tracker.stats()["tracked_frames"] == 5
+
+
+def test_full_detection_every_n_frames(detector):
+    tracker = FaceTracker(detector, mode="flow", detect_every=3)
+    detector.boxes = [(100, 80, 60, 60)]
+    for _ in range(7):
+        tracker.update(textured(100, 80))
+    assert detector.calls == 3 # Frames 1, 4 and 7
+
+
+def test_lost_flow_triggers_detection_on_the_same_frame(detector):
+    tracker = FaceTracker(detector, mode="flow", detect_every=10)
+    detector.boxes = [(100, 80, 60, 60)]
+    tracker.update(textured(100, 80))
+    detector.boxes = []
+    assert tracker.update(blank()) == [] # Nothing left to follow
+    assert detector.calls == 2
+    assert tracker.stats()["losses"] == 1
+
+
+def test_unknown_mode(detector):
+    with pytest.raises(ValueError):
+        FaceTracker(detector, mode="magic")
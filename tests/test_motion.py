@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from empath.motion import MotionScheduler, PRIORITY_IDLE, PRIORITY_REACTION, PRIORITY_CONVERSATION
+
+TIMEOUT = 2.0
+
+
+class Gesture:
+    """A gesture that plays until released (or cancelled) and records that it ran."""
+
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, cancel):
+        self.log.append(self.name)
+        self.started.set()
+        while not self.release.is_set() and not cancel.wait(0.01):
+            pass
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = MotionScheduler(max_pending=2)
+    yield scheduler
+    scheduler.shutdown()
+
+
+def test_gesture_completes(scheduler):
+    log = []
+    gesture = Gesture("nod", log)
+    gesture.release.set()
+    assert scheduler.submit("nod", gesture).result(TIMEOUT) is True
+    assert scheduler.stats()["completed"] == 1
+
+
+def test_duplicate_gestures_coalesce(scheduler):
+    log = []
+    blocker = Gesture("think", log)
+    first = scheduler.submit("think", blocker)
+    blocker.started.wait(TIMEOUT)
+    happy = Gesture("happy", log)
+    futures = [scheduler.submit("happy", happy) for _ in range(3)]
+    assert futures[0] is futures[1] is futures[2]
+    assert scheduler.submit("think", blocker) is first # Already playing
+    happy.release.set()
+    blocker.release.set()
+    assert futures[0].result(TIMEOUT) is True
+    assert log == ["think", "happy"]
+    assert scheduler.stats()["coalesced"] == 3
+
+
+def test_higher_priority_preempts(scheduler):
+    log = []
+    idle = Gesture("look_around", log)
+    idle_future = scheduler.submit("look_around", idle, priority=PRIORITY_IDLE)
+    idle.started.wait(TIMEOUT)
+    answer = Gesture("nod", log)
+    answer.release.set()
+    answer_future = scheduler.submit("nod", answer, priority=PRIORITY_CONVERSATION)
+    assert idle_future.result(TIMEOUT) is False
+    assert answer_future.result(TIMEOUT) is True
+    assert scheduler.stats()["preempted"] == 1
+
+
+def test_queue_runs_by_priority(scheduler):
+    log = []
+    blocker = Gesture("think", log)
+    scheduler.submit("think", blocker, priority=PRIORITY_CONVERSATION)
+    blocker.started.wait(TIMEOUT)
+    low, high = Gesture("sway", log), Gesture("wiggle", log)
+    low.release.set()
+    high.release.set()
+    low_future = scheduler.submit("sway", low, priority=PRIORITY_IDLE)
+    high_future = scheduler.submit("wiggle", high, priority=PRIORITY_REACTION)
+    blocker.release.set()
+    assert high_future.result(TIMEOUT) and low_future.result(TIMEOUT)
+    assert log == ["think", "wiggle", "sway"]
+
+
+def test_bounded_queue_drops_lowest(scheduler):
+    log = []
+    blocker = Gesture("think", log)
+    scheduler.submit("think", blocker, priority=PRIORITY_CONVERSATION)
+    blocker.started.wait(TIMEOUT)
+    sway = scheduler.submit("sway", Gesture("sway", log), priority=PRIORITY_IDLE)
+    scheduler.submit("wiggle", Gesture("wiggle", log), priority=PRIORITY_REACTION)
+    scheduler.submit("nod", Gesture("nod", log), priority=PRIORITY_REACTION) # Queue full: "sway" goes
+    assert sway.result(TIMEOUT) is False
+    assert scheduler.submit("blink", Gesture("blink", log), priority=PRIORITY_IDLE).result(TIMEOUT) is False
+    assert scheduler.stats()["dropped"] == 2
+    assert scheduler.pending == 2
+
+
+def test_cancel_by_name(scheduler):
+    log = []
+    blocker = Gesture("think", log)
+    playing = scheduler.submit("think", blocker)
+    blocker.started.wait(TIMEOUT)
+    queued = scheduler.submit("nod", Gesture("nod", log))
+    scheduler.cancel("nod")
+    assert queued.result(TIMEOUT) is False
+    assert scheduler.busy
+    scheduler.cancel()
+    assert playing.result(TIMEOUT) is False
+    assert log == ["think"]
+
+
+def test_failing_gesture_does_not_stop_the_executor(scheduler):
+    def broken(cancel):
+        raise RuntimeError("servo")
+
+    assert scheduler.submit("broken", broken).result(TIMEOUT) is False
+    assert scheduler.submit("nod", lambda cancel: None).result(TIMEOUT) is True
+
+
+def test_submit_after_shutdown():
+    scheduler = MotionScheduler()
+    scheduler.shutdown()
+    assert scheduler.submit("nod", lambda cancel: None).result(TIMEOUT) is False
@@ -0,0 +1,93 @@
+import pytest
+
+from empath.resilience import CircuitBreaker, BackendUnavailable
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("empath.resilience.time.monotonic", lambda: now[0])
+    monkeypatch.setattr("empath.resilience.random.uniform", lambda low, high: 1.0) # No jitter
+    return now
+
+
+def fail(breaker, times=1):
+    for _ in range(times):
+        assert breaker.allow()
+        breaker.record_failure(0.1, RuntimeError("boom"))
+
+
+def test_opens_after_threshold(clock):
+    breaker = CircuitBreaker("gemini", failure_threshold=3, base_backoff=5.0)
+    fail(breaker, 2)
+    assert breaker.state == CircuitBreaker.CLOSED
+    fail(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["retry_in_s"] == 5.0
+    assert breaker.stats()["last_error"] == "boom"
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("gemini", failure_threshold=3)
+    fail(breaker, 2)
+    breaker.record_success(0.1)
+    fail(breaker, 2)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker("gemini", failure_threshold=1, base_backoff=5.0)
+    fail(breaker)
+    clock[0] += 5.0
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow() # Probe already in flight
+    breaker.record_success(0.2)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_doubles_backoff(clock):
+    breaker = CircuitBreaker("gemini", failure_threshold=1, base_backoff=5.0, max_backoff=12.0)
+    fail(breaker)
+    clock[0] += 5.0
+    fail(breaker) # Probe fails
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["retry_in_s"] == 10.0
+    clock[0] += 10.0
+    fail(breaker)
+    assert breaker.stats()["retry_in_s"] == 12.0 # Capped
+
+
+def test_abandon_frees_probe_without_recording(clock):
+    breaker = CircuitBreaker("gemini", failure_threshold=1, base_backoff=5.0)
+    fail(breaker)
+    clock[0] += 5.0
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.stats()["calls"] == 1
+    assert breaker.allow() # Slot is free for the next probe
+
+
+def test_call_records_outcome(clock):
+    def broken():
+        raise ValueError("bad")
+
+    breaker = CircuitBreaker("hf", failure_threshold=2)
+    assert breaker.call(lambda x: x * 2, 21) == 42
+    with pytest.raises(ValueError):
+        breaker.call(broken)
+    assert breaker.stats()["calls"] == 2
+    assert breaker.stats()["failures"] == 1
+
+
+def test_call_rejects_when_open(clock):
+    breaker = CircuitBreaker("hf", failure_threshold=1)
+    fail(breaker)
+    called = []
+    with pytest.raises(BackendUnavailable):
+        breaker.call(called.append, 1)
+    assert called == []
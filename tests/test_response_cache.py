@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from empath.response_cache import ResponseCache, normalize_text, context_digest
+
+
+def make_cache(**kwargs):
+    options = dict(ttl=60, max_entries=8, path="", bypass_visual=True, save_interval=0)
+    options.update(kwargs)
+    return ResponseCache(**options)
+
+
+def test_normalize_text():
+    assert normalize_text("  Hello,   Reachy!! ") == "hello reachy"
+    assert normalize_text("What's up?") == "what's up"
+
+
+def test_context_digest_is_stable():
+    assert context_digest(None) is None
+    assert context_digest({}) is None
+    assert context_digest({"b": 1, "a": 2}) == context_digest({"a": 2, "b": 1})
+    assert context_digest({"a": 1}) != context_digest({"a": 2})
+
+
+def test_hit_after_put():
+    cache = make_cache()
+    key = cache.make_key("Hello, Reachy!", "happy")
+    assert cache.get(key) is None
+    cache.put(key, "Hi there!")
+    assert cache.get(cache.make_key("hello reachy", "happy")) == "Hi there!"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_depends_on_emotion_and_context():
+    cache = make_cache()
+    cache.put(cache.make_key("how are you", "happy"), "Great!")
+    assert cache.get(cache.make_key("how are you", "sad")) is None
+    assert cache.get(cache.make_key("how are you", "happy", context=context_digest({"people": 2}))) is None
+
+
+def test_volatile_and_visual_queries_bypass():
+    cache = make_cache()
+    assert cache.make_key("what time is it") is None
+    assert cache.make_key("what am I holding", scene_hash=0xABC) is None
+    assert cache.make_key("") is None
+    assert cache.stats()["bypassed"] == 3
+
+
+def test_visual_queries_keyed_on_scene_without_bypass():
+    cache = make_cache(bypass_visual=False)
+    key = cache.make_key("what am I holding", scene_hash=0xABC)
+    cache.put(key, "A red cup.")
+    assert cache.get(cache.make_key("what am I holding", scene_hash=0xABC)) == "A red cup."
+    assert cache.get(cache.make_key("what am I holding", scene_hash=0xDEF)) is None
+    assert cache.make_key("what am I holding") is None # No scene, no key
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("empath.response_cache.time.time", lambda: now[0])
+    cache = make_cache(ttl=10)
+    key = cache.make_key("hello")
+    cache.put(key, "Hi!")
+    now[0] += 9
+    assert cache.get(key) == "Hi!"
+    now[0] += 2
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_lru_eviction():
+    cache = make_cache(max_entries=2)
+    a, b, c = (cache.make_key(text) for text in ("one", "two", "three"))
+    cache.put(a, "1")
+    cache.put(b, "2")
+    cache.get(a) # "one" is now the most recently used
+    cache.put(c, "3")
+    assert cache.get(b) is None
+    assert cache.get(a) == "1"
+    assert cache.get(c) == "3"
+
+
+def test_disabled_cache_has_no_keys():
+    assert make_cache(max_entries=0).make_key("hello") is None
+    assert make_cache(ttl=0).make_key("hello") is None
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = make_cache(path=path)
+    cache.put(cache.make_key("hello"), "Hi!")
+    assert json.loads(open(path).read())[0][2] == "Hi!"
+    assert make_cache(path=path).get(cache.make_key("hello")) == "Hi!"
+
+
+def test_timed_save_is_written_on_close(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = make_cache(path=str(path), save_interval=3600)
+    cache.put(cache.make_key("hello"), "Hi!")
+    assert not path.exists() # Batched, not written per reply
+    cache.close()
+    assert json.loads(path.read_text())[0][2] == "Hi!"
+    assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
+
+
+def test_corrupt_file_is_ignored(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+    assert make_cache(path=str(path)).stats()["entries"] == 0
+
+
+@pytest.mark.parametrize("empty", [None, ""])
+def test_empty_responses_are_not_cached(empty):
+    cache = make_cache()
+    key = cache.make_key("hello")
+    cache.put(key, empty)
+    assert cache.get(key) is None
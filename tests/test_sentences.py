@@ -0,0 +1,48 @@
+from empath.sentences import SentenceSplitter, split_sentences
+
+
+def test_split_sentences():
+    assert split_sentences("Hello there, friend. How are you today? I am fine!") == [
+        "Hello there, friend.", "How are you today?", "I am fine!",
+    ]
+
+
+def test_sentence_waits_for_following_whitespace():
+    splitter = SentenceSplitter()
+    assert splitter.feed("Hello the") == []
+    assert splitter.feed("re, friend.") == [] # Could still be "friend.com" or "friend..."
+    assert splitter.feed(" How are") == ["Hello there, friend."]
+    assert splitter.feed(" you today?") == []
+    assert splitter.feed(" Fine") == ["How are you today?"]
+    assert splitter.flush() == ["Fine"]
+    assert splitter.flush() == []
+
+
+def test_abbreviations_do_not_end_sentences():
+    assert split_sentences("Dr. Who is here with Mrs. Smith today. No. 5 is the best one.") == [
+        "Dr. Who is here with Mrs. Smith today.", "No. 5 is the best one.",
+    ]
+
+
+def test_initials_and_decimals_do_not_end_sentences():
+    assert split_sentences("J. R. R. Tolkien wrote it. It costs 3.5 dollars today.") == [
+        "J. R. R. Tolkien wrote it.", "It costs 3.5 dollars today.",
+    ]
+
+
+def test_short_fragments_merge_forward():
+    assert split_sentences("Oh. That is great news!") == ["Oh. That is great news!"]
+    assert split_sentences("Oh. Great!", min_chars=1) == ["Oh.", "Great!"]
+
+
+def test_closing_quotes_and_newlines():
+    assert split_sentences('She said "hello there!" Then she left the room.\nBye for now.') == [
+        'She said "hello there!"', "Then she left the room.", "Bye for now.",
+    ]
+
+
+def test_empty_input():
+    splitter = SentenceSplitter()
+    assert splitter.feed("") == []
+    assert splitter.feed(None) == []
+    assert splitter.flush() == []
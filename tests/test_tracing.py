@@ -0,0 +1,134 @@
+import json
+import threading
+
+import pytest
+
+from empath.tracing import Tracer, percentile
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(enabled=True)
+
+
+def test_no_trace_is_a_no_op(tracer):
+    assert tracer.current is None
+    with tracer.span("stt") as span:
+        span.set(words=3)
+    tracer.event("first_audio")
+    assert tracer.finished == 0
+
+
+def test_disabled_tracer_begins_nothing():
+    assert Tracer(enabled=False).begin() is None
+
+
+def test_nested_spans_and_events(tracer):
+    trace = tracer.begin("interaction", start=100.0, origin=100.0, text="hi")
+    with tracer.activate(trace):
+        with tracer.span("brain") as brain:
+            with tracer.span("brain.gemini", tier="gemini"):
+                pass
+        tracer.event("first_audio", at=101.5)
+    assert tracer.current is None
+    trace.release()
+
+    assert trace.finished
+    gemini = next(s for s in trace.spans if s.name == "brain.gemini")
+    assert gemini.parent_id == brain.span_id
+    assert brain.parent_id == trace.root.span_id
+    assert gemini.attributes == {"tier": "gemini"}
+    assert trace.first("first_audio") == 101.5
+    assert tracer.recent[-1] is trace
+
+
+def test_span_records_errors(tracer):
+    trace = tracer.begin()
+    with tracer.activate(trace):
+        with pytest.raises(ValueError):
+            with tracer.span("tts"):
+                raise ValueError("no voice")
+    (span,) = trace.spans
+    assert span.attributes["error"] == "ValueError: no voice"
+    assert span.end is not None
+
+
+def test_trace_finishes_when_last_holder_releases(tracer):
+    trace = tracer.begin()
+    trace.hold() # e.g. the voice, still speaking
+    trace.release()
+    assert not trace.finished
+    trace.release()
+    assert trace.finished
+    assert tracer.finished == 1
+    trace.event("late")
+    trace.add_span("late", 0.0, 1.0)
+    assert trace.events == [] and trace.spans == []
+
+
+def test_wrap_carries_the_trace_to_another_thread(tracer):
+    trace = tracer.begin()
+    seen = []
+    with tracer.activate(trace):
+        work = tracer.wrap(lambda: seen.append(tracer.current))
+    trace.release()
+    assert not trace.finished # Held by the wrapped call
+    thread = threading.Thread(target=work)
+    thread.start()
+    thread.join()
+    assert seen == [trace]
+    assert trace.finished
+
+
+def test_wrap_without_hold(tracer):
+    trace = tracer.begin()
+    with tracer.activate(trace):
+        work = tracer.wrap(lambda: None, hold=False)
+    trace.release()
+    assert trace.finished
+    assert tracer.wrap(len) is len # Nothing bound: returned as is
+
+
+def test_metrics(tracer):
+    for delay in (0.5, 1.0, 2.0):
+        trace = tracer.begin(start=0.0, origin=0.0)
+        trace.add_span("stt", 0.0, delay / 2)
+        trace.event("first_audio", at=delay)
+        trace.release()
+    metrics = tracer.metrics()
+    assert metrics["interactions"] == 3
+    assert metrics["stages"]["to_first_audio"]["p50_ms"] == 1000.0
+    assert metrics["stages"]["to_first_audio"]["max_ms"] == 2000.0
+    assert metrics["stages"]["stt"]["count"] == 3
+
+
+def test_percentile():
+    assert percentile([], 50) is None
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "otlp"])
+def test_export(tmp_path, fmt):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(path=str(path), fmt=fmt, enabled=True)
+    trace = tracer.begin(origin=0.0, user="alice")
+    with tracer.activate(trace):
+        with tracer.span("stt"):
+            pass
+    trace.release()
+    tracer.close()
+
+    (line,) = path.read_text().splitlines()
+    exported = json.loads(line)
+    if fmt == "jsonl":
+        assert exported["trace_id"] == trace.trace_id
+        assert [s["name"] for s in exported["spans"]] == ["stt"]
+        assert exported["attributes"] == {"user": "alice"}
+    else:
+        spans = exported["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert [s["name"] for s in spans] == ["interaction", "stt"]
+        assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+        assert {"key": "user", "value": {"stringValue": "alice"}} in spans[0]["attributes"]
@@ -0,0 +1,113 @@
+import pytest
+
+from empath.wake_words import WakeWordEngine, EngagementGate, metaphone
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.delenv("EMPATH_WAKE_PHRASES", raising=False)
+    return WakeWordEngine(phonetic="metaphone")
+
+
+@pytest.mark.parametrize("text, phrase", [
+    ("Hey Reachy, how are you?", "hey reachy"),
+    ("reachy", "reachy"),
+    ("hey richie", "hey richie"),
+    ("Hi", "hi"),
+])
+def test_exact_match(engine, text, phrase):
+    match = engine.match(text)
+    assert match.phrase == phrase
+    assert match.method == "exact"
+    assert match.score == 1.0
+
+
+def test_longest_exact_phrase_wins(engine):
+    assert engine.match("well hey reachy").phrase == "hey reachy"
+
+
+@pytest.mark.parametrize("text, phrase", [
+    ("reachie", "reachy"),
+    ("jarvas", "jarvis"),
+    ("can you heer me", "can you hear"),
+])
+def test_phonetic_match(engine, text, phrase):
+    match = engine.match(text)
+    assert match.phrase == phrase
+    assert match.method == "phonetic"
+
+
+def test_fuzzy_match(engine):
+    match = engine.match("okay tadashe listen")
+    assert match.phrase == "tadashi"
+    assert match.method == "fuzzy"
+    assert 0.85 <= match.score < 1.0
+    assert match.start == 1
+
+
+@pytest.mark.parametrize("text", [
+    "reach the top shelf",
+    "i'm reaching for the remote",
+    "reach",
+    "this is nice",
+    "they said high",
+    "",
+])
+def test_near_misses_do_not_wake(engine, text):
+    assert engine.match(text) is None
+    assert not engine.is_wake(text)
+
+
+def test_reachy_and_reach_have_different_keys():
+    assert metaphone("reachy") == metaphone("richie") == metaphone("ritchie")
+    assert metaphone("reach") != metaphone("reachy")
+
+
+def test_custom_phrases_replace_defaults():
+    engine = WakeWordEngine(phrases={"computer": 0.8}, phonetic="metaphone")
+    assert engine.match("hey computer").phrase == "computer"
+    assert engine.match("hey reachy") is None
+
+
+def test_phrases_file(tmp_path, monkeypatch):
+    path = tmp_path / "phrases.json"
+    path.write_text('{"good morning robot": 0.8}')
+    monkeypatch.setenv("EMPATH_WAKE_PHRASES", str(path))
+    engine = WakeWordEngine(phonetic="metaphone")
+    assert engine.is_wake("good morning robot")
+    assert not engine.is_wake("hey reachy")
+
+
+def test_gate_starts_engaged(engine):
+    gate = EngagementGate(engine, window=300.0)
+    assert gate.decide("what time is it", at=gate.last_engagement + 1.0) == (True, "session", None)
+
+
+def test_gate_window_closes(engine):
+    gate = EngagementGate(engine, window=300.0)
+    gate.engage(at=1000.0)
+    assert gate.remaining(at=1100.0) == pytest.approx(200.0)
+    assert gate.decide("what time is it", at=1299.0)[:2] == (True, "session")
+    assert gate.remaining(at=1300.0) == 0.0
+    assert gate.decide("what time is it", at=1301.0) == (False, None, None)
+
+
+def test_gate_engage_restarts_window(engine):
+    gate = EngagementGate(engine, window=300.0)
+    gate.engage(at=1000.0)
+    gate.engage(at=1250.0)
+    assert gate.decide("and tomorrow?", at=1400.0)[:2] == (True, "session")
+
+
+def test_gate_wake_word_after_window(engine):
+    gate = EngagementGate(engine, window=300.0)
+    gate.engage(at=0.0)
+    active, reason, match = gate.decide("hey reachy", at=1000.0)
+    assert active and reason == "exact" and match.phrase == "hey reachy"
+
+
+def test_gate_face_after_window(engine):
+    gate = EngagementGate(engine, window=300.0)
+    gate.engage(at=0.0)
+    assert gate.decide("what time is it", emotion="happy", at=1000.0) == (True, "face", None)
+    assert gate.decide("reach the top shelf", emotion="neutral", at=1000.0) == (False, None, None)